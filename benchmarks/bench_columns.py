@@ -0,0 +1,118 @@
+"""
+Compare pivoting streams responses of many episodes into columns with
+Python lists of the rows and with TimeSeries, and parsing the response
+bodies into a TimeSeries whole and streamed (as SpotifyConnector.time_series
+does).
+
+Builds the responses in memory, so no credentials or server are needed:
+
+    python benchmarks/bench_columns.py --episodes 100 --days 3650
+"""
+
+import argparse
+import datetime as dt
+import gc
+import json
+import time
+import tracemalloc
+
+from spotifyconnector.columns import TimeSeries
+from spotifyconnector.streaming import JSONRowParser
+
+
+def _response(days: int, start: dt.date) -> dict:
+    return {
+        "detailedStreams": [
+            {
+                "date": (start + dt.timedelta(days=i)).isoformat(),
+                "starts": i,
+                "streams": i // 2,
+            }
+            for i in range(days)
+        ],
+        "total": days,
+    }
+
+
+def _pivot_lists(responses: dict) -> dict:
+    columns = {"episode": [], "date": [], "starts": [], "streams": []}
+    for episode, response in responses.items():
+        for row in response["detailedStreams"]:
+            columns["episode"].append(episode)
+            columns["date"].append(dt.date.fromisoformat(row["date"]))
+            columns["starts"].append(row["starts"])
+            columns["streams"].append(row["streams"])
+    return columns
+
+
+def _pivot_series(responses: dict) -> TimeSeries:
+    return TimeSeries.concat(
+        TimeSeries.from_response(response, label=episode)
+        for episode, response in responses.items()
+    )
+
+
+def _parse_whole(bodies: dict) -> TimeSeries:
+    return TimeSeries.concat(
+        TimeSeries.from_response(json.loads(body), label=episode)
+        for episode, body in bodies.items()
+    )
+
+
+def _body_rows(body: bytes, chunk_size: int = 64 * 1024):
+    parser = JSONRowParser()
+    for offset in range(0, len(body), chunk_size):
+        yield from parser.feed(body[offset : offset + chunk_size])
+    yield from parser.close()
+
+
+def _parse_streamed(bodies: dict) -> TimeSeries:
+    return TimeSeries.concat(
+        TimeSeries.from_rows(_body_rows(body), label=episode)
+        for episode, body in bodies.items()
+    )
+
+
+def _measure(label, pivot, responses):
+    gc.collect()
+    started = time.perf_counter()
+    pivot(responses)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    result = pivot(responses)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(
+        f"{label:<8} {elapsed:6.2f} s  result {size / 2**20:7.1f} MiB"
+        f"  peak {peak / 2**20:7.1f} MiB"
+    )
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--days", type=int, default=3650)
+    args = parser.parse_args()
+
+    start = dt.date(2000, 1, 1)
+    responses = {
+        f"episode{i}": _response(args.days, start) for i in range(args.episodes)
+    }
+    print(f"{args.episodes * args.days} rows")
+    _measure("lists", _pivot_lists, responses)
+    _measure("columns", _pivot_series, responses)
+
+    bodies = {
+        episode: json.dumps(response).encode("utf-8")
+        for episode, response in responses.items()
+    }
+    del responses
+    _measure("whole", _parse_whole, bodies)
+    _measure("streamed", _parse_streamed, bodies)
+
+
+if __name__ == "__main__":
+    main()
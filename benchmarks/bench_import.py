@@ -0,0 +1,95 @@
+"""
+Measure the import time and cold start of the package in fresh interpreters.
+
+Each scenario runs in a new process, so nothing is cached in memory (the OS
+file cache is warm after the first run). Times are medians, minus the startup
+of a bare interpreter:
+
+    python benchmarks/bench_import.py --runs 20
+    python benchmarks/bench_import.py --budget-ms 300  # exits 1 if exceeded
+    python benchmarks/bench_import.py --top 15  # slowest modules of the import
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+SCENARIOS = {
+    "package": "import spotifyconnector",
+    "connector": "from spotifyconnector import SpotifyConnector",
+    "connector_instance": (
+        "from spotifyconnector import SpotifyConnector\n"
+        "SpotifyConnector('https://example.com', 'id', 'show', 'dc', 'key').close()"
+    ),
+    "cli_help": (
+        "import sys\nfrom spotifyconnector.__main__ import main\n"
+        "sys.argv = ['spotifyconnector', '--help']\n"
+        "try:\n    main()\nexcept SystemExit:\n    pass"
+    ),
+}
+
+
+def _run(code: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def _median_ms(code: str, runs: int) -> float:
+    _run(code)  # warm the file cache
+    return statistics.median(_run(code) for _ in range(runs)) * 1000
+
+
+def _slowest_modules(code: str, top: int):
+    """Returns the modules with the highest cumulative import time"""
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    modules = []
+    for line in output.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        modules.append((int(cumulative), name.rstrip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="fail if importing the connector takes longer than this",
+    )
+    parser.add_argument("--top", type=int, default=0, help="list the slowest imports")
+    args = parser.parse_args()
+
+    baseline = _median_ms("pass", args.runs)
+    print(f"{'interpreter':<20} {baseline:8.1f} ms")
+    results = {}
+    for name, code in SCENARIOS.items():
+        results[name] = _median_ms(code, args.runs) - baseline
+        print(f"{name:<20} {results[name]:+8.1f} ms")
+
+    if args.top:
+        print("\nSlowest imports of the connector (cumulative):")
+        for cumulative, name in _slowest_modules(SCENARIOS["connector"], args.top):
+            print(f"{cumulative / 1000:8.1f} ms {name}")
+
+    if args.budget_ms is not None and results["connector"] > args.budget_ms:
+        print(
+            f"Importing the connector took {results['connector']:.1f} ms, "
+            f"budget is {args.budget_ms:.1f} ms"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Offline benchmark suite: runs the connector against a local stand-in for the
+Spotify accounts service and the podcasters API (see standin.py), so no
+credentials are needed.
+
+Suites:
+  auth         full PKCE login (authorize page and token request)
+  pagination   episode listing: page by page, prefetched and streamed
+  scaling      all calls of a CLI run with 1 to 64 workers
+  cli          the command line interface, logging and exporting
+
+    python benchmarks/bench_offline.py --latency 0.005 --report new.json
+    python benchmarks/bench_offline.py --compare old.json new.json
+
+By default the client-side rate limiter is disabled and backoff sleeps are
+scaled down (--backoff-scale), so that the connector itself is measured.
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import asdict
+from functools import partial
+from importlib import metadata
+from unittest.mock import patch
+
+from loguru import logger
+from standin import StandIn, StandInConfig
+
+from spotifyconnector import __main__ as cli
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.metrics import PHASES
+from spotifyconnector.ratelimit import RateLimiter, set_default_rate_limiter
+
+SUITES = ("auth", "pagination", "scaling", "cli")
+DEFAULT_WORKERS = "1,2,4,8,16,32,64"
+START = dt.date(2024, 1, 1)
+
+
+class _PhaseTotals:
+    """Metrics hook summing up the seconds per phase"""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = defaultdict(float)
+
+    def __call__(self, event):
+        self.calls += 1
+        for phase in PHASES:
+            self.seconds[phase] += getattr(event, phase)
+
+    def result(self) -> dict:
+        return {f"{phase}_seconds": round(self.seconds[phase], 4) for phase in PHASES}
+
+
+class _NullReporter:
+    """Reporter of the CLI that discards all results"""
+
+    def status(self, *args, **kwargs):
+        pass
+
+    def episode(self, episode):
+        pass
+
+
+def _connector(standin, workers=1, hooks=()):
+    return SpotifyConnector(
+        standin.api_url,
+        "client_id",
+        "show",
+        "sp_dc",
+        "sp_key",
+        pool_maxsize=max(10, workers),
+        metrics_hooks=hooks,
+        accounts_url=standin.url,
+    )
+
+
+def _timed(func) -> float:
+    started = time.perf_counter()
+    func()
+    return time.perf_counter() - started
+
+
+def bench_auth(standin, args) -> dict:
+    """Time full logins"""
+    durations = []
+    for _ in range(args.repeat * 10):
+        with _connector(standin) as connector:
+            # pylint: disable-next=protected-access
+            durations.append(_timed(connector._authenticate))
+    return {
+        "logins": len(durations),
+        "median_ms": round(statistics.median(durations) * 1000, 3),
+        "max_ms": round(max(durations) * 1000, 3),
+    }
+
+
+def _list_episodes(connector, **kwargs):
+    return list(connector.episodes(START, size=10, **kwargs))
+
+
+def bench_pagination(standin, args) -> dict:
+    """Time listing all episodes in pages of 10"""
+    results = {}
+    variants = {
+        "sequential": {},
+        "prefetch_8": {"prefetch": 8},
+        "stream": {"stream": True},
+    }
+    pages = -(-args.episodes // 10)
+    with _connector(standin, workers=8) as connector:
+        connector._authenticate()  # pylint: disable=protected-access
+        for name, kwargs in variants.items():
+            durations = [
+                _timed(partial(_list_episodes, connector, **kwargs))
+                for _ in range(args.repeat)
+            ]
+            seconds = statistics.median(durations)
+            results[name] = {
+                "pages": pages,
+                "seconds": round(seconds, 4),
+                "pages_per_second": round(pages / seconds, 1),
+            }
+    return results
+
+
+def bench_scaling(standin, args) -> dict:
+    """Time all calls of a CLI run with an increasing number of workers"""
+    results = {}
+    for workers in args.workers:
+        phases = _PhaseTotals()
+        with _connector(standin, workers, hooks=[phases]) as connector:
+            connector._authenticate()  # pylint: disable=protected-access
+            standin.reset()
+            seconds = _timed(
+                partial(cli.fetch_podcast, connector, workers, reporter=_NullReporter())
+            )
+        requests = sum(standin.reset().values())
+        results[f"workers_{workers}"] = {
+            "seconds": round(seconds, 4),
+            "requests": requests,
+            "requests_per_second": round(requests / seconds, 1),
+            **phases.result(),
+        }
+    return results
+
+
+def bench_cli(standin, args) -> dict:
+    """Time the command line interface, logging to a file or exporting"""
+    env = {
+        "SPOTIFY_BASE_URL": standin.api_url,
+        "SPOTIFY_ACCOUNTS_URL": standin.url,
+        "SPOTIFY_CLIENT_ID": "client_id",
+        "SPOTIFY_PODCAST_ID": "show",
+        "SPOTIFY_SP_DC": "sp_dc",
+        "SPOTIFY_SP_KEY": "sp_key",
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as out, patch.dict(os.environ, env):
+        runs = {
+            "log": ["--concurrency", "8"],
+            "export_ndjson": ["--concurrency", "8", "export", "--out", out],
+            "export_csv_gzip": [
+                "--concurrency",
+                "8",
+                "export",
+                "--out",
+                out,
+                "--format",
+                "csv",
+                "--gzip",
+            ],
+        }
+        for name, argv in runs.items():
+            # Log at INFO level like a default run, but to a file
+            sink = logger.add(os.path.join(out, "run.log"), level="INFO")
+            try:
+                seconds = _timed(partial(cli.main, argv))
+            finally:
+                logger.remove(sink)
+            results[name] = {"seconds": round(seconds, 4)}
+    return results
+
+
+@contextmanager
+def _benchmark_environment(args):
+    """Disables the rate limiter and scales backoff sleeps"""
+    if not args.rate_limit:
+        unlimited = 1e9
+        set_default_rate_limiter(
+            RateLimiter(rate=unlimited, burst=int(unlimited), max_rate=unlimited)
+        )
+
+    def scaled_sleep(seconds):
+        time.sleep(seconds * args.backoff_scale)
+
+    # Only INFO and above of the CLI suite are logged, to a file
+    logger.remove()
+    with (
+        patch("spotifyconnector.connector.sleep", scaled_sleep),
+        patch("spotifyconnector.retry.sleep", scaled_sleep),
+    ):
+        yield
+
+
+def _version() -> str:
+    try:
+        return metadata.version("spotifyconnector")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def compare(old_path: str, new_path: str):
+    """Print the relative change of all timings of two reports"""
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+    print(f"{'':<44} {old['label']:>12} {new['label']:>12}")
+
+    def walk(prefix, old_values, new_values):
+        for key, new_value in new_values.items():
+            old_value = old_values.get(key) if isinstance(old_values, dict) else None
+            name = f"{prefix}.{key}" if prefix else key
+            if isinstance(new_value, dict):
+                walk(name, old_value or {}, new_value)
+            elif isinstance(new_value, (int, float)) and isinstance(
+                old_value, (int, float)
+            ):
+                change = f"{new_value / old_value - 1:+8.1%}" if old_value else ""
+                print(f"{name:<44} {old_value:>12} {new_value:>12} {change}")
+
+    walk("", old["results"], new["results"])
+
+
+def main():
+    """Run the benchmark suite"""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--suite", default=",".join(SUITES), help="suites to run")
+    parser.add_argument("--latency", type=float, default=0.002, help="API latency")
+    parser.add_argument("--auth-latency", type=float, default=0.01)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--workers", default=DEFAULT_WORKERS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--backoff-scale", type=float, default=0.01)
+    parser.add_argument(
+        "--rate-limit", action="store_true", help="keep the default rate limiter"
+    )
+    parser.add_argument("--label", help="name of this run in comparisons")
+    parser.add_argument("--report", metavar="PATH", help="write a JSON report")
+    parser.add_argument(
+        "--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two reports"
+    )
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    args.workers = [int(workers) for workers in args.workers.split(",")]
+    config = StandInConfig(
+        latency=args.latency,
+        auth_latency=args.auth_latency,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        episodes=args.episodes,
+    )
+    suites = {
+        "auth": bench_auth,
+        "pagination": bench_pagination,
+        "scaling": bench_scaling,
+        "cli": bench_cli,
+    }
+
+    report = {
+        "label": args.label or _version(),
+        "version": _version(),
+        "python": platform.python_version(),
+        "config": {**asdict(config), "backoff_scale": args.backoff_scale},
+        "results": {},
+    }
+    with StandIn(config) as standin, _benchmark_environment(args):
+        for name in args.suite.split(","):
+            result = suites[name](standin, args)
+            report["results"][name] = result
+            json.dump({name: result}, sys.stdout, indent=2)
+            print()
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
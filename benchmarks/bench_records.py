@@ -0,0 +1,78 @@
+"""
+Compare the memory of holding response rows as dicts and as records.
+
+Builds the rows in memory, so no credentials or server are needed:
+
+    python benchmarks/bench_records.py --rows 1000000
+"""
+
+import argparse
+import datetime as dt
+import gc
+import tracemalloc
+
+from spotifyconnector.records import Episode, ListenerPoint, StreamPoint
+
+
+def _stream_row(i: int, start: dt.date) -> dict:
+    return {
+        "date": (start + dt.timedelta(days=i % 3650)).isoformat(),
+        "starts": i,
+        "streams": i // 2,
+    }
+
+
+def _listener_row(i: int, start: dt.date) -> dict:
+    return {"date": (start + dt.timedelta(days=i % 3650)).isoformat(), "count": i}
+
+
+def _episode_row(i: int, start: dt.date) -> dict:
+    return {
+        "id": f"{i:022d}",
+        "name": f"Episode {i}",
+        "releaseDate": (start + dt.timedelta(days=i % 3650)).isoformat(),
+        "duration": 1800 + i % 600,
+        "starts": i,
+        "streams": i // 2,
+        "listeners": i // 3,
+    }
+
+
+def _peak(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    rows = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return current
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    start = dt.date(2000, 1, 1)
+    per_million = 1_000_000 / args.rows
+    for label, make_row, record_type in [
+        ("streams", _stream_row, StreamPoint),
+        ("listeners", _listener_row, ListenerPoint),
+        ("episodes", _episode_row, Episode),
+    ]:
+        as_dicts = _peak(lambda: [make_row(i, start) for i in range(args.rows)])
+        as_records = _peak(
+            lambda: [
+                record_type.from_dict(make_row(i, start)) for i in range(args.rows)
+            ]
+        )
+        print(
+            f"{label:<10} dicts {as_dicts * per_million / 2**20:7.1f} MiB  "
+            f"records {as_records * per_million / 2**20:7.1f} MiB per 1M rows  "
+            f"({as_records / as_dicts:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compare a fresh HTTP session per request with the pooled keep-alive session
+owned by SpotifyConnector.
+
+Runs against a local HTTP server, so no credentials are needed. The server
+waits ``--connect-latency`` seconds on each new connection, like the TCP and
+TLS handshakes with a remote server do (loopback has neither round trips nor
+TLS, so without it a new connection costs almost nothing):
+
+    python benchmarks/bench_session.py --requests 500 --connect-latency 0.02
+"""
+
+import argparse
+import datetime as dt
+import socket
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.ratelimit import UnlimitedRateLimiter
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Seconds added to each new connection
+    connect_latency = 0.0
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately, avoid delayed-ACK stalls
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Called once per connection, so this stands in for the handshakes
+        time.sleep(self.connect_latency)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+def _connector(base_url):
+    # Measure the session, not the default rate limiter
+    connector = SpotifyConnector(
+        base_url,
+        "client_id",
+        "podcast_id",
+        "dc",
+        "key",
+        rate_limiter=UnlimitedRateLimiter(),
+    )
+    # Skip authentication, the local server does not check the bearer
+    connector._bearer = "bearer"  # pylint: disable=protected-access
+    connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+    return connector
+
+
+def _measure(label, call, count):
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(count):
+        before = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - before)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{label:<20} {count / elapsed:10.1f} req/s "
+        f"median {statistics.median(latencies) * 1000:8.3f} ms"
+    )
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.02,
+        help="seconds added to each new connection (default: %(default)s)",
+    )
+    args = parser.parse_args()
+    _Handler.connect_latency = args.connect_latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    url = f"{base_url}/shows/podcast_id/metadata"
+
+    def fresh_session():
+        with requests.Session() as session:
+            session.get(url, headers={"Authorization": "Bearer bearer"}).json()
+
+    connector = _connector(base_url)
+    try:
+        _measure("session per request", fresh_session, args.requests)
+        _measure("pooled session", lambda: connector._request(url), args.requests)
+    finally:
+        connector.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Compare the peak memory of decoding a large response at once with
+streaming its rows.
+
+Runs against a local HTTP server that returns a detailedStreams response
+with many rows, so no credentials are needed:
+
+    python benchmarks/bench_streaming.py --rows 200000
+"""
+
+import argparse
+import datetime as dt
+import json
+import socket
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from spotifyconnector.connector import SpotifyConnector
+
+
+def _handler(body: bytes):
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body are written separately, avoid delayed-ACK stalls
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    return _Handler
+
+
+def _body(rows: int) -> bytes:
+    start = dt.date(2000, 1, 1)
+    return json.dumps(
+        {
+            "detailedStreams": [
+                {
+                    "date": (start + dt.timedelta(days=i)).isoformat(),
+                    "starts": i,
+                    "streams": i // 2,
+                }
+                for i in range(rows)
+            ],
+            "total": rows,
+        }
+    ).encode("utf-8")
+
+
+def _connector(base_url):
+    connector = SpotifyConnector(base_url, "client_id", "podcast_id", "dc", "key")
+    # Skip authentication, the local server does not check the bearer
+    connector._bearer = "bearer"  # pylint: disable=protected-access
+    connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+    return connector
+
+
+def _measure(label, call):
+    # Time without tracing, as tracemalloc slows down every allocation
+    started = time.perf_counter()
+    rows = call()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{label:<10} {rows:>9} rows  peak {peak / 2**20:8.1f} MiB  "
+        f"{elapsed:6.2f} s"
+    )
+
+
+def main():
+    """Run the benchmark"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    args = parser.parse_args()
+
+    body = _body(args.rows)
+    print(f"response size {len(body) / 2**20:.1f} MiB")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(body))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    connector = _connector(f"http://127.0.0.1:{server.server_port}")
+    day = dt.date(2000, 1, 1)
+
+    def decode_all():
+        return len(connector.streams(day)["detailedStreams"])
+
+    def stream_rows():
+        return sum(1 for _ in connector.streams(day, stream=True))
+
+    try:
+        _measure("json()", decode_all)
+        _measure("stream", stream_rows)
+    finally:
+        connector.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,274 @@
+"""
+Local stand-in for the Spotify accounts service and the podcasters API,
+so the connector can be benchmarked without credentials.
+
+Serves the authorize page (with its ``authorizationResponse`` script), the
+token endpoint and the API endpoints the connector uses, with generated data.
+Latency, 429 and 5xx responses and the number of episodes are configurable.
+
+    with StandIn(StandInConfig(latency=0.005, throttle_rate=0.01)) as standin:
+        connector = SpotifyConnector(standin.api_url, ..., accounts_url=standin.url)
+"""
+
+import datetime as dt
+import json
+import math
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+TOKEN = "standin-bearer"
+AUTH_CODE = "standin-code"
+
+
+@dataclass
+class StandInConfig:
+    """Behaviour of the stand-in.
+
+    Attributes:
+        latency (float): Seconds added to each API response.
+        auth_latency (float): Seconds added to each accounts response.
+        throttle_rate (float): Share of API requests answered with 429.
+        error_rate (float): Share of API requests answered with 503.
+        retry_after (Optional[float]): Retry-After header of 429 responses.
+        episodes (int): Number of episodes of the show.
+        token_lifetime (int): Seconds until issued tokens expire.
+        seed (int): Seed of the injected failures.
+    """
+
+    latency: float = 0.0
+    auth_latency: float = 0.0
+    throttle_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: Optional[float] = 0.0
+    episodes: int = 100
+    token_lifetime: int = 3600
+    seed: int = 0
+
+
+def _days(query: dict):
+    start = dt.date.fromisoformat(query.get("start", ["2024-01-01"])[0])
+    end = dt.date.fromisoformat(query.get("end", [start.isoformat()])[0])
+    return [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _episode(number: int) -> dict:
+    return {
+        "id": f"episode{number:05d}",
+        "name": f"Episode {number}",
+        "releaseDate": (dt.date(2020, 1, 1) + dt.timedelta(days=number)).isoformat(),
+        "duration": 1800 + number % 600,
+        "starts": number * 10,
+        "streams": number * 8,
+        "listeners": number * 5,
+    }
+
+
+def _api_response(config: StandInConfig, path: list, query: dict) -> dict:
+    # shows/<id>/<endpoint>[/<kind>], episodes/<id>/<endpoint> or user/<endpoint>
+    endpoint = path[2] if len(path) > 2 else path[-1]
+    days = _days(query) if "start" in query else []
+
+    if endpoint == "episodes":
+        size = int(query.get("size", ["50"])[0])
+        page = int(query.get("page", ["1"])[0])
+        first = (page - 1) * size
+        return {
+            "episodes": [
+                _episode(number)
+                for number in range(first, min(first + size, config.episodes))
+            ],
+            "totalPages": max(1, math.ceil(config.episodes / size)),
+        }
+    if endpoint == "detailedStreams":
+        return {
+            "detailedStreams": [
+                {"date": day.isoformat(), "starts": day.day * 3, "streams": day.day}
+                for day in days
+            ],
+            "total": len(days),
+        }
+    if endpoint in ("listeners", "followers"):
+        return {"counts": [{"date": day.isoformat(), "count": day.day} for day in days]}
+    if endpoint == "aggregate":
+        return {
+            "ageFacetedCounts": {
+                group: {"counts": {"female": 1, "male": 2, "non_binary": 0}}
+                for group in ("18-22", "23-27", "28-34", "35-44", "45-59", "60+")
+            },
+            "genderedCounts": {"counts": {"female": 6, "male": 12}},
+        }
+    if endpoint == "impressions":
+        return {
+            "impressionsTotal": 1234,
+            "impressions": [
+                {"date": day.isoformat(), "impressions": day.day} for day in days
+            ],
+        }
+    if endpoint == "performance":
+        return {"medianCompletion": {"seconds": 900}, "samples": list(range(100))}
+    if endpoint == "shows":
+        return {"shows": [{"id": "show", "name": "Stand-in show"}], "totalPages": 1}
+    if endpoint == "me":
+        return {"id": "user", "name": "Stand-in user"}
+    return {"id": path[1] if len(path) > 1 else None, "name": "Stand-in show"}
+
+
+def _handler(standin: "StandIn"):
+    config = standin.config
+
+    class _Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # Headers and body are written separately, avoid delayed-ACK stalls
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        def _send(self, status: int, body: bytes, content_type: str, headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, data, headers=()):
+            self._send(
+                status, json.dumps(data).encode("utf-8"), "application/json", headers
+            )
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            if url.path == "/oauth2/v2/auth":
+                self._authorize(query)
+                return
+            path = [part for part in url.path.split("/") if part][1:]
+
+            fault = standin.fault()
+            time.sleep(config.latency)
+            if self.headers.get("Authorization") != f"Bearer {TOKEN}":
+                standin.count("unauthorized")
+                self._send_json(401, {"error": "unauthorized"})
+            elif fault == 429:
+                standin.count("throttled")
+                headers = ()
+                if config.retry_after is not None:
+                    headers = (("Retry-After", f"{config.retry_after:g}"),)
+                self._send_json(429, {"error": "too many requests"}, headers)
+            elif fault == 503:
+                standin.count("errors")
+                self._send_json(503, {"error": "unavailable"})
+            else:
+                standin.count("api")
+                self._send_json(200, _api_response(config, path, query))
+
+        def do_POST(self):  # pylint: disable=invalid-name
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(config.auth_latency)
+            standin.count("token")
+            self._send_json(
+                200,
+                {
+                    "access_token": TOKEN,
+                    "token_type": "Bearer",
+                    "expires_in": config.token_lifetime,
+                },
+            )
+
+        def _authorize(self, query: dict):
+            time.sleep(config.auth_latency)
+            standin.count("authorize")
+            state = query.get("state", [""])[0]
+            # Same shape as the real page: a JS object literal, not strict JSON
+            html = (
+                "<html><head><script>\n"
+                "const authorizationResponse = {type: 'authorization_response', "
+                f"response: {{code: '{AUTH_CODE}', state: '{state}'}}}};\n"
+                "</script></head></html>"
+            )
+            self._send(200, html.encode("utf-8"), "text/html")
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    return _Handler
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog is too small for many concurrent workers
+    request_queue_size = 128
+
+
+class StandIn:
+    """Runs the stand-in server in a background thread.
+
+    The API is served under ``/api`` (:attr:`api_url`), the accounts service
+    at the root (:attr:`url`). :attr:`counts` counts the requests by kind.
+    """
+
+    def __init__(self, config: Optional[StandInConfig] = None):
+        self.config = config or StandInConfig()
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._random = random.Random(self.config.seed)
+        self._server = _Server(("127.0.0.1", 0), _handler(self))
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the accounts service"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        """Base URL of the API"""
+        return f"{self.url}/api"
+
+    def fault(self) -> Optional[int]:
+        """Returns the status of an injected failure, if any"""
+        with self._lock:
+            draw = self._random.random()
+        if draw < self.config.throttle_rate:
+            return 429
+        if draw < self.config.throttle_rate + self.config.error_rate:
+            return 503
+        return None
+
+    def count(self, kind: str):
+        """Counts a request"""
+        with self._lock:
+            self.counts[kind] += 1
+
+    def reset(self) -> Counter:
+        """Resets and returns the request counts"""
+        with self._lock:
+            counts, self.counts = self.counts, Counter()
+        return counts
+
+    def start(self) -> "StandIn":
+        """Starts serving"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stops serving"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -3,6 +3,23 @@ This package allows you to fetch data from the inofficial Spotify Podcast API.
 The API is not documented and may change at any time. Use at your own risk.
 """
 
-from .connector import CredentialsExpired, SpotifyConnector
+from typing import TYPE_CHECKING
 
-__all__ = ["SpotifyConnector", "CredentialsExpired"]
+if TYPE_CHECKING:  # pragma: no cover
+    from .connector import CredentialsExpired, SpotifyAccount, SpotifyConnector
+
+__all__ = ["SpotifyConnector", "SpotifyAccount", "CredentialsExpired"]
+
+
+def __getattr__(name: str):
+    # The connector (and requests with it) is only imported on first use,
+    # so that importing the package or a light submodule stays fast
+    if name in __all__:
+        from . import connector  # pylint: disable=import-outside-toplevel
+
+        return getattr(connector, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -2,13 +2,29 @@
 Command line interface to run the Spotify Connector
 """
 
+import argparse
 import datetime as dt
 import json
 import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import copy_context
+from functools import partial
 
 from loguru import logger
 
-from .connector import SpotifyConnector
+from .auth import ACCOUNTS_URL
+from .connector import DEFAULT_POOL_MAXSIZE, SpotifyConnector
+from .deadline import Deadline, DeadlineExceeded
+from .export import EXPORT_FORMATS, Exporter
+from .fleet import DEFAULT_SHARD_SIZE, load_config, sync_all
+from .impressions import ImpressionsPlanner
+from .metrics import PrometheusTextfileExporter
+from .ratelimit import SQLiteRateLimiter, set_default_rate_limiter
+from .replay import Recorder, Replayer
+from .sync import DEFAULT_OVERLAP_DAYS, IncrementalSync, WatermarkStore
+from .tokencache import FileTokenCache
 
 
 def now():
@@ -25,17 +41,34 @@ def days_ago(days):
     return now() - dt.timedelta(days=days)
 
 
-def execute_and_log(endpoint_name, func, *args, **kwargs):
+def execute(func, *args, **kwargs):
     """
-    Execute a function and log the result
+    Execute a function and return its status and result (or error)
     """
     try:
-        result = func(*args, **kwargs)
-        log_status(endpoint_name, True, result)
-        return result
+        return True, func(*args, **kwargs)
     except Exception as error:  # pylint: disable=broad-except
-        log_status(endpoint_name, False, {"error": str(error)})
-        return None
+        return False, {"error": str(error)}
+
+
+def execute_and_log(endpoint_name, func, *args, reporter=None, **kwargs):
+    """
+    Execute a function and log the result
+    """
+    status, data = execute(func, *args, **kwargs)
+    report_status(reporter, endpoint_name, status, data)
+    return data if status else None
+
+
+def report_status(reporter, endpoint_name, status, data, episode=None):
+    """
+    Report the result of a call. Endpoints that an incremental sync found
+    up to date returned no data and are not reported.
+    """
+    if status and data is None:
+        logger.debug("{} is up to date", endpoint_name)
+        return
+    (reporter or LogReporter()).status(endpoint_name, status, data, episode=episode)
 
 
 def log_status(endpoint_name, status, data):
@@ -46,83 +79,475 @@ def log_status(endpoint_name, status, data):
     logger.info(f"{symbol} {endpoint_name}: {json.dumps(data, indent=2)}")
 
 
-def main():  # pylint: disable=too-many-locals
+class LogReporter:
     """
-    Main entrypoint to run the connector
+    Logs the full result of each call. An Exporter writes the results
+    to files instead.
     """
-    base_url = os.environ.get("SPOTIFY_BASE_URL")
-    client_id = os.environ.get("SPOTIFY_CLIENT_ID")
-    podcast_id = os.environ.get("SPOTIFY_PODCAST_ID")
-    sp_dc = os.environ.get("SPOTIFY_SP_DC")
-    sp_key = os.environ.get("SPOTIFY_SP_KEY")
 
-    connector = SpotifyConnector(
-        base_url,
-        client_id,
-        podcast_id,
-        sp_dc,
-        sp_key,
+    def status(self, endpoint_name, status, data, episode=None):
+        """
+        Log the status of an endpoint (episode calls follow their Episode line)
+        """
+        del episode
+        log_status(endpoint_name, status, data)
+
+    def episode(self, episode):
+        """
+        Log an episode of the episode listing
+        """
+        logger.info("Episode = {}", json.dumps(episode, separators=(",", ":")))
+
+
+def log_deadline(deadline):
+    """
+    Log the calls that finished and were cancelled within the deadline
+    """
+    report = deadline.report()
+    logger.log(
+        "WARNING" if report["cancelled"] else "INFO",
+        f"Deadline: {json.dumps(report, indent=2)}",
     )
 
-    if not connector.podcast_id:
-        execute_and_log("catalog", connector.catalog)
-        execute_and_log("user", connector.me)
-        return
 
-    execute_and_log("metadata", connector.metadata)
+def ranged_call(connector, sync, endpoint, start, end, **kwargs):
+    """
+    Returns a call of an endpoint for a date range. In an incremental sync,
+    the range starts at the endpoint's watermark instead.
+    """
+    if sync is not None:
+        return partial(sync.fetch, endpoint, **kwargs)
+    return partial(getattr(connector, endpoint), start, end, **kwargs)
 
-    execute_and_log("streams", connector.streams, days_ago(7), now())
 
-    execute_and_log("followers", connector.followers, days_ago(1), now())
+def fetch_impressions(planner, endpoint_name, kind, start, end, reporter=None):
+    """
+    Run the impressions calls for a date range and log the response of
+    each window, like separate calls of the endpoint
+    """
+    status, data = execute(planner.fetch, kind, start, end)
+    responses = data.values() if status else [data]
+    for response in responses:
+        report_status(reporter, endpoint_name, status, response)
+
+
+def episode_calls(connector, episode_id, sync=None):
+    """
+    Returns the endpoint calls to run for a single episode
+    as (endpoint_name, func, args, kwargs) tuples
+    """
+    return [
+        ("episode_metadata", connector.metadata, (), {"episode": episode_id}),
+        (
+            "episode_streams",
+            ranged_call(
+                connector, sync, "streams", days_ago(7), now(), episode=episode_id
+            ),
+            (),
+            {},
+        ),
+        (
+            "episode_listeners",
+            ranged_call(
+                connector,
+                sync,
+                "listeners",
+                days_ago(4),
+                days_ago(1),
+                episode=episode_id,
+            ),
+            (),
+            {},
+        ),
+        (
+            "episode_aggregate",
+            ranged_call(
+                connector, sync, "aggregate", days_ago(7), now(), episode=episode_id
+            ),
+            (),
+            {},
+        ),
+        ("episode_performance", connector.performance, (), {"episode": episode_id}),
+    ]
+
+
+def log_episode(episode, futures, reporter=None):
+    """
+    Wait for the calls of an episode and log their results in order
+    """
+    reporter = reporter or LogReporter()
+    reporter.episode(episode)
+    for endpoint_name, future in futures:
+        status, data = future.result()
+        report_status(reporter, endpoint_name, status, data, episode=episode["id"])
+
+
+def fetch_episodes(  # pylint: disable=too-many-arguments
+    connector, episodes, concurrency, sync=None, reporter=None
+):
+    """
+    Run the per-episode calls on a pool of ``concurrency`` workers.
+
+    Results are logged in the same order as a sequential run. At most
+    ``concurrency`` episodes are in flight, so memory stays bounded. If the
+    episode listing fails, the episodes listed so far are still logged
+    before the error is raised.
+    """
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        try:
+            for episode in episodes:
+                futures = [
+                    (
+                        endpoint_name,
+                        # In the context of the run, so calls keep to its deadline
+                        executor.submit(
+                            copy_context().run, execute, func, *args, **kwargs
+                        ),
+                    )
+                    for endpoint_name, func, args, kwargs in episode_calls(
+                        connector, episode["id"], sync
+                    )
+                ]
+                pending.append((episode, futures))
 
-    execute_and_log("impressions_total", connector.impressions, "total")
+                if len(pending) > concurrency:
+                    log_episode(*pending.popleft(), reporter)
+        finally:
+            while pending:
+                log_episode(*pending.popleft(), reporter)
 
-    execute_and_log("impressions_total", connector.impressions, "total", days_ago(60))
+
+def fetch_podcast(connector, concurrency, sync=None, reporter=None):
+    """
+    Run and log all calls for a podcast and its episodes
+    """
+    execute_and_log("metadata", connector.metadata, reporter=reporter)
 
     execute_and_log(
-        "impressions_daily", connector.impressions, "daily", days_ago(14), now()
+        "streams",
+        ranged_call(connector, sync, "streams", days_ago(7), now()),
+        reporter=reporter,
     )
 
     execute_and_log(
-        "impressions_faceted", connector.impressions, "faceted", days_ago(14), now()
+        "followers",
+        ranged_call(connector, sync, "followers", days_ago(1), now()),
+        reporter=reporter,
     )
 
-    execute_and_log("aggregate", connector.aggregate, days_ago(1), now())
+    # The last 60 days in two 29-day windows
+    planner = ImpressionsPlanner(connector)
+    fetch_impressions(
+        planner, "impressions_total", "total", days_ago(59), now(), reporter
+    )
 
-    episodes = connector.episodes(days_ago(4), now())
-    for episode in episodes:
-        logger.info("Episode = {}", json.dumps(episode, separators=(",", ":")))
+    execute_and_log(
+        "impressions_daily",
+        connector.impressions,
+        "daily",
+        days_ago(14),
+        now(),
+        reporter=reporter,
+    )
 
-        execute_and_log("episode_metadata", connector.metadata, episode=episode["id"])
+    fetch_impressions(
+        planner, "impressions_faceted", "faceted", days_ago(14), now(), reporter
+    )
 
-        execute_and_log(
-            "episode_streams",
-            connector.streams,
-            days_ago(7),
-            now(),
-            episode=episode["id"],
-        )
+    execute_and_log(
+        "aggregate",
+        ranged_call(connector, sync, "aggregate", days_ago(1), now()),
+        reporter=reporter,
+    )
 
-        execute_and_log(
-            "episode_listeners",
-            connector.listeners,
-            days_ago(4),
-            days_ago(1),
-            episode=episode["id"],
-        )
+    episodes = connector.episodes(
+        days_ago(4), now(), prefetch=concurrency if concurrency > 1 else 0
+    )
+    fetch_episodes(connector, episodes, concurrency, sync, reporter)
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="spotifyconnector",
+        description="Fetch podcast data from the Spotify podcast API",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="number of per-episode requests to run in parallel (default: 1)",
+    )
+    parser.add_argument(
+        "--rate-limit-db",
+        metavar="PATH",
+        help="SQLite file to share the request rate limit with other processes",
+    )
+    parser.add_argument(
+        "--token-cache",
+        metavar="DIR",
+        nargs="?",
+        const="",
+        help=(
+            "reuse Bearer tokens across runs, stored in DIR "
+            "(default: ~/.cache/spotifyconnector/tokens)"
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="PATH",
+        nargs="?",
+        const="",
+        help=(
+            "only request days after the last run, keeping watermarks in PATH "
+            "(default: ~/.cache/spotifyconnector/sync/watermarks.json)"
+        ),
+    )
+    parser.add_argument(
+        "--overlap-days",
+        type=int,
+        default=DEFAULT_OVERLAP_DAYS,
+        metavar="N",
+        help=(
+            "days before the watermark to request again in an incremental run "
+            f"(default: {DEFAULT_OVERLAP_DAYS})"
+        ),
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="PATH",
+        help=(
+            "write call metrics in the Prometheus text format to PATH, "
+            "e.g. for the node exporter's textfile collector"
+        ),
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help=(
+            "stop the run after SECONDS, cancelling the remaining calls, "
+            "and log what finished"
+        ),
+    )
+    transport = parser.add_mutually_exclusive_group()
+    transport.add_argument(
+        "--record",
+        metavar="PATH",
+        help="record all API responses to an archive at PATH",
+    )
+    transport.add_argument(
+        "--replay",
+        metavar="PATH",
+        help=(
+            "serve all API requests from an archive recorded with --record, "
+            "without network access or credentials"
+        ),
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    export = commands.add_parser(
+        "export",
+        help="write the rows of each endpoint to files instead of logging them",
+        description=(
+            "Write the rows of each endpoint to DIR/<endpoint>.<format>, "
+            "logging one status line per call"
+        ),
+    )
+    export.add_argument("--out", required=True, metavar="DIR", help="output directory")
+    export.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="ndjson",
+        help="file format (default: ndjson)",
+    )
+    export.add_argument(
+        "--gzip", action="store_true", help="compress the files with gzip"
+    )
+    fleet = commands.add_parser(
+        "sync-all",
+        help="sync all accounts of a config file on a pool of processes",
+        description=(
+            "Sync the podcasts of all accounts in a JSON or YAML config file "
+            "in shards spread over worker processes, and log a summary"
+        ),
+    )
+    fleet.add_argument(
+        "--config", required=True, metavar="PATH", help="config file of accounts"
+    )
+    fleet.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="number of worker processes (default: number of CPUs)",
+    )
+    fleet.add_argument(
+        "--shard-size",
+        type=int,
+        default=DEFAULT_SHARD_SIZE,
+        metavar="N",
+        help=(
+            "sync at most N podcasts of an account per task, so that large "
+            f"accounts are spread over workers (default: {DEFAULT_SHARD_SIZE})"
+        ),
+    )
+    fleet.add_argument(
+        "--out",
+        metavar="DIR",
+        help="write the rows to DIR/<account>/<podcast>/ instead of logging them",
+    )
+    fleet.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="ndjson",
+        help="file format with --out (default: ndjson)",
+    )
+    fleet.add_argument(
+        "--gzip", action="store_true", help="compress the files with gzip"
+    )
+    fleet.add_argument(
+        "--summary", metavar="PATH", help="also write the summary as JSON to PATH"
+    )
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.overlap_days < 0:
+        parser.error("--overlap-days must not be negative")
+    if args.deadline is not None and args.deadline <= 0:
+        parser.error("--deadline must be positive")
+    if args.command == "sync-all":
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+        if args.shard_size < 1:
+            parser.error("--shard-size must be at least 1")
+        for option in ("incremental", "metrics_file", "record", "replay"):
+            if getattr(args, option) is not None:
+                parser.error(
+                    f"--{option.replace('_', '-')} can't be used with sync-all"
+                )
+    return args
 
-        execute_and_log(
-            "episode_aggregate",
-            connector.aggregate,
-            days_ago(7),
-            now(),
-            episode=episode["id"],
-        )
 
-        execute_and_log(
-            "episode_performance", connector.performance, episode=episode["id"]
+def run(connector, args, reporter=None):
+    """
+    Run the calls for the account or podcast of the connector
+    """
+    if not connector.podcast_id:
+        execute_and_log("catalog", list, connector.catalog(), reporter=reporter)
+        execute_and_log("user", connector.me, reporter=reporter)
+        return
+
+    sync = None
+    if args.incremental is not None:
+        sync = IncrementalSync(
+            connector,
+            WatermarkStore(args.incremental or None),
+            overlap_days=args.overlap_days,
         )
 
+    try:
+        fetch_podcast(connector, args.concurrency, sync, reporter)
+    finally:
+        if sync is not None:
+            sync.store.save()
+
+
+def main_sync_all(args):
+    """
+    Sync all accounts of the config file and log the summary
+    """
+    try:
+        config = load_config(args.config)
+    except (OSError, ValueError, ImportError) as error:
+        logger.error("Invalid config: {}", str(error))
+        raise SystemExit(1) from error
+
+    summary = sync_all(config, args, args.workers, shard_size=args.shard_size)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+    # The results per account are only written to the summary file
+    totals = {key: value for key, value in summary.items() if key != "results"}
+    failed = summary["failed_accounts"] or summary["calls"]["failed"]
+    logger.log(
+        "WARNING" if failed else "INFO", f"Summary: {json.dumps(totals, indent=2)}"
+    )
+
+
+def main(argv=None):  # pylint: disable=too-many-locals
+    """
+    Main entrypoint to run the connector
+    """
+    args = parse_args(argv)
+
+    if args.command == "sync-all":
+        main_sync_all(args)
+        return
+
+    if args.rate_limit_db:
+        set_default_rate_limiter(SQLiteRateLimiter(args.rate_limit_db))
+
+    base_url = os.environ.get("SPOTIFY_BASE_URL")
+    client_id = os.environ.get("SPOTIFY_CLIENT_ID")
+    podcast_id = os.environ.get("SPOTIFY_PODCAST_ID")
+    sp_dc = os.environ.get("SPOTIFY_SP_DC")
+    sp_key = os.environ.get("SPOTIFY_SP_KEY")
+    accounts_url = os.environ.get("SPOTIFY_ACCOUNTS_URL", ACCOUNTS_URL)
+
+    transport = None
+    if args.record:
+        transport = Recorder(args.record)
+    elif args.replay:
+        transport = Replayer(args.replay)
+        base_url = base_url or transport.base_url
+
+    metrics = (
+        PrometheusTextfileExporter(args.metrics_file) if args.metrics_file else None
+    )
+    connector = SpotifyConnector(
+        base_url,
+        client_id,
+        podcast_id,
+        sp_dc,
+        sp_key,
+        pool_maxsize=max(DEFAULT_POOL_MAXSIZE, args.concurrency),
+        token_cache=(
+            FileTokenCache(args.token_cache or None)
+            if args.token_cache is not None
+            else None
+        ),
+        metrics_hooks=[metrics] if metrics else (),
+        accounts_url=accounts_url,
+        transport=transport,
+        # Exports can take longer than a token is valid
+        background_refresh=args.command == "export",
+    )
+
+    reporter = None
+    if args.command == "export":
+        reporter = Exporter(args.out, args.format, compress=args.gzip)
+
+    deadline = Deadline(args.deadline) if args.deadline else None
+    try:
+        with deadline or nullcontext():
+            run(connector, args, reporter)
+    except DeadlineExceeded as error:
+        logger.warning("Run stopped: {}", str(error))
+    finally:
+        if deadline is not None:
+            log_deadline(deadline)
+        if reporter is not None:
+            reporter.close()
+        if metrics is not None:
+            metrics.close()
+        if transport is not None:
+            transport.close()
+        connector.close()
+
 
 if __name__ == "__main__":
     main()
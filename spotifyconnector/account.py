@@ -0,0 +1,361 @@
+"""
+Account-level access to the inofficial Spotify podcast API.
+
+A :class:`SpotifyAccount` owns the login and the HTTP connection pool,
+and hands out a :class:`~spotifyconnector.connector.SpotifyConnector`
+per podcast.
+"""
+
+import datetime as dt
+from threading import Event, RLock, Thread
+from typing import TYPE_CHECKING, Iterator, Optional
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError
+
+from .auth import (
+    ACCOUNTS_URL,
+    CredentialsExpired,
+    _authorize_params,
+    _pkce_secrets,
+    _SpotifyAuth,
+    _token_data,
+)
+from .cache import ResponseCache
+from .deadline import deadline_timeout
+from .ratelimit import RateLimiter, UnlimitedRateLimiter, get_default_rate_limiter
+from .replay import Transport
+from .retry import AUTH_FAMILY, RetryPolicy
+from .singleflight import SingleFlight
+from .tokencache import FileTokenCache
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .connector import SpotifyConnector
+
+# Number of host pools and connections per host kept alive by the HTTP session
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+# Tokens are renewed by the background refresher this long before they expire,
+# which is ahead of the refresh on the request path
+BACKGROUND_REFRESH_MARGIN = dt.timedelta(minutes=10)
+# Seconds to wait before the background refresher retries after a failure
+BACKGROUND_RETRY_DELAY = 30
+# Seconds to wait for each request of the login
+LOGIN_TIMEOUT = 60
+
+
+def create_session(
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+    max_retries: int = 0,
+) -> requests.Session:
+    """
+    Creates a requests session with a pooled, keep-alive HTTP adapter
+    mounted for both http and https.
+
+    Args:
+        pool_connections (int): Number of host pools to cache.
+        pool_maxsize (int): Maximum number of connections kept per host.
+        pool_block (bool): Block instead of opening extra connections
+          when the pool is exhausted.
+        max_retries (int): Retries done by urllib3 on connection errors.
+          Defaults to 0, as retries are handled by the connector itself.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class SpotifyAccount(_SpotifyAuth):
+    """A Spotify login that can manage many podcasts.
+
+    The account owns the credentials, the Bearer token and the HTTP session,
+    so all podcasts it hands out with :meth:`podcast` share a single
+    authentication and connection pool.
+    """
+
+    def __init__(  # pylint: disable=too-many-locals
+        self,
+        base_url,
+        client_id,
+        sp_dc,
+        sp_key,
+        session: Optional[requests.Session] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        token_cache: Optional[FileTokenCache] = None,
+        background_refresh: bool = False,
+        response_cache: Optional[ResponseCache] = None,
+        accounts_url: str = ACCOUNTS_URL,
+        transport: Optional[Transport] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+    ):
+        """Initializes the SpotifyAccount object.
+
+        Args:
+            base_url (str): Base URL for the API.
+            client_id (str): Spotify Client ID for the API.
+            sp_dc (str): Spotify cookie.
+            sp_key (str): Spotify cookie.
+            session (Optional[requests.Session]): HTTP session to use for all
+              requests (optional). If this is not provided, a pooled session is
+              created and owned by the account.
+            pool_connections (int): Number of host pools to cache.
+              Ignored if ``session`` is provided.
+            pool_maxsize (int): Maximum number of connections kept per host.
+              Ignored if ``session`` is provided.
+            pool_block (bool): Block when the connection pool is exhausted.
+              Ignored if ``session`` is provided.
+            rate_limiter (Optional[RateLimiter]): Rate limiter for API requests
+              (optional). Defaults to the limiter shared by all connectors in
+              this process.
+            token_cache (Optional[FileTokenCache]): Cache to reuse Bearer tokens
+              across processes (optional). If this is not provided, the
+              account authenticates on its first request.
+            background_refresh (bool): Renew the Bearer token in a background
+              thread before it expires, so that requests never wait for
+              authentication once the first token has been retrieved.
+            response_cache (Optional[ResponseCache]): Cache for API responses
+              (optional), shared by all podcasts of the account.
+            accounts_url (str): Base URL of the Spotify accounts service.
+              Only changed for local stand-ins, e.g. in benchmarks.
+            transport (Optional[Transport]): Recorder or Replayer of API
+              responses (optional), mounted on the session. Replayed
+              requests skip the login and the rate limiter.
+            retry_policy (Optional[RetryPolicy]): How API requests and the
+              login are retried (optional), shared by all podcasts of the
+              account. Defaults to a RetryPolicy with jitter.
+        """
+        super().__init__(client_id, sp_dc, sp_key, accounts_url)
+        self.base_url = base_url
+
+        self._auth_lock = RLock()
+
+        # A single keep-alive session is shared by the data and auth calls,
+        # so connections (and TLS handshakes) are reused across requests
+        self._owns_session = session is None
+        self._session = session or create_session(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.transport = transport
+        if transport is not None:
+            transport.mount(self._session, base_url)
+        if transport is not None and not transport.online:
+            # Replayed responses need neither a login nor a request budget
+            self._bearer = "replay"
+            self._bearer_expires = dt.datetime.max
+            self.rate_limiter = rate_limiter or UnlimitedRateLimiter()
+        else:
+            self.rate_limiter = rate_limiter or get_default_rate_limiter()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._token_cache = token_cache
+        self.response_cache = response_cache
+        # Coalesces identical concurrent requests of all podcasts
+        self.single_flight = SingleFlight()
+
+        self._background_refresh = background_refresh
+        self._refresher: Optional[Thread] = None
+        self._closed = Event()
+
+    def podcast(self, podcast_id: Optional[str] = None) -> "SpotifyConnector":
+        """Returns a connector for one podcast of this account.
+
+        Args:
+            podcast_id (Optional[str]): Spotify Podcast ID (optional).
+              Without it, only account-level endpoints like
+              :meth:`SpotifyConnector.catalog` can be used.
+
+        Returns:
+            SpotifyConnector: Connector sharing this account's token and session.
+        """
+        # pylint: disable-next=import-outside-toplevel
+        from .connector import SpotifyConnector
+
+        return SpotifyConnector(
+            self.base_url,
+            self.client_id,
+            podcast_id,
+            self.sp_dc,
+            self.sp_key,
+            account=self,
+        )
+
+    def catalog(self, size: int = 200) -> Iterator[dict]:
+        """Iterates over all podcasts of this account.
+
+        See :meth:`SpotifyConnector.catalog`.
+        """
+        return self.podcast().catalog(size=size)
+
+    def close(self):
+        """Stops the background refresher and closes the HTTP session
+        if it is owned by the account."""
+        self._closed.set()
+        if self._refresher is not None and self._refresher.is_alive():
+            self._refresher.join()
+        if self._owns_session:
+            self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _authenticate(self):
+        """Retrieves a Bearer token for the inofficial Spotify API, valid 1 hour.
+        Retries on HTTP and network errors, following the retry policy.
+        """
+        self.retry_policy.call(
+            self._login,
+            retry_on=(
+                HTTPError,
+                requests.exceptions.ConnectionError,
+                requests.exceptions.Timeout,
+            ),
+            family=AUTH_FAMILY,
+        )
+
+    def _login(self):
+        """Runs the login flow once.
+
+        Generally follows the steps outlined here:
+        https://developer.spotify.com/documentation/general/guides/authorization/code-flow/
+        (with a few exceptions)
+        """
+        self._check_auth_poisoned()
+
+        with self._auth_lock:
+            logger.info("Retrieving Bearer")
+            state, code_verifier, code_challenge = _pkce_secrets()
+
+            logger.debug("Requesting User Authorization")
+            response = self._session.get(
+                self.authorize_url,
+                params=_authorize_params(self.client_id, code_challenge, state),
+                cookies={
+                    "sp_dc": self.sp_dc,
+                    "sp_key": self.sp_key,
+                },
+                timeout=deadline_timeout(LOGIN_TIMEOUT, AUTH_FAMILY),
+            )
+            logger.trace("response - {}", response.text)
+
+            # Raise an exception if we get a 4xx or 5xx response
+            response.raise_for_status()
+
+            # We get some weird HTML here that contains some JS
+            auth_code = self._extract_auth_code(response.text, state)
+
+            logger.debug("Requesting Bearer Token")
+            response = self._session.post(
+                self.token_url,
+                data=_token_data(self.client_id, auth_code, code_verifier),
+                timeout=deadline_timeout(LOGIN_TIMEOUT, AUTH_FAMILY),
+            )
+            response.raise_for_status()
+
+            self._store_token(response.json())
+
+            if self._token_cache is not None:
+                self._token_cache.store(
+                    self._token_cache_key(), self._bearer, self._bearer_expires
+                )
+
+    def _token_cache_key(self) -> str:
+        return self._token_cache.key(self.client_id, self.sp_dc, self.sp_key)
+
+    def _ensure_auth(self):
+        """Checks if Bearer token expires soon. If so, requests a new one.
+
+        If a token cache is configured, a cached token is used instead
+        when it is still valid.
+        """
+        # Fast path without the lock, so requests don't wait for
+        # a background refresh while the current token is still valid
+        if not self._needs_auth():
+            return
+
+        with self._auth_lock:
+            if self._needs_auth():
+                self._refresh_token(self._bearer)
+
+    def _reauthenticate(self, rejected_bearer: Optional[str]):
+        """Requests a new Bearer token after ``rejected_bearer`` got a 401.
+
+        Callers that were rejected with the same token share a single
+        re-authentication, the others wait for it and use the new token.
+        """
+        with self._auth_lock:
+            if self._bearer == rejected_bearer:
+                self._refresh_token(rejected_bearer)
+
+    def _refresh_token(self, stale_bearer: Optional[str]):
+        """Replaces ``stale_bearer`` with a valid token from the token cache
+        or from a new authentication. Must be called with ``_auth_lock`` held.
+        """
+        if self._token_cache is None:
+            self._authenticate()
+        else:
+            # Hold the cache lock, so that concurrent processes with the same
+            # credentials wait for the token instead of authenticating again
+            key = self._token_cache_key()
+            with self._token_cache.lock(key):
+                cached = self._token_cache.load(key)
+                if cached is not None and cached[0] != stale_bearer:
+                    self._bearer, self._bearer_expires = cached
+                if self._needs_auth() or self._bearer == stale_bearer:
+                    self._authenticate()
+                else:
+                    logger.debug("Using cached Bearer token")
+
+        if self._background_refresh and self._refresher is None:
+            self._refresher = Thread(
+                target=self._refresh_in_background,
+                name="spotifyconnector-token-refresh",
+                daemon=True,
+            )
+            self._refresher.start()
+
+    def _refresh_in_background(self):
+        """Renews the Bearer token ahead of its expiry until the account
+        is closed."""
+        while True:
+            refresh_at = self._bearer_expires - BACKGROUND_REFRESH_MARGIN
+            wait = max(0.0, (refresh_at - dt.datetime.now()).total_seconds())
+            if self._closed.wait(wait):
+                return
+
+            try:
+                with self._auth_lock:
+                    # Skip if the token was renewed on the request path meanwhile
+                    if self._bearer_expires - BACKGROUND_REFRESH_MARGIN <= (
+                        dt.datetime.now()
+                    ):
+                        logger.debug("Refreshing Bearer token in the background")
+                        self._refresh_token(self._bearer)
+            except CredentialsExpired as error:
+                logger.error("Stopping background token refresh: {}", str(error))
+                return
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                # Requests still authenticate on their own if the token expires
+                logger.warning("Background token refresh failed: {}", str(error))
+                if self._closed.wait(BACKGROUND_RETRY_DELAY):
+                    return
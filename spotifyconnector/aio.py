@@ -0,0 +1,475 @@
+"""
+This module provides an asyncio variant of the SpotifyConnector, built on httpx.
+
+It requires the ``async`` extra:
+
+    pip install spotifyconnector[async]
+"""
+
+import asyncio
+import datetime as dt
+from typing import AsyncIterator, Dict, Optional
+
+from loguru import logger
+
+try:
+    import httpx
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        "AsyncSpotifyConnector requires httpx. "
+        "Install it with `pip install spotifyconnector[async]`."
+    ) from error
+
+from .account import LOGIN_TIMEOUT
+from .auth import (
+    ACCOUNTS_URL,
+    _authorize_params,
+    _pkce_secrets,
+    _SpotifyAuth,
+    _token_data,
+)
+from .cache import ResponseCache
+from .connector import DEFAULT_TIMEOUT, MaxRetriesException, _SpotifyBase
+from .deadline import Timeout, check_deadline, current_deadline, deadline_timeout
+from .ratelimit import parse_retry_after
+from .retry import AUTH_FAMILY, RetryPolicy
+
+# Maximum number of requests in flight at the same time
+DEFAULT_MAX_CONCURRENCY = 10
+
+
+def _login_timeout() -> httpx.Timeout:
+    """Returns the timeout of a login request, cut to the current deadline"""
+    connect, read = deadline_timeout(LOGIN_TIMEOUT, AUTH_FAMILY)
+    return httpx.Timeout(read, connect=connect)
+
+
+class AsyncSpotifyConnector(_SpotifyBase, _SpotifyAuth):
+    """Asyncio representation of the inofficial Spotify podcast API.
+
+    Provides the same endpoint methods as
+    :class:`~spotifyconnector.connector.SpotifyConnector`, as coroutines.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        client_id,
+        podcast_id,
+        sp_dc,
+        sp_key,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        response_cache: Optional[ResponseCache] = None,
+        accounts_url: str = ACCOUNTS_URL,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        endpoint_timeouts: Optional[Dict[str, Timeout]] = None,
+    ):
+        """Initializes the AsyncSpotifyConnector object.
+
+        Args:
+            base_url (str): Base URL for the API.
+            client_id (str): Spotify Client ID for the API.
+            podcast_id (str): Spotify Podcast ID for the API.
+            sp_dc (str): Spotify cookie.
+            sp_key (str): Spotify cookie.
+            client (Optional[httpx.AsyncClient]): HTTP client to use for all
+              requests (optional). If this is not provided, a pooled client is
+              created and owned by the connector.
+            max_concurrency (int): Maximum number of API requests in flight.
+            response_cache (Optional[ResponseCache]): Cache for API responses
+              (optional).
+            accounts_url (str): Base URL of the Spotify accounts service.
+              Only changed for local stand-ins, e.g. in benchmarks.
+            retry_policy (Optional[RetryPolicy]): How requests and the login
+              are retried (optional), see :mod:`spotifyconnector.retry`.
+            timeout (Timeout): Seconds to wait for a connection and for each
+              read of an API response, as one value or a (connect, read) pair.
+            endpoint_timeouts (Optional[Dict[str, Timeout]]): Timeouts of
+              single endpoints by method name (optional).
+        """
+        _SpotifyBase.__init__(self, base_url, podcast_id, timeout, endpoint_timeouts)
+        _SpotifyAuth.__init__(self, client_id, sp_dc, sp_key, accounts_url)
+
+        # Only one coroutine authenticates, the others wait for its token
+        self._auth_lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._response_cache = response_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=60,
+        )
+
+    async def aclose(self):
+        """Closes the HTTP client if it is owned by the connector."""
+        if self._owns_client:
+            await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _fetch_token(self):
+        state, code_verifier, code_challenge = _pkce_secrets()
+
+        logger.debug("Requesting User Authorization")
+        response = await self._client.get(
+            self.authorize_url,
+            params=_authorize_params(self.client_id, code_challenge, state),
+            headers={"Cookie": f"sp_dc={self.sp_dc}; sp_key={self.sp_key}"},
+            timeout=_login_timeout(),
+        )
+        logger.trace("response - {}", response.text)
+
+        # Raise an exception if we get a 4xx or 5xx response
+        response.raise_for_status()
+
+        auth_code = self._extract_auth_code(response.text, state)
+
+        logger.debug("Requesting Bearer Token")
+        response = await self._client.post(
+            self.token_url,
+            data=_token_data(self.client_id, auth_code, code_verifier),
+            timeout=_login_timeout(),
+        )
+        response.raise_for_status()
+
+        self._store_token(response.json())
+
+    async def _authenticate(self):
+        """Retrieves a Bearer token for the inofficial Spotify API, valid 1 hour.
+
+        Must be called with ``_auth_lock`` held.
+        """
+        self._check_auth_poisoned()
+
+        logger.info("Retrieving Bearer")
+        policy = self.retry_policy
+        breaker = policy.breaker(AUTH_FAMILY)
+        delay = policy.base_delay
+        for attempt in range(policy.max_attempts):
+            breaker.check()
+            try:
+                await self._fetch_token()
+                breaker.on_success()
+                return
+            except (httpx.HTTPStatusError, httpx.TransportError) as error:
+                deadline = current_deadline()
+                if deadline is not None and deadline.expired:
+                    # Timed out because of the deadline, not the login
+                    raise deadline.cancel(AUTH_FAMILY) from error
+                breaker.on_failure()
+                if attempt == policy.max_attempts - 1:
+                    raise
+                delay = policy.next_delay(delay)
+                logger.info(
+                    "Authentication failed: {} (attempt {}/{}), next delay: {:.1f}s",
+                    str(error),
+                    attempt + 1,
+                    policy.max_attempts,
+                    delay,
+                )
+                check_deadline(AUTH_FAMILY, delay)
+                await asyncio.sleep(delay)
+
+    async def _ensure_auth(self):
+        """Checks if Bearer token expires soon. If so, requests a new one."""
+        # Fast path without the lock while the current token is still valid
+        if not self._needs_auth():
+            return
+
+        async with self._auth_lock:
+            if self._needs_auth():
+                await self._authenticate()
+
+    async def _reauthenticate(self, rejected_bearer: Optional[str]):
+        """Requests a new Bearer token after ``rejected_bearer`` got a 401.
+
+        Callers that were rejected with the same token share a single
+        re-authentication.
+        """
+        async with self._auth_lock:
+            if self._bearer == rejected_bearer:
+                await self._authenticate()
+
+    async def _request(
+        self, url: str, *, params: Optional[Dict[str, str]] = None
+    ) -> dict:
+        cache = self._response_cache
+        if cache is None:
+            return await self._fetch(url, params=params)
+
+        endpoint = self._endpoint_name(url)
+        response = cache.get(endpoint, url, params)
+        if response is None:
+            response = await self._fetch(url, params=params)
+            cache.set(endpoint, url, params, response)
+        return response
+
+    # pylint: disable-next=too-many-statements,too-many-locals,too-many-branches
+    async def _fetch(
+        self, url: str, *, params: Optional[Dict[str, str]] = None
+    ) -> dict:
+        logger.trace("url = {}", url)
+        endpoint = self._endpoint_name(url)
+        policy = self.retry_policy
+        breaker = policy.breaker(endpoint)
+        deadline = current_deadline()
+        delay = policy.base_delay
+
+        last_status_code = None
+        last_exception = None
+
+        for attempt in range(policy.max_attempts):
+            # Fail fast while the endpoint family is paused or time is up
+            breaker.check()
+            if deadline is not None:
+                deadline.check(endpoint)
+
+            # Only try to authenticate if we haven't had network errors recently
+            if attempt == 0 or last_exception is None:
+                await self._ensure_auth()
+
+            bearer = self._bearer
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    connect, read = self._timeout(endpoint)
+                    response = await self._client.get(
+                        url,
+                        params=params,
+                        headers={"Authorization": f"Bearer {bearer}"},
+                        timeout=httpx.Timeout(read, connect=connect),
+                    )
+            except httpx.TransportError as e:
+                if deadline is not None and deadline.expired:
+                    # Timed out because of the deadline, not the endpoint
+                    raise deadline.cancel(endpoint) from e
+                last_exception = e
+                message, args = 'Network error for URL "{}": {}', (url, str(e))
+            else:
+                if response.status_code == 401:
+                    last_status_code = response.status_code
+                    await self._reauthenticate(bearer)
+                    continue
+
+                if response.status_code not in policy.retry_statuses:
+                    if not response.is_success:
+                        logger.error("Error in API:")
+                        logger.info(response.status_code)
+                        logger.info(response.headers)
+                        logger.info(response.text)
+                        response.raise_for_status()
+
+                    breaker.on_success()
+                    if deadline is not None:
+                        deadline.finish(endpoint)
+                    # Only decode the body for the log if it is emitted
+                    # pylint: disable-next=cell-var-from-loop
+                    logger.opt(lazy=True).trace("response = {}", lambda: response.text)
+                    return response.json()
+
+                last_status_code = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                message, args = 'Got {} for URL "{}"', (response.status_code, url)
+
+            breaker.on_failure()
+            if attempt == policy.max_attempts - 1:
+                break
+            delay = policy.next_delay(delay, retry_after)
+            logger.log(
+                ("INFO" if attempt < 3 else "WARNING"),
+                message + " (attempt {}/{}), next delay: {:.1f}s",
+                *args,
+                attempt + 1,
+                policy.max_attempts,
+                delay,
+            )
+            if deadline is not None:
+                deadline.check(endpoint, delay)
+            await asyncio.sleep(delay)
+
+        # If we get here, all retries failed
+        if last_exception:
+            raise last_exception
+        raise MaxRetriesException(url, last_status_code, policy.max_attempts)
+
+    async def metadata(self, episode=None) -> dict:
+        """Loads metadata for podcast or episode.
+
+        See :meth:`SpotifyConnector.metadata`.
+        """
+        url = self._show_or_episode_url("metadata", episode)
+        return await self._request(url)
+
+    async def streams(
+        self,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+        episode=None,
+    ) -> dict:
+        """Loads podcast/episode stream data.
+
+        See :meth:`SpotifyConnector.streams`.
+        """
+        if end is None:
+            end = start
+
+        url = self._show_or_episode_url("detailedStreams", episode)
+        return await self._request(url, params=self._date_params(start, end))
+
+    async def listeners(
+        self,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+        episode=None,
+    ) -> dict:
+        """Loads podcast/episode listener data.
+
+        See :meth:`SpotifyConnector.listeners`.
+        """
+        if end is None:
+            end = start
+
+        url = self._show_or_episode_url("listeners", episode)
+        return await self._request(url, params=self._date_params(start, end))
+
+    async def followers(
+        self,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+    ) -> dict:
+        """Loads podcast follower data.
+
+        See :meth:`SpotifyConnector.followers`.
+        """
+        if end is None:
+            end = start
+
+        url = self._build_url(
+            "shows",
+            self.podcast_id,
+            "followers",
+        )
+        return await self._request(url, params=self._date_params(start, end))
+
+    async def impressions(
+        self,
+        kind: str = "total",
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+    ) -> dict:
+        """Loads podcast impression data.
+
+        See :meth:`SpotifyConnector.impressions`.
+        """
+        url, params = self._impressions_request(kind, start, end)
+        return await self._request(url, params=params)
+
+    async def aggregate(
+        self,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+        episode=None,
+    ) -> dict:
+        """Loads podcast/episode aggregate data.
+
+        See :meth:`SpotifyConnector.aggregate`.
+        """
+        if end is None:
+            end = start
+
+        url = self._show_or_episode_url("aggregate", episode)
+        return await self._request(url, params=self._date_params(start, end))
+
+    async def episodes(
+        self,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+        page: int = 1,
+        size: int = 50,
+        sort_by: str = "releaseDate",
+        sort_order: str = "descending",
+        filter_by: str = "",
+    ) -> AsyncIterator[dict]:
+        """Iterates over all episodes (handles pagination).
+
+        See :meth:`SpotifyConnector.episodes`.
+        """
+        if end is None:
+            end = start
+
+        url = self._build_url(
+            "shows",
+            self.podcast_id,
+            "episodes",
+        )
+        date_params = self._date_params(start, end)
+
+        while True:
+            # Stop between pages, also if they are cached
+            check_deadline("episodes")
+            response = await self._request(
+                url,
+                params=self._episodes_params(
+                    date_params, page, size, sort_by, sort_order, filter_by
+                ),
+            )
+            for episode in response["episodes"]:
+                yield episode
+
+            if page == response["totalPages"]:
+                break
+
+            page += 1
+
+    async def catalog(self, size: int = 200) -> AsyncIterator[dict]:
+        """Iterates over the podcasts of the account (handles pagination).
+
+        See :meth:`SpotifyConnector.catalog`.
+        """
+        url = self._build_url("user", "shows")
+
+        page = 1
+        while True:
+            check_deadline("catalog")
+            response = await self._request(url, params=self._catalog_params(page, size))
+            for show in response.get("shows", []):
+                yield show
+
+            if self._is_last_catalog_page(response, page, size):
+                break
+
+            page += 1
+
+    async def performance(
+        self,
+        episode: str,
+    ) -> dict:
+        """Gets the episode performance data for a given episode.
+
+        See :meth:`SpotifyConnector.performance`.
+        """
+        url = self._build_url(
+            "episodes",
+            episode,
+            "performance",
+        )
+        return await self._request(url)
+
+    async def me(self) -> dict:
+        """Gets the user data for the current user.
+
+        See :meth:`SpotifyConnector.me`.
+        """
+        url = self._build_url("user", "me")
+        return await self._request(url)
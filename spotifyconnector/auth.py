@@ -0,0 +1,196 @@
+"""
+Authentication against the inofficial Spotify podcast API.
+
+The connectors log in with the ``sp_dc`` and ``sp_key`` cookies, using the
+authorization code flow with PKCE that the podcasters dashboard uses.
+"""
+
+import base64
+import datetime as dt
+import hashlib
+import re
+import secrets
+import string
+from typing import Optional, Tuple
+
+from loguru import logger
+
+from .jsobject import decode_js_object
+
+ACCOUNTS_URL = "https://accounts.spotify.com"
+AUTHORIZE_PATH = "/oauth2/v2/auth"
+TOKEN_PATH = "/api/token"
+AUTHORIZE_URL = ACCOUNTS_URL + AUTHORIZE_PATH
+TOKEN_URL = ACCOUNTS_URL + TOKEN_PATH
+REDIRECT_URI = "https://podcasters.spotify.com"
+# Tokens are renewed on the request path this long before they expire
+REFRESH_MARGIN = dt.timedelta(minutes=5)
+
+
+class CredentialsExpired(Exception):
+    """CredentialsExpired is raised when the Spotify API asks for a login
+    This is usually because the cookies have expired.
+    """
+
+
+def _random_string(
+    length: int,
+    chars: str = string.ascii_lowercase + string.ascii_uppercase + string.digits,
+) -> str:
+    """
+    Simple helper function to generate random strings
+    suitable for use with Spotify
+    """
+    return "".join(secrets.choice(chars) for _ in range(length))
+
+
+def _pkce_secrets() -> Tuple[str, str, str]:
+    """
+    Generates the state, code verifier and code challenge for the PKCE flow.
+    """
+    logger.debug("Generating secrets")
+
+    state = _random_string(32)
+
+    code_verifier = _random_string(64)
+    code_challenge = base64.b64encode(
+        hashlib.sha256(code_verifier.encode("utf-8")).digest()
+    ).decode("utf-8")
+
+    # Fix up format of code_challenge for spotify
+    code_challenge = re.sub(r"=+$", "", code_challenge)
+    code_challenge = code_challenge.replace("/", "_")
+    code_challenge = code_challenge.replace("+", "-")
+
+    logger.trace("state = {}", state)
+    logger.trace("code_verifier = {}", code_verifier)
+    logger.trace("code_challenge = {}", code_challenge)
+
+    return state, code_verifier, code_challenge
+
+
+def _authorize_params(client_id: str, code_challenge: str, state: str) -> dict:
+    """
+    Query parameters for the user authorization request.
+    """
+    return {
+        "response_type": "code",
+        "client_id": client_id,
+        "scope": "streaming ugc-image-upload user-read-email user-read-private",
+        "redirect_uri": REDIRECT_URI,
+        "code_challenge": code_challenge,
+        "code_challenge_method": "S256",
+        "state": state,
+        "response_mode": "web_message",
+        "prompt": "none",
+    }
+
+
+def _token_data(client_id: str, auth_code: str, code_verifier: str) -> dict:
+    """
+    Form data for the bearer token request.
+    """
+    return {
+        "grant_type": "authorization_code",
+        "client_id": client_id,
+        "code": auth_code,
+        "redirect_uri": REDIRECT_URI,
+        "code_verifier": code_verifier,
+    }
+
+
+class AuthenticationError(Exception):
+    """
+    Raised when authentication returns an unexpected response.
+    It is not retried, as another attempt would get the same response.
+    """
+
+
+class _SpotifyAuth:  # pylint: disable=too-few-public-methods
+    """
+    Credentials and Bearer token state, and the parsing of the auth flow,
+    shared by the sync account and the async connector.
+    """
+
+    def __init__(
+        self,
+        client_id,
+        sp_dc,
+        sp_key,
+        accounts_url: str = ACCOUNTS_URL,
+    ):
+        self.client_id = client_id
+        self.sp_dc = sp_dc
+        self.sp_key = sp_key
+        # Configurable for local stand-ins of the accounts service
+        self.authorize_url = accounts_url.rstrip("/") + AUTHORIZE_PATH
+        self.token_url = accounts_url.rstrip("/") + TOKEN_PATH
+
+        self._bearer: Optional[str] = None
+        self._bearer_expires: Optional[dt.datetime] = None
+        # Flag to indicate that auth has failed and we should not retry
+        # (to avoid spamming Spotify with requests and risking a ban)
+        self._auth_poisoned = False
+
+    def _check_auth_poisoned(self):
+        if self._auth_poisoned:
+            raise CredentialsExpired(
+                "Authentication has failed, not retrying. "
+                "Check credentials and try again."
+            )
+
+    def _needs_auth(self) -> bool:
+        """Checks if the Bearer token is missing or expires soon."""
+        return (
+            self._bearer is None
+            or self._bearer_expires - REFRESH_MARGIN <= dt.datetime.now()
+        )
+
+    def _extract_auth_code(self, html: str, state: str) -> str:
+        """Extracts the authorization code from the authorize HTML page."""
+        logger.trace("html = {}", html)
+
+        # At this point, we should have an HTTP response,
+        # but it could be an error page, containing an error message like
+        # response: {
+        #   "error": "login_required",
+        #   "state": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"
+        # }
+        # Check for this error case and raise an exception if we find it
+        # to avoid getting stuck in a loop
+        if "login_required" in html:
+            self._auth_poisoned = True
+            raise CredentialsExpired("Login required (credentials cookie expired?)")
+
+        match = re.search(r"const authorizationResponse\s*=", html)
+        if match is None:
+            raise ValueError("No authorization response in the authorize page")
+
+        # The object isn't strictly valid JSON (unquoted keys, single quotes)
+        auth_response, _ = decode_js_object(html, match.end())
+
+        # Confirm that auth was successful
+        if auth_response["type"] != "authorization_response":
+            raise AuthenticationError(
+                f"Expected authorization_response, got {auth_response['type']}"
+            )
+        if auth_response["response"]["state"] != state:
+            raise AuthenticationError(
+                "State parameter mismatch in authentication response"
+            )
+
+        auth_code = auth_response["response"]["code"]
+
+        logger.trace("auth_code = {}", auth_code)
+
+        return auth_code
+
+    def _store_token(self, response_json: dict):
+        """Stores the Bearer token from the token endpoint response."""
+        self._bearer = response_json["access_token"]
+        expires_in = response_json["expires_in"]
+        self._bearer_expires = dt.datetime.now() + dt.timedelta(seconds=expires_in)
+
+        logger.trace("bearer = {}", self._bearer)
+
+        logger.success("Bearer token retrieved!")
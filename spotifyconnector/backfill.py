@@ -0,0 +1,97 @@
+"""
+Historical backfill, which splits a long date range into chunks that are
+requested concurrently, and merges their per-day rows back in date order.
+"""
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from loguru import logger
+
+# Endpoints that return per-day rows and can be backfilled
+BACKFILL_ENDPOINTS = ("streams", "listeners", "followers")
+# Days requested per chunk
+DEFAULT_CHUNK_DAYS = 30
+# Number of chunks requested at the same time
+DEFAULT_BACKFILL_CONCURRENCY = 4
+
+
+@dataclass
+class BackfillChunk:
+    """A date range of a backfill.
+
+    Attributes:
+        start (dt.date): First day of the chunk.
+        end (dt.date): Last day of the chunk.
+        error (Optional[Exception]): Error of the request, if it failed.
+    """
+
+    start: dt.date
+    end: dt.date
+    error: Optional[Exception] = None
+
+
+def date_chunks(start: dt.date, end: dt.date, chunk_days: int) -> List[BackfillChunk]:
+    """Splits the days from ``start`` to ``end`` (inclusive)
+    into chunks of at most ``chunk_days`` days."""
+    if chunk_days < 1:
+        raise ValueError("chunk_days must be at least 1")
+
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + dt.timedelta(days=chunk_days - 1))
+        chunks.append(BackfillChunk(start, chunk_end))
+        start = chunk_end + dt.timedelta(days=1)
+    return chunks
+
+
+def day_rows(response: dict) -> List[dict]:
+    """Returns the per-day rows of a response in date order.
+
+    These are the items of its lists (e.g. ``detailedStreams`` or ``counts``)
+    that have a ``date``.
+    """
+    rows = [
+        row
+        for value in response.values()
+        if isinstance(value, list)
+        for row in value
+        if isinstance(row, dict) and "date" in row
+    ]
+    return sorted(rows, key=lambda row: row["date"])
+
+
+class Backfill:  # pylint: disable=too-few-public-methods
+    """Iterates over the per-day rows of a backfill in date order.
+
+    Chunks that failed are skipped and collected in :attr:`failed`,
+    so they can be requested again once iteration is done.
+    """
+
+    def __init__(self, results: Iterable[Tuple[BackfillChunk, Optional[dict]]]):
+        """Initializes the Backfill object.
+
+        Args:
+            results (Iterable[Tuple[BackfillChunk, Optional[dict]]]):
+              Chunks in date order with their response (or None if the
+              request failed).
+        """
+        self._results = results
+        self.failed: List[BackfillChunk] = []
+
+    def __iter__(self) -> Iterator[dict]:
+        for chunk, response in self._results:
+            if chunk.error is not None:
+                logger.warning(
+                    "Backfill chunk {} to {} failed: {}",
+                    chunk.start,
+                    chunk.end,
+                    str(chunk.error),
+                )
+                self.failed.append(chunk)
+                continue
+            yield from day_rows(response)
+
+        if self.failed:
+            logger.warning("{} backfill chunks failed", len(self.failed))
@@ -0,0 +1,126 @@
+"""
+Batches of endpoint calls, which run concurrently on one connector and
+return a result or an error per call, in the order of the calls.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .connector import SpotifyConnector
+
+# Connector methods that can be called in a batch
+BATCH_METHODS = (
+    "metadata",
+    "streams",
+    "listeners",
+    "followers",
+    "impressions",
+    "aggregate",
+    "episodes",
+    "catalog",
+    "performance",
+    "me",
+)
+# Number of calls running at the same time
+DEFAULT_BATCH_CONCURRENCY = 8
+
+
+@dataclass
+class Call:
+    """A call of a connector method.
+
+    Attributes:
+        method (str): Name of the method, e.g. ``streams``.
+        args (Tuple): Positional arguments.
+        kwargs (Dict[str, Any]): Keyword arguments.
+    """
+
+    method: str
+    args: Tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, descriptor) -> "Call":
+        """Returns the call of a descriptor: a Call, a method name or a tuple
+        of a method name and its positional arguments."""
+        if isinstance(descriptor, Call):
+            return descriptor
+        if isinstance(descriptor, str):
+            return cls(descriptor)
+        method, *args = descriptor
+        return cls(method, tuple(args))
+
+
+def call(method: str, *args, **kwargs) -> Call:
+    """Returns a call of a connector method with the given arguments."""
+    return Call(method, args, kwargs)
+
+
+@dataclass
+class BatchResult:
+    """The outcome of a call in a batch.
+
+    Attributes:
+        call (Call): The call.
+        value (Any): Return value of the call, if it succeeded. Iterators
+          (e.g. of ``episodes``) are read into lists.
+        error (Optional[Exception]): Error of the call, if it failed.
+    """
+
+    call: Call
+    value: Any = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the call succeeded."""
+        return self.error is None
+
+    def result(self) -> Any:
+        """Returns the value of the call, or raises its error."""
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def _execute(connector: "SpotifyConnector", batch_call: Call) -> BatchResult:
+    """Runs a call and returns its value or error"""
+    try:
+        value = getattr(connector, batch_call.method)(
+            *batch_call.args, **batch_call.kwargs
+        )
+        if isinstance(value, Iterator):
+            value = list(value)
+        return BatchResult(batch_call, value)
+    except Exception as error:  # pylint: disable=broad-except
+        return BatchResult(batch_call, error=error)
+
+
+def run_batch(
+    connector: "SpotifyConnector",
+    calls: Iterable,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+) -> List[BatchResult]:
+    """Runs calls of a connector concurrently. See
+    :meth:`~spotifyconnector.connector.SpotifyConnector.batch`."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    calls = [Call.of(descriptor) for descriptor in calls]
+    for batch_call in calls:
+        if batch_call.method not in BATCH_METHODS:
+            raise ValueError(f"Method {batch_call.method} can't be called in a batch")
+    if not calls:
+        return []
+
+    with ThreadPoolExecutor(
+        max_workers=min(concurrency, len(calls)),
+        thread_name_prefix="spotifyconnector-batch",
+    ) as executor:
+        futures = [
+            executor.submit(copy_context().run, _execute, connector, batch_call)
+            for batch_call in calls
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,299 @@
+"""
+Response caches for the Spotify API, so repeated requests for the same data
+are answered without going to the network.
+
+Entries are keyed by URL and normalized query parameters. The time to live
+depends on the endpoint, and responses for date ranges that ended a few days
+ago get a long time to live, as Spotify does not change that data anymore.
+Ranges that include recent days are only cached briefly.
+"""
+
+import copy
+import datetime as dt
+import hashlib
+import json
+import os
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from loguru import logger
+
+from .fileutil import default_cache_dir, write_json_atomic
+
+# Seconds a response is cached, unless configured per endpoint
+DEFAULT_TTL = 5 * 60
+# Seconds a response for a date range in the past is cached
+DEFAULT_HISTORY_TTL = 30 * 24 * 60 * 60
+# Days after which the data of a date range does not change anymore
+DEFAULT_SETTLED_DAYS = 3
+# Maximum number of responses kept in memory
+DEFAULT_MAX_ENTRIES = 1024
+
+
+@dataclass
+class CacheStats:
+    """Counters of a response cache.
+
+    Attributes:
+        hits (int): Requests answered from the cache.
+        misses (int): Requests not found in the cache (or expired).
+        evictions (int): Entries removed to make room for new ones.
+        expirations (int): Entries removed because their TTL was over.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+class ResponseCache(ABC):
+    """Base class of the response caches, which implements the TTL policy
+    and the counters. Subclasses store the entries.
+    """
+
+    # Wall clock time, as expiry times of disk entries outlive the process
+    _clock = staticmethod(time)
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        endpoint_ttls: Optional[Dict[str, float]] = None,
+        history_ttl: float = DEFAULT_HISTORY_TTL,
+        settled_days: int = DEFAULT_SETTLED_DAYS,
+    ):
+        """Initializes the ResponseCache object.
+
+        Args:
+            ttl (float): Seconds a response is cached by default.
+            endpoint_ttls (Optional[Dict[str, float]]): Seconds a response is
+              cached per endpoint, by connector method name (e.g.
+              ``{"metadata": 3600, "episodes": 0}``). A TTL of 0 disables
+              caching for the endpoint.
+            history_ttl (float): Seconds a response is cached if its date range
+              ended at least ``settled_days`` days ago.
+            settled_days (int): Days after which data is not expected to change.
+        """
+        self.ttl = ttl
+        self.endpoint_ttls = dict(endpoint_ttls or {})
+        self.history_ttl = history_ttl
+        self.settled_days = settled_days
+
+        self._stats = CacheStats()
+        self._stats_lock = Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the hit, miss and eviction counters."""
+        with self._stats_lock:
+            return replace(self._stats)
+
+    def _count(self, counter: str, value: int = 1):
+        with self._stats_lock:
+            setattr(self._stats, counter, getattr(self._stats, counter) + value)
+
+    @staticmethod
+    def key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Returns the cache key of a request, independent of the
+        order of its params."""
+        if not params:
+            return url
+        query = sorted((str(name), str(value)) for name, value in params.items())
+        return f"{url}?{urlencode(query)}"
+
+    def ttl_for(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> float:
+        """Returns the seconds a response of ``endpoint`` is cached."""
+        ttl = self.endpoint_ttls.get(endpoint, self.ttl)
+        if ttl <= 0:
+            return 0
+
+        end = (params or {}).get("end")
+        try:
+            end = dt.datetime.strptime(end, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return ttl
+        settled = dt.date.today() - dt.timedelta(days=self.settled_days)
+        if end <= settled:
+            return max(ttl, self.history_ttl)
+        return ttl
+
+    def get(
+        self, endpoint: str, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> Optional[Any]:
+        """Returns the cached response of a request, if any."""
+        if self.ttl_for(endpoint, params) <= 0:
+            return None
+
+        entry = self._load(self.key(url, params))
+        if entry is None:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+        logger.trace("cache hit = {}", url)
+        return entry
+
+    def set(
+        self,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        response: Any,
+    ):
+        """Caches the response of a request."""
+        ttl = self.ttl_for(endpoint, params)
+        if ttl > 0:
+            self._store(self.key(url, params), self._clock() + ttl, response)
+
+    @abstractmethod
+    def _load(self, key: str) -> Optional[Any]:
+        """Returns the response stored for ``key`` unless it has expired."""
+
+    @abstractmethod
+    def _store(self, key: str, expires: float, response: Any):
+        """Stores a response for ``key`` until the ``expires`` timestamp."""
+
+    @abstractmethod
+    def clear(self):
+        """Removes all entries."""
+
+
+class MemoryCache(ResponseCache):
+    """Thread-safe in-memory response cache with LRU eviction."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, **kwargs):
+        """Initializes the MemoryCache object.
+
+        Args:
+            max_entries (int): Maximum number of responses kept. The least
+              recently used entry is evicted when the cache is full.
+            **kwargs: Arguments passed to :class:`ResponseCache`.
+        """
+        super().__init__(**kwargs)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires <= self._clock():
+                del self._entries[key]
+                self._count("expirations")
+                return None
+            self._entries.move_to_end(key)
+        # Callers get their own copy, so they can't modify the cached response
+        return copy.deepcopy(response)
+
+    def _store(self, key: str, expires: float, response: Any):
+        response = copy.deepcopy(response)
+        with self._lock:
+            self._entries[key] = (expires, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._count("evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache(ResponseCache):
+    """Response cache that stores one JSON file per response in a directory,
+    so it is shared by processes and survives restarts.
+    """
+
+    def __init__(self, directory=None, max_entries: Optional[int] = None, **kwargs):
+        """Initializes the FileCache object.
+
+        Args:
+            directory (Optional[str]): Directory to store responses in.
+              Defaults to ``~/.cache/spotifyconnector/responses``.
+            max_entries (Optional[int]): Maximum number of responses kept
+              (optional). The least recently used files are removed when
+              the cache is full. Unlimited if this is not provided.
+            **kwargs: Arguments passed to :class:`ResponseCache`.
+        """
+        super().__init__(**kwargs)
+        self.directory = (
+            Path(directory) if directory else default_cache_dir("responses")
+        )
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self.directory / f"{digest}.json"
+
+    def _load(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            expires, response = data["expires"], data["response"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning("Ignoring unreadable response cache entry: {}", error)
+            return None
+
+        if expires <= self._clock():
+            self._unlink(path)
+            self._count("expirations")
+            return None
+
+        # The modification time tracks the last use for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return response
+
+    def _store(self, key: str, expires: float, response: Any):
+        write_json_atomic(
+            self._path(key), {"expires": expires, "key": key, "response": response}
+        )
+        if self.max_entries is not None:
+            self._evict()
+
+    def _evict(self):
+        paths = list(self.directory.glob("*.json"))
+        if len(paths) <= self.max_entries:
+            return
+
+        def last_used(path: Path) -> float:
+            try:
+                return path.stat().st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        paths.sort(key=last_used)
+        for path in paths[: len(paths) - self.max_entries]:
+            if self._unlink(path):
+                self._count("evictions")
+
+    @staticmethod
+    def _unlink(path: Path) -> bool:
+        try:
+            path.unlink()
+            return True
+        except FileNotFoundError:
+            # Removed by another process meanwhile
+            return False
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            self._unlink(path)
@@ -0,0 +1,201 @@
+"""
+Columnar time series of the daily streams, listeners and followers data.
+
+The responses of these endpoints hold one dict per day. :class:`TimeSeries`
+keeps the same data in contiguous ``array("q")`` columns instead: dates as
+ordinals (``dt.date.toordinal``) and one column per count. Series of many
+episodes or date windows can be concatenated without creating an object per
+row, and the columns can be viewed as NumPy arrays without copying if NumPy
+is installed.
+"""
+
+import datetime as dt
+from array import array
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+# Type code of all columns: signed 64-bit integers
+TYPECODE = "q"
+
+# Rows converted at once, bounds the memory of streamed rows
+BATCH_SIZE = 4096
+
+DATE_FIELD = "date"
+SOURCE_FIELD = "source"
+
+
+# Series of many episodes or windows share their dates, parse each once
+@lru_cache(maxsize=1 << 16)
+def _ordinal(value: str) -> int:
+    # Dates may come with a time part
+    return dt.date.fromisoformat(value[:10]).toordinal()
+
+
+def _count_fields(row: Dict[str, Any]) -> List[str]:
+    return [
+        key
+        for key, value in row.items()
+        if key != DATE_FIELD and isinstance(value, int) and not isinstance(value, bool)
+    ]
+
+
+class TimeSeries:
+    """Daily rows of one or more responses as columns.
+
+    Attributes:
+        dates (array): Date of each row as ordinal.
+        columns (Dict[str, array]): One column per count, e.g. ``starts``.
+        labels (list): Label of each concatenated part, e.g. episode IDs.
+        sources (array): Index into ``labels`` of each row.
+    """
+
+    def __init__(
+        self,
+        fields: Sequence[str] = (),
+        label: Optional[Hashable] = None,
+    ):
+        """Initializes an empty TimeSeries object.
+
+        Args:
+            fields (Sequence[str]): Names of the count columns.
+            label (Optional[Hashable]): Label of the rows (optional).
+        """
+        self.dates = array(TYPECODE)
+        self.columns: Dict[str, array] = {field: array(TYPECODE) for field in fields}
+        self.labels: List[Optional[Hashable]] = [label]
+        self.sources = array(TYPECODE)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Dict[str, Any]],
+        fields: Optional[Sequence[str]] = None,
+        label: Optional[Hashable] = None,
+    ) -> "TimeSeries":
+        """Creates a time series from daily rows, e.g. streamed rows.
+
+        Args:
+            rows (Iterable[Dict[str, Any]]): Rows with a ``date`` and counts.
+            fields (Optional[Sequence[str]]): Names of the count columns
+              (optional). Defaults to the integer values of the first row.
+            label (Optional[Hashable]): Label of the rows (optional).
+
+        Returns:
+            TimeSeries: The rows as columns. Missing counts are 0.
+        """
+        rows = iter(rows)
+        batch = list(islice(rows, BATCH_SIZE))
+        if fields is None:
+            fields = _count_fields(batch[0]) if batch else ()
+        series = cls(fields, label)
+
+        while batch:
+            series.dates.extend([_ordinal(row[DATE_FIELD]) for row in batch])
+            for field in fields:
+                series.columns[field].extend([row.get(field) or 0 for row in batch])
+            batch = list(islice(rows, BATCH_SIZE))
+
+        series.sources = array(TYPECODE, [0]) * len(series.dates)
+        return series
+
+    @classmethod
+    def from_response(
+        cls,
+        response: Dict[str, Any],
+        fields: Optional[Sequence[str]] = None,
+        label: Optional[Hashable] = None,
+    ) -> "TimeSeries":
+        """Creates a time series from the first array of rows in ``response``.
+
+        Args:
+            response (Dict[str, Any]): Response of ``streams``, ``listeners``
+              or ``followers``.
+            fields (Optional[Sequence[str]]): Names of the count columns
+              (optional). Defaults to the integer values of the first row.
+            label (Optional[Hashable]): Label of the rows (optional).
+
+        Returns:
+            TimeSeries: The rows as columns.
+        """
+        rows = next(
+            (value for value in response.values() if isinstance(value, list)), []
+        )
+        return cls.from_rows(rows, fields, label)
+
+    @classmethod
+    def concat(cls, parts: Iterable["TimeSeries"]) -> "TimeSeries":
+        """Concatenates time series with the same columns.
+
+        The labels of the parts are kept, so ``sources`` tells which part
+        each row came from.
+
+        Raises:
+            ValueError: If the columns of the parts differ.
+        """
+        parts = list(parts)
+        fields = parts[0].fields if parts else []
+        series = cls(fields)
+        series.labels = []
+        for part in parts:
+            if part.fields != fields:
+                raise ValueError(
+                    f"Can't concatenate columns {part.fields} with {fields}"
+                )
+            offset = len(series.labels)
+            series.dates.extend(part.dates)
+            for field in fields:
+                series.columns[field].extend(part.columns[field])
+            if len(part.labels) == 1:
+                series.sources.extend(array(TYPECODE, [offset]) * len(part))
+            else:
+                series.sources.extend(source + offset for source in part.sources)
+            series.labels.extend(part.labels)
+        return series
+
+    @property
+    def fields(self) -> List[str]:
+        """Names of the count columns."""
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, field: str) -> array:
+        if field == DATE_FIELD:
+            return self.dates
+        if field == SOURCE_FIELD:
+            return self.sources
+        return self.columns[field]
+
+    def totals(self) -> Dict[str, int]:
+        """Returns the sum of each count column."""
+        return {field: sum(column) for field, column in self.columns.items()}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """Returns the columns as NumPy ``int64`` arrays, without copying.
+
+        The arrays share memory with this series, so they must not be used
+        after appending to it.
+
+        Raises:
+            ImportError: If NumPy is not installed.
+        """
+        try:
+            import numpy  # pylint: disable=import-outside-toplevel
+        except ImportError as error:
+            raise ImportError(
+                "TimeSeries.to_numpy requires numpy. "
+                "Install it with `pip install spotifyconnector[numpy]`."
+            ) from error
+
+        def view(column: array):
+            if not column:
+                return numpy.zeros(0, dtype=numpy.int64)
+            return numpy.frombuffer(column, dtype=numpy.int64)
+
+        return {
+            DATE_FIELD: view(self.dates),
+            SOURCE_FIELD: view(self.sources),
+            **{field: view(column) for field, column in self.columns.items()},
+        }
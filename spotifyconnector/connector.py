@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 """
 This module provides a class to connect to an unofficial Spotify API
 that provides podcast analytics. It relies on using cookies generated
@@ -6,77 +7,292 @@ manually by logging in with the appropriate user at podcasters.spotify.com.
 Cookies supposedly last 1 year.
 """
 
-import base64
 import datetime as dt
-import hashlib
-import re
-import secrets
-import string
-from threading import RLock
-from time import sleep
-from typing import Dict, Optional
+from functools import partial
+from time import perf_counter, sleep
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
 import requests
-import yaml
 from loguru import logger
-from requests.exceptions import HTTPError
-from tenacity import retry
-from tenacity.retry import retry_if_exception_type
-from tenacity.stop import stop_after_attempt
-from tenacity.wait import wait_exponential
-
-DELAY_BASE = 2.0
-MAX_REQUEST_ATTEMPTS = 6
+
+from .account import (
+    DEFAULT_POOL_CONNECTIONS,
+    DEFAULT_POOL_MAXSIZE,
+    SpotifyAccount,
+    create_session,
+)
+from .auth import ACCOUNTS_URL, AuthenticationError, CredentialsExpired
+from .backfill import (
+    BACKFILL_ENDPOINTS,
+    DEFAULT_BACKFILL_CONCURRENCY,
+    DEFAULT_CHUNK_DAYS,
+    Backfill,
+    BackfillChunk,
+    date_chunks,
+)
+from .batch import DEFAULT_BATCH_CONCURRENCY, BatchResult, run_batch
+from .cache import ResponseCache
+from .columns import TimeSeries
+from .deadline import (
+    Deadline,
+    DeadlineExceeded,
+    Timeout,
+    check_deadline,
+    current_deadline,
+    deadline_timeout,
+)
+from .metrics import CallEvent, MetricsHook, emit
+from .prefetch import prefetched
+from .ratelimit import RateLimiter, parse_retry_after
+from .records import (
+    Episode,
+    FacetList,
+    FollowerCount,
+    ListenerPoint,
+    Record,
+    RecordList,
+    StreamPoint,
+)
+from .replay import Transport
+from .retry import CircuitOpen, RetryPolicy
+from .streaming import STREAM_CHUNK_SIZE, JSONRowParser
+from .tokencache import FileTokenCache
+
+__all__ = [
+    "AuthenticationError",
+    "CircuitOpen",
+    "CredentialsExpired",
+    "Deadline",
+    "DeadlineExceeded",
+    "MaxRetriesException",
+    "RetryPolicy",
+    "SpotifyAccount",
+    "SpotifyConnector",
+    "create_session",
+]
+
+# Seconds to wait for a connection and for each read of a response
+DEFAULT_TIMEOUT = (10.0, 60.0)
 # The Spotify API imposes exactly 29 days of data for "total" and "faceted" impressions
 IMPRESSIONS_DAYS_DIFF = 29
+# Connector method names of API endpoints that are named differently
+_ENDPOINT_NAMES = {"detailedStreams": "streams", "shows": "catalog"}
+# URL paths of the endpoints with daily rows, see SpotifyConnector.time_series
+_SERIES_PATHS = {
+    "streams": "detailedStreams",
+    "listeners": "listeners",
+    "followers": "followers",
+}
 
 
-class CredentialsExpired(Exception):
-    """CredentialsExpired is raised when the Spotify API asks for a login
-    This is usually because the cookies have expired.
+class MaxRetriesException(Exception):
+    """
+    Raised when the maximum number of retries is reached
     """
 
 
-def _random_string(
-    length: int,
-    chars: str = string.ascii_lowercase + string.ascii_uppercase + string.digits,
-) -> str:
-    """
-    Simple helper function to generate random strings
-    suitable for use with Spotify
-    """
-    return "".join(secrets.choice(chars) for _ in range(length))
+def _backoff(delay: float, event: Optional[CallEvent]):
+    """Sleeps before a retry and records the time in ``event``, if any."""
+    if event is None:
+        sleep(delay)
+        return
+    started = perf_counter()
+    sleep(delay)
+    event.backoff += perf_counter() - started
 
 
-class MaxRetriesException(Exception):
+class _SpotifyBase:  # pylint: disable=too-few-public-methods
     """
-    Raised when the maximum number of retries is reached
+    Helpers shared by the sync and async connectors, so URLs
+    and date handling never drift apart.
     """
 
+    def __init__(
+        self,
+        base_url,
+        podcast_id,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        endpoint_timeouts: Optional[Dict[str, Timeout]] = None,
+    ):
+        self.base_url = base_url
+        self.podcast_id = podcast_id
+        self.timeout = timeout
+        self.endpoint_timeouts = dict(endpoint_timeouts or {})
+
+    def _timeout(self, endpoint: str) -> Tuple[float, float]:
+        """Returns the (connect, read) timeout of an endpoint, cut to the
+        remaining time of the current deadline.
 
-class AuthenticationError(Exception):
-    """
-    Raised when authentication fails or returns unexpected response
-    """
+        Raises:
+            DeadlineExceeded: If the current deadline is used up.
+        """
+        timeout = self.endpoint_timeouts.get(endpoint, self.timeout)
+        return deadline_timeout(timeout, endpoint)
+
+    def _build_url(self, *path: str) -> str:
+        return f"{self.base_url}/{'/'.join(path)}"
+
+    def _endpoint_name(self, url: str) -> str:
+        """Returns the name of the connector method that requests ``url``."""
+        # URLs are shows/<id>/<endpoint>[/<kind>], episodes/<id>/<endpoint>
+        # or user/<endpoint>
+        path = url[len(self.base_url) :].strip("/").split("/")
+        if path[0] in ("shows", "episodes") and len(path) > 2:
+            name = path[2]
+        else:
+            name = path[-1]
+        return _ENDPOINT_NAMES.get(name, name)
+
+    def _show_or_episode_url(self, endpoint: str, episode=None) -> str:
+        if episode is None:
+            return self._build_url(
+                "shows",
+                self.podcast_id,
+                endpoint,
+            )
+        return self._build_url(
+            "episodes",
+            episode,
+            endpoint,
+        )
+
+    @staticmethod
+    def _date_params(start: dt.date, end: dt.date) -> Dict[str, str]:
+        # Only format the date, not the time
+        return {
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+        }
+
+    def _set_impression_date_range(self, kind: str, start: dt.date, end: dt.date):
+        """
+        The following conditions must hold for impression data:
+        - If kind is "total" or "faceted", start and end must be exactly
+          IMPRESSIONS_DAYS_DIFF days apart.
+          We override the date range if this is not the case.
+        - Otherwise, end may not be before start.
+
+        Returns the new start and end dates.
+        Logs a warning if the dates were invalid.
+        """
+        if kind in ("total", "faceted"):
+            new_end = start + dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
+            if new_end != end:
+                logger.warning(
+                    f"kind is {kind}, overriding end date to be "
+                    f"{IMPRESSIONS_DAYS_DIFF} days after start date ({start}). "
+                    f"New end date: {new_end}"
+                )
+            return start, new_end
+
+        if end < start:
+            logger.warning(
+                f"End date {end} is before start date {start}, "
+                "setting end date to start date."
+            )
+            end = start
+        return start, end
+
+    def _impressions_request(
+        self,
+        kind: str,
+        start: Optional[dt.date],
+        end: Optional[dt.date],
+    ) -> Tuple[str, Dict[str, str]]:
+        """Returns the URL and params of an impressions request."""
+        initial_start = start or dt.date.today() - dt.timedelta(
+            days=IMPRESSIONS_DAYS_DIFF
+        )
+        initial_end = end or start + dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
+        start, end = self._set_impression_date_range(kind, initial_start, initial_end)
+        logger.info(f"kind = {kind}, start = {start}, end = {end}")
 
-    def __init__(self, url, last_status_code, attempts):
-        super().__init__(
-            f"All retries failed for URL {url}. "
-            f"Last status code: {last_status_code}. "
-            f"Attempts: {attempts}"
+        url = self._build_url(
+            "shows",
+            self.podcast_id,
+            "impressions",
+            kind,
         )
+        return url, self._date_params(start, end)
+
+    @staticmethod
+    def _episodes_params(
+        date_params: Dict[str, str],
+        page: int,
+        size: int,
+        sort_by: str,
+        sort_order: str,
+        filter_by: str,
+    ) -> dict:
+        return {
+            **date_params,
+            **{
+                "page": page,
+                "size": size,
+                "sortBy": sort_by,
+                "sortOrder": sort_order,
+                "filter": filter_by,
+            },
+        }
+
+    @staticmethod
+    def _catalog_params(page: int, size: int) -> dict:
+        end = dt.date.today()
+        start = end - dt.timedelta(days=30)
 
+        return {
+            "page": page,
+            "size": size,
+            "sortBy": "name",
+            "sortOrder": "ascending",
+            "start": start.strftime("%Y-%m-%d"),
+            "end": end.strftime("%Y-%m-%d"),
+        }
 
-class SpotifyConnector:
+    @staticmethod
+    def _is_last_catalog_page(response: dict, page: int, size: int) -> bool:
+        if "totalPages" in response:
+            return page >= response["totalPages"]
+        return len(response.get("shows", [])) < size
+
+
+class SpotifyConnector(_SpotifyBase):
     """Representation of the inofficial Spotify podcast API."""
 
-    def __init__(
+    def __init__(  # pylint: disable=too-many-locals
         self,
         base_url,
         client_id,
         podcast_id,
         sp_dc,
         sp_key,
+        session: Optional[requests.Session] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        rate_limiter: Optional[RateLimiter] = None,
+        token_cache: Optional[FileTokenCache] = None,
+        account: Optional[SpotifyAccount] = None,
+        background_refresh: bool = False,
+        response_cache: Optional[ResponseCache] = None,
+        metrics_hooks: Iterable[MetricsHook] = (),
+        accounts_url: str = ACCOUNTS_URL,
+        transport: Optional[Transport] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout: Timeout = DEFAULT_TIMEOUT,
+        endpoint_timeouts: Optional[Dict[str, Timeout]] = None,
     ):
         """Initializes the SpotifyConnector object.
 
@@ -86,255 +302,398 @@ class SpotifyConnector:
             podcast_id (str): Spotify Podcast ID for the API.
             sp_dc (str): Spotify cookie.
             sp_key (str): Spotify cookie.
+            session (Optional[requests.Session]): HTTP session to use for all
+              requests (optional). If this is not provided, a pooled session is
+              created and owned by the connector.
+            pool_connections (int): Number of host pools to cache.
+              Ignored if ``session`` is provided.
+            pool_maxsize (int): Maximum number of connections kept per host.
+              Ignored if ``session`` is provided.
+            pool_block (bool): Block when the connection pool is exhausted.
+              Ignored if ``session`` is provided.
+            rate_limiter (Optional[RateLimiter]): Rate limiter for API requests
+              (optional). Defaults to the limiter shared by all connectors in
+              this process.
+            token_cache (Optional[FileTokenCache]): Cache to reuse Bearer tokens
+              across processes (optional). If this is not provided, every
+              connector authenticates on its first request.
+            account (Optional[SpotifyAccount]): Account to share the token and
+              session with (optional). If this is provided, the credential and
+              session arguments are taken from the account. Usually obtained
+              with :meth:`SpotifyAccount.podcast`.
+            background_refresh (bool): Renew the Bearer token in a background
+              thread before it expires. Ignored if ``account`` is provided.
+            response_cache (Optional[ResponseCache]): Cache for API responses
+              (optional). Ignored if ``account`` is provided.
+            metrics_hooks (Iterable[MetricsHook]): Callables that receive a
+              CallEvent after each API call (optional), e.g. a
+              PrometheusTextfileExporter. More can be added to
+              :attr:`metrics_hooks` later.
+            accounts_url (str): Base URL of the Spotify accounts service.
+              Only changed for local stand-ins, e.g. in benchmarks.
+              Ignored if ``account`` is provided.
+            transport (Optional[Transport]): Recorder or Replayer of API
+              responses (optional), see :mod:`spotifyconnector.replay`.
+              Ignored if ``account`` is provided.
+            retry_policy (Optional[RetryPolicy]): How requests are retried
+              (optional), see :mod:`spotifyconnector.retry`.
+              Ignored if ``account`` is provided.
+            timeout (Timeout): Seconds to wait for a connection and for each
+              read of a response, as one value or a (connect, read) pair.
+            endpoint_timeouts (Optional[Dict[str, Timeout]]): Timeouts of
+              single endpoints by method name, e.g. ``{"impressions": 120}``
+              (optional). Other endpoints use ``timeout``.
         """
+        super().__init__(base_url, podcast_id, timeout, endpoint_timeouts)
+        self.metrics_hooks = list(metrics_hooks)
+
+        self._owns_account = account is None
+        self.account = account or SpotifyAccount(
+            base_url,
+            client_id,
+            sp_dc,
+            sp_key,
+            session=session,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            rate_limiter=rate_limiter,
+            token_cache=token_cache,
+            background_refresh=background_refresh,
+            response_cache=response_cache,
+            accounts_url=accounts_url,
+            transport=transport,
+            retry_policy=retry_policy,
+        )
+        self.client_id = self.account.client_id
+        self.sp_dc = self.account.sp_dc
+        self.sp_key = self.account.sp_key
+        self._session = self.account._session
+        self._rate_limiter = self.account.rate_limiter
+        self._retry_policy = self.account.retry_policy
+        self._response_cache = self.account.response_cache
+        self.single_flight = self.account.single_flight
+
+    # The Bearer token is owned by the account, so that all its podcasts share it
+    # pylint: disable=protected-access
+    @property
+    def _bearer(self) -> Optional[str]:
+        return self.account._bearer
+
+    @_bearer.setter
+    def _bearer(self, value: Optional[str]):
+        self.account._bearer = value
+
+    @property
+    def _bearer_expires(self) -> Optional[dt.datetime]:
+        return self.account._bearer_expires
+
+    @_bearer_expires.setter
+    def _bearer_expires(self, value: Optional[dt.datetime]):
+        self.account._bearer_expires = value
+
+    def close(self):
+        """Closes the HTTP session if it is owned by the connector."""
+        if self._owns_account:
+            self.account.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
-        self.base_url = base_url
-        self.client_id = client_id
-        self.podcast_id = podcast_id
-        self.sp_dc = sp_dc
-        self.sp_key = sp_key
-
-        self._bearer: Optional[str] = None
-        self._bearer_expires: Optional[dt.datetime] = None
-        self._auth_lock = RLock()
-        # Flag to indicate that auth has failed and we should not retry
-        # (to avoid spamming Spotify with requests and risking a ban)
-        self._auth_poisoned = False
-
-    @retry(
-        retry=retry_if_exception_type(
-            (
-                HTTPError,
-                requests.exceptions.ConnectionError,
-                requests.exceptions.Timeout,
-            )
-        ),
-        wait=wait_exponential(),
-        stop=stop_after_attempt(7),
-    )
     def _authenticate(self):
-        """Retrieves a Bearer token for the inofficial Spotify API, valid 1 hour.
-
-        Generally follows the steps outlined here:
-        https://developer.spotify.com/documentation/general/guides/authorization/code-flow/
-        (with a few exceptions)
-        """
-        if self._auth_poisoned:
-            raise CredentialsExpired(
-                "Authentication has failed, not retrying. "
-                "Check credentials and try again."
-            )
+        """Retrieves a new Bearer token for the account."""
+        self.account._authenticate()
 
-        with self._auth_lock:
-            logger.info("Retrieving Bearer")
-
-            logger.debug("Generating secrets")
-
-            state = _random_string(32)
-
-            code_verifier = _random_string(64)
-            code_challenge = base64.b64encode(
-                hashlib.sha256(code_verifier.encode("utf-8")).digest()
-            ).decode("utf-8")
-
-            # Fix up format of code_challenge for spotify
-            code_challenge = re.sub(r"=+$", "", code_challenge)
-            code_challenge = code_challenge.replace("/", "_")
-            code_challenge = code_challenge.replace("+", "-")
+    def _ensure_auth(self):
+        """Checks if the account's Bearer token expires soon.
+        If so, requests a new one."""
+        self.account._ensure_auth()
 
-            logger.trace("state = {}", state)
-            logger.trace("code_verifier = {}", code_verifier)
-            logger.trace("code_challenge = {}", code_challenge)
+    def _reauthenticate(self, rejected_bearer: Optional[str]):
+        """Requests a new Bearer token for the account after a 401,
+        once per rejected token."""
+        self.account._reauthenticate(rejected_bearer)
 
-            logger.debug("Requesting User Authorization")
-            response = requests.get(
-                "https://accounts.spotify.com/oauth2/v2/auth",
-                params={
-                    "response_type": "code",
-                    "client_id": self.client_id,
-                    "scope": (
-                        "streaming ugc-image-upload user-read-email "
-                        "user-read-private"
-                    ),
-                    "redirect_uri": "https://podcasters.spotify.com",
-                    "code_challenge": code_challenge,
-                    "code_challenge_method": "S256",
-                    "state": state,
-                    "response_mode": "web_message",
-                    "prompt": "none",
-                },
-                cookies={
-                    "sp_dc": self.sp_dc,
-                    "sp_key": self.sp_key,
-                },
-                timeout=60,
-            )
-            logger.trace("response - {}", response.text)
-
-            # Raise an exception if we get a 4xx or 5xx response
-            response.raise_for_status()
-
-            # We get some weird HTML here that contains some JS
-            html = response.text
-
-            logger.trace("html = {}", html)
-
-            # At this point, we should have an HTTP response,
-            # but it could be an error page, containing an error message like
-            # response: {
-            #   "error": "login_required",
-            #   "state": "XXXXXXXXXXXXXXXXXXXXXXXXXXXXXXXX"
-            # }
-            # Check for this error case and raise an exception if we find it
-            # to avoid getting stuck in a loop
-            if "login_required" in html:
-                self._auth_poisoned = True
-                raise CredentialsExpired("Login required (credentials cookie expired?)")
-
-            match = re.search(r"const authorizationResponse = (.*?);", html, re.DOTALL)
-            json_str = match.group(1)
-
-            # The extracted string isn't strictly valid JSON due to some missing quotes,
-            # but PyYAML loads it fine
-            auth_response = yaml.safe_load(json_str)
-
-            # Confirm that auth was successful
-            if auth_response["type"] != "authorization_response":
-                raise AuthenticationError(
-                    f"Expected authorization_response, got {auth_response['type']}"
-                )
-            if auth_response["response"]["state"] != state:
-                raise AuthenticationError(
-                    "State parameter mismatch in authentication response"
-                )
+    # pylint: enable=protected-access
 
-            auth_code = auth_response["response"]["code"]
-
-            logger.trace("auth_code = {}", auth_code)
-
-            logger.debug("Requesting Bearer Token")
-            response = requests.post(
-                "https://accounts.spotify.com/api/token",
-                data={
-                    "grant_type": "authorization_code",
-                    "client_id": self.client_id,
-                    "code": auth_code,
-                    "redirect_uri": "https://podcasters.spotify.com",
-                    "code_verifier": code_verifier,
-                },
-                timeout=60,
-            )
-            response.raise_for_status()
-
-            response_json = response.json()
+    def _request(self, url: str, *, params: Optional[Dict[str, str]] = None) -> dict:
+        endpoint = self._endpoint_name(url)
+        cache = self._response_cache
+        if cache is not None:
+            response = cache.get(endpoint, url, params)
+            if response is not None:
+                if self.metrics_hooks:
+                    emit(
+                        self.metrics_hooks,
+                        CallEvent(endpoint, url, ok=True, cached=True),
+                    )
+                return response
 
-            self._bearer = response_json["access_token"]
-            expires_in = response_json["expires_in"]
-            self._bearer_expires = dt.datetime.now() + dt.timedelta(seconds=expires_in)
+        # Identical requests in progress in other threads share one call
+        response, shared = self.single_flight.do(
+            ResponseCache.key(url, params),
+            partial(self._fetch_and_cache, url, endpoint, params),
+            what=endpoint,
+        )
+        if shared and self.metrics_hooks:
+            emit(self.metrics_hooks, CallEvent(endpoint, url, ok=True, shared=True))
+        return response
 
-            logger.trace("bearer = {}", self._bearer)
+    def _fetch_and_cache(
+        self, url: str, endpoint: str, params: Optional[Dict[str, str]]
+    ) -> dict:
+        response = self._fetch(url, endpoint, params=params)
+        if self._response_cache is not None:
+            self._response_cache.set(endpoint, url, params, response)
+        return response
 
-            logger.success("Bearer token retrieved!")
+    def _fetch(
+        self, url: str, endpoint: str, *, params: Optional[Dict[str, str]] = None
+    ) -> dict:
+        # Calls are only recorded for the metrics hooks, if there are any
+        event = CallEvent(endpoint, url) if self.metrics_hooks else None
+        try:
+            response = self._send(url, endpoint, params=params, event=event)
+            # Only decode the body for the log if it is emitted
+            logger.opt(lazy=True).trace("response = {}", lambda: response.text)
+            if event is None:
+                return response.json()
+            started = perf_counter()
+            data = response.json()
+            event.decode = perf_counter() - started
+            event.ok = True
+            event.bytes = len(response.content)
+            return data
+        except Exception as error:
+            if event is not None:
+                event.error = repr(error)
+            raise
+        finally:
+            if event is not None:
+                emit(self.metrics_hooks, event)
+
+    def _request_rows(
+        self,
+        url: str,
+        *,
+        params: Optional[Dict[str, str]] = None,
+        key: Optional[str] = None,
+    ) -> Generator[Any, None, dict]:
+        """Yields the rows of a response while its body is read.
 
-    def _ensure_auth(self):
-        """Checks if Bearer token expires soon. If so, requests a new one."""
+        The request is retried like any other, but errors while reading
+        the body are raised, as rows may have been yielded already.
+        Responses are not cached.
 
-        with self._auth_lock:
-            if self._bearer is None or self._bearer_expires < (
-                dt.datetime.now() - dt.timedelta(minutes=5)
-            ):
-                self._authenticate()
+        Args:
+            url (str): URL to request.
+            params (Optional[Dict[str, str]]): Query parameters (optional).
+            key (Optional[str]): Key of the array of rows in the response
+              (optional). Defaults to the first array.
 
-    def _build_url(self, *path: str) -> str:
-        return f"{self.base_url}/{'/'.join(path)}"
+        Returns:
+            dict: The other top-level values of the response
+            (e.g. ``totalPages``), once all rows were yielded.
+        """
+        parser = JSONRowParser(key)
+        endpoint = self._endpoint_name(url)
+        event = CallEvent(endpoint, url) if self.metrics_hooks else None
+        try:
+            with self._send(
+                url, endpoint, params=params, stream=True, event=event
+            ) as response:
+                chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+                if event is None:
+                    for chunk in chunks:
+                        yield from parser.feed(chunk)
+                else:
+                    yield from self._timed_rows(parser, chunks, event)
+                yield from parser.close()
+            if event is not None:
+                event.ok = True
+        except Exception as error:
+            if event is not None:
+                event.error = repr(error)
+            raise
+        finally:
+            if event is not None:
+                emit(self.metrics_hooks, event)
+        return parser.meta
 
     @staticmethod
-    def _date_params(start: dt.date, end: dt.date) -> Dict[str, str]:
-        # Only format the date, not the time
-        return {
-            "start": start.strftime("%Y-%m-%d"),
-            "end": end.strftime("%Y-%m-%d"),
-        }
-
-    def _request(self, url: str, *, params: Optional[Dict[str, str]] = None) -> dict:
+    def _timed_rows(
+        parser: JSONRowParser, chunks: Iterator[bytes], event: CallEvent
+    ) -> Iterator[Any]:
+        """Yields the rows of ``chunks``, recording the time spent reading
+        and parsing them in ``event``."""
+        while True:
+            started = perf_counter()
+            chunk = next(chunks, None)
+            event.network += perf_counter() - started
+            if chunk is None:
+                return
+            event.bytes += len(chunk)
+            started = perf_counter()
+            rows = parser.feed(chunk)
+            event.decode += perf_counter() - started
+            yield from rows
+
+    def _rows_or_response(
+        self,
+        url: str,
+        params: Dict[str, str],
+        record_type: Type[Record],
+        stream: bool,
+        records: bool,
+    ) -> Union[dict, RecordList, Iterator[Union[dict, Record]]]:
+        """Requests a list endpoint, optionally streamed and as records."""
+        if stream:
+            rows = self._request_rows(url, params=params)
+            return map(record_type.from_dict, rows) if records else rows
+        response = self._request(url, params=params)
+        return RecordList.from_response(record_type, response) if records else response
+
+    def _send(  # pylint: disable=too-many-statements,too-many-locals,too-many-branches
+        self,
+        url: str,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        event: Optional[CallEvent] = None,
+    ) -> requests.Response:
+        """Sends a GET request, retried following the retry policy.
+        Returns the successful response.
+
+        Errors of the login are raised right away, as it has its own retries.
+        Attempts, status and time spent are recorded in ``event``, if given.
+
+        Raises:
+            DeadlineExceeded: If the current deadline is reached before the
+              request succeeds, or would be while waiting for a retry.
+        """
         logger.trace("url = {}", url)
-        delay = DELAY_BASE
+        policy = self._retry_policy
+        breaker = policy.breaker(endpoint)
+        deadline = current_deadline()
+        delay = policy.base_delay
 
         last_status_code = None
         last_exception = None
 
-        for attempt in range(MAX_REQUEST_ATTEMPTS):
+        for attempt in range(policy.max_attempts):
+            # Fail fast while the endpoint family is paused or time is up
+            breaker.check()
+            if deadline is not None:
+                deadline.check(endpoint)
+
+            # Only try to authenticate if we haven't had network errors recently
+            if attempt == 0 or last_exception is None:
+                started = perf_counter()
+                self._ensure_auth()
+                if event is not None:
+                    event.auth += perf_counter() - started
+
+            # Create request object with requests and trace it before sending
+            bearer = self._bearer
+            request = requests.Request(
+                "GET",
+                url,
+                params=params,
+                headers={"Authorization": f"Bearer {bearer}"},
+            )
+            prepared_request = self._session.prepare_request(request)
+            logger.trace("request - {}", prepared_request.url)
+            started = perf_counter()
+            acquired = self._rate_limiter.acquire(
+                timeout=None if deadline is None else deadline.remaining()
+            )
+            if event is not None:
+                event.backoff += perf_counter() - started
+            if not acquired:
+                raise deadline.cancel(endpoint)
+
+            # Auth and the limiter may have used up the rest of the deadline
+            timeout = self._timeout(endpoint)
+            if event is not None:
+                event.attempts += 1
+            started = perf_counter()
             try:
-                # Only try to authenticate if we haven't had network errors recently
-                if attempt == 0 or last_exception is None:
-                    self._ensure_auth()
-
-                # Create request object with requests and trace it before sending
-                request = requests.Request(
-                    "GET",
-                    url,
-                    params=params,
-                    headers={"Authorization": f"Bearer {self._bearer}"},
+                response = self._session.send(
+                    prepared_request, stream=stream, timeout=timeout
                 )
-                prepared_request = request.prepare()
-                logger.trace("request - {}", prepared_request.url)
-                response = requests.Session().send(prepared_request)
+            except requests.exceptions.RequestException as e:
+                if deadline is not None and deadline.expired:
+                    # Timed out because of the deadline, not the endpoint
+                    raise deadline.cancel(endpoint) from e
+                response = None
+                last_exception = e
+            finally:
+                if event is not None:
+                    event.network += perf_counter() - started
 
-                if response.status_code in (429, 502, 503, 504):
-                    last_status_code = response.status_code
-                    delay *= 2
-                    logger.log(
-                        ("INFO" if attempt < 3 else "WARNING"),
-                        'Got {} for URL "{}", next delay: {}s',
-                        response.status_code,
-                        url,
-                        delay,
-                    )
-                    sleep(delay)
-                    continue
+            retry_after = None
+            if response is None:
+                message, args = 'Network error for URL "{}": {}', (url, last_exception)
+            else:
+                if event is not None:
+                    event.status = response.status_code
 
                 if response.status_code == 401:
                     last_status_code = response.status_code
-                    self._authenticate()
+                    response.close()
+                    started = perf_counter()
+                    self._reauthenticate(bearer)
+                    if event is not None:
+                        event.auth += perf_counter() - started
                     continue
 
-                if not response.ok:
-                    last_status_code = response.status_code
-                    logger.error("Error in API:")
-                    logger.info(response.status_code)
-                    logger.info(response.headers)
-                    logger.info(response.text)
-                    response.raise_for_status()
-
-                logger.trace("response = {}", response.text)
-                return response.json()
-
-            except (
-                requests.exceptions.ConnectionError,
-                requests.exceptions.Timeout,
-                requests.exceptions.RequestException,
-            ) as e:
-                last_exception = e
-                delay *= 2
-                logger.log(
-                    ("INFO" if attempt < 3 else "WARNING"),
-                    'Network error for URL "{}": {} (attempt {}/{}), next delay: {}s',
-                    url,
-                    str(e),
-                    attempt + 1,
-                    MAX_REQUEST_ATTEMPTS,
-                    delay,
-                )
-                if (
-                    attempt < MAX_REQUEST_ATTEMPTS - 1
-                ):  # Don't sleep on the last attempt
-                    sleep(delay)
-                continue
+                if response.status_code not in policy.retry_statuses:
+                    if not response.ok:
+                        logger.error("Error in API:")
+                        logger.info(response.status_code)
+                        logger.info(response.headers)
+                        logger.info(response.text)
+                        response.raise_for_status()
+
+                    breaker.on_success()
+                    self._rate_limiter.on_success()
+                    if deadline is not None:
+                        deadline.finish(endpoint)
+                    return response
+
+                last_status_code = response.status_code
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    # Slow down all requests sharing this limiter
+                    self._rate_limiter.on_throttle(retry_after)
+                # Release the connection of an unread (streamed) response
+                response.close()
+                message, args = 'Got {} for URL "{}"', (response.status_code, url)
+
+            breaker.on_failure()
+            if attempt == policy.max_attempts - 1:
+                break
+            delay = policy.next_delay(delay, retry_after)
+            logger.log(
+                ("INFO" if attempt < 3 else "WARNING"),
+                message + " (attempt {}/{}), next delay: {:.1f}s",
+                *args,
+                attempt + 1,
+                policy.max_attempts,
+                delay,
+            )
+            if deadline is not None:
+                deadline.check(endpoint, delay)
+            _backoff(delay, event)
 
         # If we get here, all retries failed
         if last_exception:
             raise last_exception
-        raise MaxRetriesException(url, last_status_code, MAX_REQUEST_ATTEMPTS)
+        raise MaxRetriesException(url, last_status_code, policy.max_attempts)
 
     def metadata(self, episode=None) -> dict:
         """Loads metadata for podcast.
@@ -346,18 +705,7 @@ class SpotifyConnector:
         Returns:
             dict: Response data from API.
         """
-        if episode is None:
-            url = self._build_url(
-                "shows",
-                self.podcast_id,
-                "metadata",
-            )
-        else:
-            url = self._build_url(
-                "episodes",
-                episode,
-                "metadata",
-            )
+        url = self._show_or_episode_url("metadata", episode)
         return self._request(url)
 
     def streams(
@@ -365,7 +713,9 @@ class SpotifyConnector:
         start: dt.date,
         end: Optional[dt.date] = None,
         episode=None,
-    ) -> dict:
+        stream: bool = False,
+        records: bool = False,
+    ) -> Union[dict, RecordList, Iterator[Union[dict, Record]]]:
         """Loads podcast/episode stream data, which includes the number of
         starts and completions for each episode.
 
@@ -375,33 +725,30 @@ class SpotifyConnector:
               Defaults to None. Will be set to ``start`` if None.
             episode (str): ID of the episode to request data for (optional).
               If this is not provided, data for all episodes will be returned.
+            stream (bool): Yield the rows of the response while it is read,
+              instead of returning the whole response (optional).
+            records (bool): Return the rows as compact records (optional).
 
         Returns:
-            dict: [description]
+            dict: [description], or an iterator over its rows if ``stream`` is set.
+              With ``records``, a RecordList or an iterator over records.
         """
         if end is None:
             end = start
 
-        if episode is None:
-            url = self._build_url(
-                "shows",
-                self.podcast_id,
-                "detailedStreams",
-            )
-        else:
-            url = self._build_url(
-                "episodes",
-                episode,
-                "detailedStreams",
-            )
-        return self._request(url, params=self._date_params(start, end))
+        url = self._show_or_episode_url("detailedStreams", episode)
+        return self._rows_or_response(
+            url, self._date_params(start, end), StreamPoint, stream, records
+        )
 
     def listeners(
         self,
         start: dt.date,
         end: Optional[dt.date] = None,
         episode=None,
-    ) -> dict:
+        stream: bool = False,
+        records: bool = False,
+    ) -> Union[dict, RecordList, Iterator[Union[dict, Record]]]:
         """Loads podcast listener data, which includes the number of
         listeners for each episode.
 
@@ -411,41 +758,42 @@ class SpotifyConnector:
               Defaults to None. Will be set to ``start`` if None.
             episode (str): ID of the episode to request data for (optional).
               If this is not provided, data for all episodes will be returned.
+            stream (bool): Yield the rows of the response while it is read,
+              instead of returning the whole response (optional).
+            records (bool): Return the rows as compact records (optional).
 
         Returns:
-            dict: [description]
+            dict: [description], or an iterator over its rows if ``stream`` is set.
+              With ``records``, a RecordList or an iterator over records.
         """
         if end is None:
             end = start
 
-        if episode is None:
-            url = self._build_url(
-                "shows",
-                self.podcast_id,
-                "listeners",
-            )
-        else:
-            url = self._build_url(
-                "episodes",
-                episode,
-                "listeners",
-            )
-        return self._request(url, params=self._date_params(start, end))
+        url = self._show_or_episode_url("listeners", episode)
+        return self._rows_or_response(
+            url, self._date_params(start, end), ListenerPoint, stream, records
+        )
 
     def followers(
         self,
         start: dt.date,
         end: Optional[dt.date] = None,
-    ) -> dict:
+        stream: bool = False,
+        records: bool = False,
+    ) -> Union[dict, RecordList, Iterator[Union[dict, Record]]]:
         """Loads podcast follower data.
 
         Args:
             start (dt.date): Earliest date to request data for.
             end (Optional[dt.date], optional): Most recent date to request data for.
               Defaults to None. Will be set to ``start`` if None.
+            stream (bool): Yield the rows of the response while it is read,
+              instead of returning the whole response (optional).
+            records (bool): Return the rows as compact records (optional).
 
         Returns:
-            dict: [description]
+            dict: [description], or an iterator over its rows if ``stream`` is set.
+              With ``records``, a RecordList or an iterator over records.
         """
         if end is None:
             end = start
@@ -455,36 +803,50 @@ class SpotifyConnector:
             self.podcast_id,
             "followers",
         )
-        return self._request(url, params=self._date_params(start, end))
+        return self._rows_or_response(
+            url, self._date_params(start, end), FollowerCount, stream, records
+        )
 
-    def _set_impression_date_range(self, kind: str, start: dt.date, end: dt.date):
-        """
-        The following conditions must hold for impression data:
-        - If kind is "total" or "faceted", start and end must be exactly
-          IMPRESSIONS_DAYS_DIFF days apart.
-          We override the date range if this is not the case.
-        - Otherwise, end may not be before start.
+    def time_series(
+        self,
+        endpoint: str,
+        start: dt.date,
+        end: Optional[dt.date] = None,
+        episode=None,
+        fields: Optional[Sequence[str]] = None,
+    ) -> TimeSeries:
+        """Loads the daily rows of ``streams``, ``listeners`` or ``followers``
+        as columns. The rows are moved into the columns in batches while the
+        response is read, so neither the response nor its rows are kept.
 
-        Returns the new start and end dates.
-        Logs a warning if the dates were invalid.
-        """
-        if kind in ("total", "faceted"):
-            new_end = start + dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
-            if new_end != end:
-                logger.warning(
-                    f"kind is {kind}, overriding end date to be "
-                    f"{IMPRESSIONS_DAYS_DIFF} days after start date ({start}). "
-                    f"New end date: {new_end}"
-                )
-            return start, new_end
+        Args:
+            endpoint (str): One of ``streams``, ``listeners`` or ``followers``.
+            start (dt.date): Earliest date to request data for.
+            end (Optional[dt.date], optional): Most recent date to request data for.
+              Defaults to None. Will be set to ``start`` if None.
+            episode (str): ID of the episode to request data for (optional),
+              also the label of the series. Not supported by ``followers``.
+            fields (Optional[Sequence[str]]): Names of the count columns
+              (optional). Defaults to the integer values of the first row.
 
-        if end < start:
-            logger.warning(
-                f"End date {end} is before start date {start}, "
-                "setting end date to start date."
-            )
+        Returns:
+            TimeSeries: The rows as columns.
+
+        Raises:
+            ValueError: If the endpoint has no daily rows (per episode).
+        """
+        if endpoint not in _SERIES_PATHS:
+            raise ValueError(f"{endpoint} has no daily rows")
+        if episode is not None and endpoint == "followers":
+            raise ValueError("followers has no data per episode")
+        if end is None:
             end = start
-        return start, end
+
+        rows = self._request_rows(
+            self._show_or_episode_url(_SERIES_PATHS[endpoint], episode),
+            params=self._date_params(start, end),
+        )
+        return TimeSeries.from_rows(rows, fields, label=episode)
 
     def impressions(
         self,
@@ -507,27 +869,16 @@ class SpotifyConnector:
             dict: [description]
         """
 
-        initial_start = start or dt.date.today() - dt.timedelta(
-            days=IMPRESSIONS_DAYS_DIFF
-        )
-        initial_end = end or start + dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
-        start, end = self._set_impression_date_range(kind, initial_start, initial_end)
-        logger.info(f"kind = {kind}, start = {start}, end = {end}")
-
-        url = self._build_url(
-            "shows",
-            self.podcast_id,
-            "impressions",
-            kind,
-        )
-        return self._request(url, params=self._date_params(start, end))
+        url, params = self._impressions_request(kind, start, end)
+        return self._request(url, params=params)
 
     def aggregate(
         self,
         start: dt.date,
         end: Optional[dt.date] = None,
         episode=None,
-    ) -> dict:
+        records: bool = False,
+    ) -> Union[dict, FacetList]:
         """Loads podcast aggregate data, which includes the number of
         starts and completions for each episode.
 
@@ -537,28 +888,19 @@ class SpotifyConnector:
               Defaults to None. Will be set to ``start`` if None.
             episode (str): ID of the episode to request data for (optional).
               If this is not provided, data for all episodes will be returned.
+            records (bool): Return the facets as compact records (optional).
 
         Returns:
-            dict: [aggregate]
+            dict: [aggregate], or a FacetList if ``records`` is set
         """
         if end is None:
             end = start
 
-        if episode is None:
-            url = self._build_url(
-                "shows",
-                self.podcast_id,
-                "aggregate",
-            )
-        else:
-            url = self._build_url(
-                "episodes",
-                episode,
-                "aggregate",
-            )
-        return self._request(url, params=self._date_params(start, end))
+        url = self._show_or_episode_url("aggregate", episode)
+        response = self._request(url, params=self._date_params(start, end))
+        return FacetList.from_response(response) if records else response
 
-    def episodes(
+    def episodes(  # pylint: disable=too-many-locals
         self,
         start: dt.date,
         end: Optional[dt.date] = None,
@@ -567,12 +909,27 @@ class SpotifyConnector:
         sort_by: str = "releaseDate",
         sort_order: str = "descending",
         filter_by: str = "",
+        prefetch: int = 0,
+        stream: bool = False,
+        records: bool = False,
     ) -> dict:
         """Loads podcast episode data, which includes the number of
         starts and completions for each episode.
 
         Returns an iterator over all episodes.
 
+        By default, pages are requested one after another. With ``prefetch``,
+        the remaining pages are requested concurrently once the first page
+        (and thus the number of pages) is known. Episodes are still yielded
+        in server order.
+
+        With ``stream``, the episodes of each page are yielded while the page
+        is read, so only one episode at a time is held in memory. This can't
+        be combined with ``prefetch``.
+
+        Inside a :class:`~spotifyconnector.deadline.Deadline`, the listing
+        raises DeadlineExceeded before a page that can't be requested in time.
+
         Args:
             episode (str): ID of the episode to request data for.
             start (dt.date): Earliest date to request data for.
@@ -583,10 +940,31 @@ class SpotifyConnector:
             sort_by (str): Sort by field
             sort_order (str): Sort order
             filter_by (str): Filter by field
+            prefetch (int): Maximum number of pages requested ahead
+              concurrently (optional). Defaults to 0 (no prefetching).
+            stream (bool): Yield episodes while a page is read (optional).
+            records (bool): Yield episodes as compact records (optional).
 
         Returns:
             (iterable): [episode]
         """
+        if records:
+            yield from map(
+                Episode.from_dict,
+                self.episodes(
+                    start,
+                    end,
+                    page,
+                    size,
+                    sort_by,
+                    sort_order,
+                    filter_by,
+                    prefetch,
+                    stream,
+                ),
+            )
+            return
+
         if end is None:
             end = start
 
@@ -597,21 +975,45 @@ class SpotifyConnector:
         )
         date_params = self._date_params(start, end)
 
-        # Yield each episode (handles pagination)
-        while True:
-            response = self._request(
+        def fetch_page(page: int) -> dict:
+            # Stop between pages, also if they are cached
+            check_deadline("episodes")
+            return self._request(
                 url,
-                params={
-                    **date_params,
-                    **{
-                        "page": page,
-                        "size": size,
-                        "sortBy": sort_by,
-                        "sortOrder": sort_order,
-                        "filter": filter_by,
-                    },
-                },
+                params=self._episodes_params(
+                    date_params, page, size, sort_by, sort_order, filter_by
+                ),
             )
+
+        if stream:
+            if prefetch > 0:
+                raise ValueError("stream and prefetch can't be combined")
+            while True:
+                check_deadline("episodes")
+                meta = yield from self._request_rows(
+                    url,
+                    params=self._episodes_params(
+                        date_params, page, size, sort_by, sort_order, filter_by
+                    ),
+                    key="episodes",
+                )
+                if page == meta["totalPages"]:
+                    break
+                page += 1
+            return
+
+        if prefetch > 0:
+            response = fetch_page(page)
+            yield from response["episodes"]
+
+            pages = range(page + 1, response["totalPages"] + 1)
+            for response in prefetched(fetch_page, pages, prefetch):
+                yield from response["episodes"]
+            return
+
+        # Yield each episode (handles pagination)
+        while True:
+            response = fetch_page(page)
             yield from response["episodes"]
 
             if page == response["totalPages"]:
@@ -619,28 +1021,109 @@ class SpotifyConnector:
 
             page += 1
 
-    def catalog(self) -> dict:
-        """Loads podcast catalog data.
+    def catalog(self, size: int = 200) -> Iterator[dict]:
+        """Loads the catalog of podcasts of the account.
+
+        Returns an iterator over all podcasts (handles pagination).
+
+        Args:
+            size (int): Number of results per page
 
         Returns:
-            dict: [catalog]
+            (iterable): [podcast]
         """
         url = self._build_url("user", "shows")
 
-        end = dt.date.today()
-        start = end - dt.timedelta(days=30)
+        page = 1
+        while True:
+            check_deadline("catalog")
+            response = self._request(url, params=self._catalog_params(page, size))
+            yield from response.get("shows", [])
 
-        return self._request(
-            url,
-            params={
-                "page": 1,
-                "size": 200,
-                "sortBy": "name",
-                "sortOrder": "ascending",
-                "start": start.strftime("%Y-%m-%d"),
-                "end": end.strftime("%Y-%m-%d"),
-            },
-        )
+            if self._is_last_catalog_page(response, page, size):
+                break
+
+            page += 1
+
+    def backfill(
+        self,
+        endpoint: str,
+        start: dt.date,
+        end: dt.date,
+        chunk_days: int = DEFAULT_CHUNK_DAYS,
+        episode=None,
+        concurrency: int = DEFAULT_BACKFILL_CONCURRENCY,
+    ) -> Backfill:
+        """Loads per-day data of a long date range in chunks.
+
+        The chunks are requested concurrently (each with the usual retries
+        and rate limiting) and their per-day rows are merged in date order.
+        Failed chunks are skipped and listed in ``Backfill.failed`` after
+        iteration, so they can be requested again.
+
+        Args:
+            endpoint (str): One of ``streams``, ``listeners`` or ``followers``.
+            start (dt.date): Earliest date to request data for.
+            end (dt.date): Most recent date to request data for.
+            chunk_days (int): Number of days requested at once.
+            episode (str): ID of the episode to request data for (optional).
+              Not supported by ``followers``.
+            concurrency (int): Maximum number of chunks requested at once.
+
+        Returns:
+            Backfill: Iterable over the per-day rows, e.g.
+              ``{"date": "2024-01-01", ...}``.
+        """
+        if endpoint not in BACKFILL_ENDPOINTS:
+            raise ValueError(f"Endpoint {endpoint} can't be backfilled")
+        if episode is not None and endpoint == "followers":
+            raise ValueError("Followers are only available for the podcast")
+
+        func = getattr(self, endpoint)
+        kwargs = {} if episode is None else {"episode": episode}
+
+        def fetch_chunk(chunk: BackfillChunk) -> Tuple[BackfillChunk, Optional[dict]]:
+            try:
+                return chunk, func(chunk.start, chunk.end, **kwargs)
+            except (
+                requests.exceptions.RequestException,
+                MaxRetriesException,
+                CircuitOpen,
+            ) as e:
+                chunk.error = e
+                return chunk, None
+
+        chunks = date_chunks(start, end, chunk_days)
+        return Backfill(prefetched(fetch_chunk, chunks, concurrency))
+
+    def batch(
+        self, calls: Iterable, concurrency: int = DEFAULT_BATCH_CONCURRENCY
+    ) -> List[BatchResult]:
+        """Runs many endpoint calls concurrently.
+
+        The calls share the Bearer token, the connection pool and the rate
+        limiter of the connector. A failed call doesn't stop the others.
+
+        Example:
+            ``connector.batch(["metadata", ("streams", start, end),
+            call("aggregate", start, end, episode="episode_id")])``
+
+        Args:
+            calls (Iterable): Calls to run. Each is a method name, a tuple of
+              a method name and its positional arguments, or a
+              :class:`~spotifyconnector.batch.Call` (see
+              :func:`~spotifyconnector.batch.call` for keyword arguments).
+            concurrency (int): Maximum number of calls running at once.
+              Should not exceed the connection pool size (``pool_maxsize``).
+
+        Returns:
+            List[BatchResult]: The value or error of each call,
+              in the order of ``calls``.
+
+        Raises:
+            ValueError: If a method can't be called in a batch.
+        """
+        return run_batch(self, calls, concurrency)
 
     def performance(
         self,
@@ -0,0 +1,146 @@
+"""
+Time budgets for connector runs.
+
+Everything the connectors do inside ``with Deadline(seconds):`` (including
+the worker threads they start for it) keeps to the budget: requests are sent
+with at most the remaining time as their timeout, retries that would sleep
+past the deadline are given up, and paginated listings stop between pages.
+Work that can't be done in time raises :class:`DeadlineExceeded`.
+
+The deadline counts the finished and cancelled calls per endpoint, so a run
+that ran out of time can report what it got done::
+
+    with Deadline(600) as deadline:
+        ...
+    print(deadline.report())
+"""
+
+from collections import Counter
+from contextvars import ContextVar
+from threading import Lock
+from time import monotonic
+from typing import Optional, Tuple, Union
+
+# Timeout of a request in seconds: one value, or a (connect, read) pair
+Timeout = Union[float, Tuple[float, float]]
+
+_current: ContextVar[Optional["Deadline"]] = ContextVar(
+    "spotifyconnector_deadline", default=None
+)
+
+
+class DeadlineExceeded(Exception):
+    """
+    Raised instead of starting work that can't finish before the deadline
+    """
+
+    def __init__(self, what: str, budget: float):
+        super().__init__(f"Deadline of {budget:g}s exceeded, cancelled {what}")
+        self.what = what
+
+
+class Deadline:
+    """A time budget, active in the ``with`` block it is entered in."""
+
+    # Clock used for all timestamps, overridden in tests
+    _clock = staticmethod(monotonic)
+
+    def __init__(self, seconds: float):
+        """Initializes the Deadline object. The budget starts right away.
+
+        Args:
+            seconds (float): The time budget in seconds.
+        """
+        self.seconds = seconds
+        self.started = self._clock()
+        self.expires = self.started + seconds
+        self.finished: Counter = Counter()
+        self.cancelled: Counter = Counter()
+        self._lock = Lock()
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_current.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _current.reset(self._tokens.pop())
+
+    def remaining(self) -> float:
+        """Returns the seconds left, at least 0."""
+        return max(0.0, self.expires - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """Whether the budget is used up."""
+        return self.remaining() <= 0
+
+    def finish(self, what: str):
+        """Counts a finished call of ``what`` (e.g. an endpoint)."""
+        with self._lock:
+            self.finished[what] += 1
+
+    def cancel(self, what: str) -> DeadlineExceeded:
+        """Counts a cancelled call of ``what`` and returns the error to raise."""
+        with self._lock:
+            self.cancelled[what] += 1
+        return DeadlineExceeded(what, self.seconds)
+
+    def check(self, what: str, delay: float = 0.0):
+        """Raises DeadlineExceeded if the budget is used up, or would be
+        after waiting ``delay`` seconds."""
+        if self.remaining() <= delay:
+            raise self.cancel(what)
+
+    def timeout(self, timeout: Timeout, what: str) -> Tuple[float, float]:
+        """Returns the (connect, read) timeout of a call of ``what``, cut to
+        the remaining time. Raises DeadlineExceeded instead of returning a
+        timeout of 0 if the budget is used up."""
+        connect, read = timeout_pair(timeout)
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise self.cancel(what)
+        return min(connect, remaining), min(read, remaining)
+
+    def report(self) -> dict:
+        """Returns the budget, the elapsed time and the finished and
+        cancelled calls per endpoint."""
+        with self._lock:
+            return {
+                "budget": self.seconds,
+                "elapsed": round(self._clock() - self.started, 3),
+                "expired": self.expired,
+                "finished": dict(self.finished),
+                "cancelled": dict(self.cancelled),
+            }
+
+
+def timeout_pair(timeout: Timeout) -> Tuple[float, float]:
+    """Returns a timeout as a (connect, read) pair."""
+    return timeout if isinstance(timeout, tuple) else (timeout, timeout)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Returns the deadline of the current context, if there is one."""
+    return _current.get()
+
+
+def deadline_timeout(timeout: Timeout, what: str) -> Tuple[float, float]:
+    """Returns the (connect, read) timeout of a call of ``what``, cut to the
+    remaining time of the current deadline if there is one.
+
+    Raises:
+        DeadlineExceeded: If the current deadline is used up.
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return timeout_pair(timeout)
+    return deadline.timeout(timeout, what)
+
+
+def check_deadline(what: str, delay: float = 0.0):
+    """Raises DeadlineExceeded if the current deadline is used up, or would
+    be after waiting ``delay`` seconds. Does nothing without a deadline."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(what, delay)
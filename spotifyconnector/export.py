@@ -0,0 +1,178 @@
+"""
+Export of endpoint data to files, one file per endpoint.
+
+Rows are written as each call completes, through a buffered and optionally
+gzip-compressed stream, as newline-delimited JSON or CSV.
+"""
+
+import csv
+import gzip
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO, Union
+
+from loguru import logger
+
+EXPORT_FORMATS = ("ndjson", "csv")
+
+# Bytes buffered per file before they are written (and compressed)
+BUFFER_SIZE = 1024 * 1024
+
+# Column with the episode ID of per-episode rows
+EPISODE_COLUMN = "episode"
+
+
+def response_rows(data: Any) -> List[Dict[str, Any]]:
+    """Returns the rows of a response: the first array of objects in it,
+    or the response itself as a single row. No data has no rows.
+
+    Raises:
+        ValueError: If a row is not an object.
+    """
+    if data is None:
+        return []
+    rows = data if isinstance(data, list) else [data]
+    if isinstance(data, dict):
+        for value in data.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                rows = value
+                break
+    # Checked before anything is written, so no file gets half a response
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"Rows must be objects, got {type(row).__name__}")
+    return rows
+
+
+def _cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    return value
+
+
+class _EndpointFile:
+    """Writer of the rows of one endpoint"""
+
+    def __init__(self, path: Path, fmt: str, compress: bool):
+        raw = open(path, "wb")  # pylint: disable=consider-using-with
+        binary: Union[io.BufferedWriter, gzip.GzipFile] = raw
+        if compress:
+            binary = gzip.GzipFile(fileobj=raw, mode="wb")
+        self._raw = raw
+        self._stream: TextIO = io.TextIOWrapper(
+            io.BufferedWriter(binary, BUFFER_SIZE),
+            encoding="utf-8",
+            newline="" if fmt == "csv" else None,
+        )
+        self._fmt = fmt
+        self._csv: Optional[csv.DictWriter] = None
+        self._dropped: set = set()
+        self.path = path
+
+    def write(self, rows: List[Dict[str, Any]]):
+        """Writes rows. CSV columns are those of the first row."""
+        if self._fmt == "ndjson":
+            for row in rows:
+                self._stream.write(json.dumps(row, separators=(",", ":")))
+                self._stream.write("\n")
+            return
+
+        for row in rows:
+            if self._csv is None:
+                self._csv = csv.DictWriter(
+                    self._stream, fieldnames=list(row), extrasaction="ignore"
+                )
+                self._csv.writeheader()
+            extra = row.keys() - set(self._csv.fieldnames) - self._dropped
+            if extra:
+                self._dropped |= extra
+                logger.warning(
+                    "Columns {} are not in the header of {} and are dropped",
+                    sorted(extra),
+                    self.path,
+                )
+            self._csv.writerow({key: _cell(value) for key, value in row.items()})
+
+    def close(self):
+        """Flushes and closes the file"""
+        # Closes the gzip stream (if any) as well, which writes its trailer
+        self._stream.close()
+        self._raw.close()
+
+
+class Exporter:
+    """Writes the data of each endpoint to ``DIR/<endpoint>.<format>[.gz]``.
+
+    Implements the reporter interface of the command line interface, so it
+    can be passed wherever results are logged.
+    """
+
+    def __init__(self, out_dir: str, fmt: str = "ndjson", compress: bool = False):
+        """Initializes the Exporter object.
+
+        Args:
+            out_dir (str): Directory of the files, created if needed.
+            fmt (str): File format, ``ndjson`` or ``csv``.
+            compress (bool): Compress the files with gzip (optional).
+
+        Raises:
+            ValueError: If the format is not supported.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.compress = compress
+        self._files: Dict[str, _EndpointFile] = {}
+
+    def _file(self, endpoint_name: str) -> _EndpointFile:
+        if endpoint_name not in self._files:
+            suffix = f".{self.fmt}" + (".gz" if self.compress else "")
+            self._files[endpoint_name] = _EndpointFile(
+                self.out_dir / f"{endpoint_name}{suffix}", self.fmt, self.compress
+            )
+        return self._files[endpoint_name]
+
+    def write(
+        self, endpoint_name: str, rows: List[Dict[str, Any]], episode=None
+    ) -> int:
+        """Writes rows to the file of an endpoint. Returns the number of rows.
+
+        Rows of an episode get its ID in the ``episode`` column.
+        """
+        if episode is not None:
+            rows = [{EPISODE_COLUMN: episode, **row} for row in rows]
+        self._file(endpoint_name).write(rows)
+        return len(rows)
+
+    def status(self, endpoint_name: str, status: bool, data: Any, episode=None):
+        """Writes the rows of a call and logs one status line"""
+        name = endpoint_name if episode is None else f"{endpoint_name} {episode}"
+        if not status:
+            logger.info("✗ {}: {}", name, data.get("error"))
+            return
+        try:
+            rows = response_rows(data)
+        except ValueError as error:
+            logger.error("✗ {}: {}", name, error)
+            return
+        count = self.write(endpoint_name, rows, episode)
+        logger.info("✓ {}: {} row{}", name, count, "" if count == 1 else "s")
+
+    def episode(self, episode: dict):
+        """Writes a row of the episode listing"""
+        self.write("episodes", [episode])
+
+    def close(self):
+        """Flushes and closes all files"""
+        for file in self._files.values():
+            file.close()
+        self._files.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,36 @@
+"""
+Helpers for the files kept by the caches, the watermarks and the metrics.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Union
+
+
+def default_cache_dir(name: str) -> Path:
+    """Returns the default directory of a cache (in ``$XDG_CACHE_HOME``)."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "spotifyconnector" / name
+
+
+def write_atomic(path: Path, content: Union[str, bytes], mode: int = 0o600):
+    """Writes ``content`` (text as UTF-8, or bytes) to ``path`` with the
+    permissions ``mode``, readable only by the owner by default."""
+    # Write to a temporary file and rename it, so that concurrent
+    # readers never see a partially written file
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(content.encode("utf-8") if isinstance(content, str) else content)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(path: Path, data):
+    """Writes ``data`` as JSON to ``path``, readable only by the owner."""
+    write_atomic(path, json.dumps(data))
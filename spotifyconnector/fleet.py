@@ -0,0 +1,459 @@
+# pylint: disable=cyclic-import
+"""
+Sync of many accounts at once, for the ``sync-all`` command.
+
+The podcasts of all accounts in a config file are split into shards of a few
+podcasts each, which are spread over a pool of worker processes. The podcasts
+of a shard share the account's login and HTTP connection pool, and the shards
+of an account share its Bearer token through a token cache, so each account
+logs in once. The results of all shards are merged into one summary of the
+run.
+
+The config file is JSON, or YAML if PyYAML is installed::
+
+    {
+      "base_url": "https://generic.wg.spotify.com/podcasters/v0",
+      "accounts": [
+        {"name": "acme", "client_id": "...", "sp_dc": "...", "sp_key": "...",
+         "podcasts": ["<podcast id>", "..."]}
+      ]
+    }
+
+Without ``podcasts``, all podcasts in the catalog of the account are synced.
+"""
+
+import json
+import os
+import time
+from argparse import Namespace
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+from .account import DEFAULT_POOL_MAXSIZE, SpotifyAccount
+from .auth import ACCOUNTS_URL
+from .deadline import Deadline
+from .export import Exporter
+from .ratelimit import SQLiteRateLimiter, set_default_rate_limiter
+from .tokencache import FileTokenCache
+
+# Keys every account in the config file must have
+ACCOUNT_KEYS = ("client_id", "sp_dc", "sp_key")
+# Number of failed calls listed per podcast in the summary
+MAX_LISTED_FAILURES = 20
+# Podcasts synced per shard, so that large accounts are spread over workers
+DEFAULT_SHARD_SIZE = 10
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """Reads and validates a config file of accounts.
+
+    Args:
+        path (str): A ``.json`` file, or a ``.yaml``/``.yml`` file.
+
+    Returns:
+        Dict[str, Any]: The config, with a ``name`` and a ``podcasts`` list
+        for every account.
+
+    Raises:
+        OSError: If the file can't be read.
+        ValueError: If the file can't be parsed or the config is invalid.
+        ImportError: If the file is YAML and PyYAML is not installed.
+    """
+    with open(path, encoding="utf-8") as file:
+        if Path(path).suffix in (".yaml", ".yml"):
+            try:
+                # Only needed for YAML configs
+                import yaml  # pylint: disable=import-outside-toplevel
+            except ImportError as error:
+                raise ImportError(
+                    "YAML configs require PyYAML. Install it with "
+                    "`pip install spotifyconnector[yaml]` or use a JSON config."
+                ) from error
+            try:
+                config = yaml.safe_load(file)
+            except yaml.YAMLError as error:
+                raise ValueError(f"{path} is not valid YAML: {error}") from error
+        else:
+            config = json.load(file)
+
+    if not isinstance(config, dict) or not isinstance(config.get("accounts"), list):
+        raise ValueError(f"{path} must have a list of accounts")
+    names = set()
+    for index, account in enumerate(config["accounts"]):
+        if not isinstance(account, dict):
+            raise ValueError(f"Account {index} in {path} is not a mapping")
+        missing = [key for key in ACCOUNT_KEYS if not account.get(key)]
+        if missing:
+            raise ValueError(f"Account {index} in {path} lacks {', '.join(missing)}")
+        account.setdefault("name", f"account-{index}")
+        account["podcasts"] = [
+            str(podcast) for podcast in account.get("podcasts") or []
+        ]
+        if account["name"] in names:
+            raise ValueError(f"Account name {account['name']} is used twice in {path}")
+        names.add(account["name"])
+    return config
+
+
+class SummaryReporter:
+    """Counts the results of calls and passes them on to another reporter."""
+
+    def __init__(self, reporter):
+        """Initializes the SummaryReporter object.
+
+        Args:
+            reporter: Reporter that logs or exports the results,
+              e.g. an Exporter.
+        """
+        self.reporter = reporter
+        self.ok = 0
+        self.failed = 0
+        self.failures: List[Dict[str, Any]] = []
+
+    def status(self, endpoint_name, status, data, episode=None):
+        """Counts the result of a call and reports it"""
+        if status:
+            self.ok += 1
+        else:
+            self.fail(data.get("error"), endpoint_name, episode)
+        self.reporter.status(endpoint_name, status, data, episode=episode)
+
+    def episode(self, episode):
+        """Reports an episode of the episode listing"""
+        self.reporter.episode(episode)
+
+    def fail(self, error, endpoint_name=None, episode=None):
+        """Counts a failure, e.g. of a call or of the whole podcast"""
+        self.failed += 1
+        if len(self.failures) < MAX_LISTED_FAILURES:
+            self.failures.append(
+                {"endpoint": endpoint_name, "episode": episode, "error": str(error)}
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """Returns the counts and the first failures"""
+        return {"ok": self.ok, "failed": self.failed, "failures": self.failures}
+
+    def close(self):
+        """Closes the reporter it passes results on to"""
+        if hasattr(self.reporter, "close"):
+            self.reporter.close()
+
+
+def _init_worker(rate_limit_db: Optional[str]):
+    """Sets up a worker process"""
+    if rate_limit_db:
+        # All workers share one request budget
+        set_default_rate_limiter(SQLiteRateLimiter(rate_limit_db))
+
+
+def _shared_files(stack: ExitStack, args) -> Namespace:
+    """Returns the args with a token cache and a rate limiter database in a
+    temporary directory unless they were given, so all workers share them"""
+    if args.token_cache is not None and args.rate_limit_db:
+        return args
+    # Removed by the stack when the run is done
+    # pylint: disable-next=consider-using-with
+    run_dir = Path(stack.enter_context(TemporaryDirectory(prefix="spotifyconnector-")))
+    shared = {}
+    if args.token_cache is None:
+        shared["token_cache"] = str(run_dir / "tokens")
+    if not args.rate_limit_db:
+        shared["rate_limit_db"] = str(run_dir / "ratelimit.db")
+    return Namespace(**{**vars(args), **shared})
+
+
+def _deadline(deadline_at: Optional[float]) -> Optional[Deadline]:
+    """Returns a deadline until the wall clock time ``deadline_at``, if any"""
+    if deadline_at is None:
+        return None
+    return Deadline(max(0.0, deadline_at - time.time()))
+
+
+def _spotify_account(account: Dict[str, Any], base_url: str, args) -> SpotifyAccount:
+    """Returns the SpotifyAccount of an account in the config file"""
+    return SpotifyAccount(
+        base_url,
+        account["client_id"],
+        account["sp_dc"],
+        account["sp_key"],
+        pool_maxsize=max(DEFAULT_POOL_MAXSIZE, args.concurrency),
+        token_cache=(
+            FileTokenCache(args.token_cache or None)
+            if args.token_cache is not None
+            else None
+        ),
+        accounts_url=os.environ.get("SPOTIFY_ACCOUNTS_URL", ACCOUNTS_URL),
+        # Shards can take longer than a token is valid
+        background_refresh=True,
+    )
+
+
+def list_podcasts(
+    account: Dict[str, Any],
+    base_url: str,
+    args,
+    deadline_at: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Lists the podcasts in the catalog of an account. Runs in a worker
+    process.
+
+    Args:
+        account (Dict[str, Any]): The account, as in the config file.
+        base_url (str): Base URL for the API.
+        args: The parsed command line arguments.
+        deadline_at (Optional[float]): Wall clock time (as in
+          :func:`time.time`) by which the whole run must be done (optional).
+
+    Returns:
+        Dict[str, Any]: The account name, the podcast ids and the error that
+        stopped the listing, if any.
+    """
+    result = {"account": account["name"], "podcasts": [], "error": None}
+    try:
+        with (
+            _deadline(deadline_at) or nullcontext(),
+            _spotify_account(account, base_url, args) as spotify_account,
+        ):
+            result["podcasts"] = [show["id"] for show in spotify_account.catalog()]
+    except Exception as error:  # pylint: disable=broad-except
+        logger.error("{}: {}", account["name"], str(error))
+        result["error"] = str(error)
+    return result
+
+
+def sync_account(
+    account: Dict[str, Any],
+    base_url: str,
+    args,
+    deadline_at: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Syncs the podcasts of an account, or of a shard of it. Runs in a
+    worker process.
+
+    Args:
+        account (Dict[str, Any]): The account, as in the config file. Without
+          podcasts, all podcasts in its catalog are synced.
+        base_url (str): Base URL for the API.
+        args: The parsed command line arguments.
+        deadline_at (Optional[float]): Wall clock time (as in
+          :func:`time.time`) by which the whole run must be done (optional).
+
+    Returns:
+        Dict[str, Any]: Summary of the account: the counts per podcast,
+        the time it took and the error that stopped it, if any.
+    """
+    # Imported here, as the command line interface imports this module
+    # pylint: disable-next=import-outside-toplevel
+    from .__main__ import LogReporter, run
+
+    started = time.perf_counter()
+    summary = {"account": account["name"], "podcasts": {}, "error": None}
+    try:
+        with (
+            _deadline(deadline_at) or nullcontext(),
+            _spotify_account(account, base_url, args) as spotify_account,
+        ):
+            podcasts = account["podcasts"] or [
+                show["id"] for show in spotify_account.catalog()
+            ]
+            for podcast_id in podcasts:
+                reporter = SummaryReporter(
+                    Exporter(
+                        Path(args.out) / account["name"] / podcast_id,
+                        args.format,
+                        compress=args.gzip,
+                    )
+                    if args.out
+                    else LogReporter()
+                )
+                try:
+                    run(spotify_account.podcast(podcast_id), args, reporter)
+                except Exception as error:  # pylint: disable=broad-except
+                    logger.error("{} {}: {}", account["name"], podcast_id, str(error))
+                    reporter.fail(error)
+                finally:
+                    reporter.close()
+                    summary["podcasts"][podcast_id] = reporter.summary()
+    except Exception as error:  # pylint: disable=broad-except
+        logger.error("{}: {}", account["name"], str(error))
+        summary["error"] = str(error)
+    summary["seconds"] = round(time.perf_counter() - started, 3)
+    return summary
+
+
+def plan_shards(
+    accounts: List[Dict[str, Any]], shard_size: int = DEFAULT_SHARD_SIZE
+) -> List[Dict[str, Any]]:
+    """Splits the podcasts of the accounts into shards.
+
+    Args:
+        accounts (List[Dict[str, Any]]): Accounts with their podcasts.
+        shard_size (int): Maximum number of podcasts per shard.
+
+    Returns:
+        List[Dict[str, Any]]: A copy of the account for each shard, with the
+        podcasts of the shard. Accounts with the most podcasts come first,
+        so that the workers finish at about the same time.
+    """
+    accounts = sorted(accounts, key=lambda account: len(account["podcasts"]))
+    return [
+        {**account, "podcasts": account["podcasts"][i : i + shard_size]}
+        for account in reversed(accounts)
+        for i in range(0, len(account["podcasts"]), shard_size)
+    ]
+
+
+def merge_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merges the summaries of the shards of each account"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        account = merged.setdefault(
+            result["account"],
+            {"account": result["account"], "podcasts": {}, "error": None},
+        )
+        account["podcasts"].update(result["podcasts"])
+        if result["error"]:
+            errors = filter(None, (account["error"], result["error"]))
+            account["error"] = "; ".join(errors)
+        account["seconds"] = round(
+            account.get("seconds", 0.0) + result.get("seconds", 0.0), 3
+        )
+    return list(merged.values())
+
+
+def summarize(results: List[Dict[str, Any]], seconds: float) -> Dict[str, Any]:
+    """Merges the summaries of the accounts into one of the run"""
+    podcasts = [
+        podcast for result in results for podcast in result["podcasts"].values()
+    ]
+    return {
+        "accounts": len(results),
+        "failed_accounts": sorted(
+            result["account"] for result in results if result["error"]
+        ),
+        "podcasts": len(podcasts),
+        "calls": {
+            "ok": sum(podcast["ok"] for podcast in podcasts),
+            "failed": sum(podcast["failed"] for podcast in podcasts),
+        },
+        "seconds": round(seconds, 3),
+        "results": sorted(results, key=lambda result: result["account"]),
+    }
+
+
+def _resolve_catalogs(
+    executor, accounts: List[Dict[str, Any]], base_url: str, args, deadline_at
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Lists the podcasts of the accounts that have none in the config.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]: The accounts with
+        podcasts to sync, and the results of the accounts that have none
+        or whose catalog could not be listed.
+    """
+    ready = [account for account in accounts if account["podcasts"]]
+    futures = {
+        executor.submit(list_podcasts, account, base_url, args, deadline_at): account
+        for account in accounts
+        if not account["podcasts"]
+    }
+    results = []
+    for future in as_completed(futures):
+        account = futures[future]
+        try:
+            listing = future.result()
+        except Exception as error:  # pylint: disable=broad-except
+            # The worker process died
+            listing = {"podcasts": [], "error": str(error) or repr(error)}
+        if listing["podcasts"] and not listing["error"]:
+            ready.append({**account, "podcasts": listing["podcasts"]})
+        else:
+            results.append(
+                {"account": account["name"], "podcasts": {}, "error": listing["error"]}
+            )
+    return ready, results
+
+
+def _sync_shards(
+    executor, shards: List[Dict[str, Any]], base_url: str, args, deadline_at
+) -> List[Dict[str, Any]]:
+    """Syncs the shards on the pool and returns their results"""
+    futures = {
+        executor.submit(sync_account, shard, base_url, args, deadline_at): shard
+        for shard in shards
+    }
+    results = []
+    for future in as_completed(futures):
+        shard = futures[future]
+        try:
+            result = future.result()
+        except Exception as error:  # pylint: disable=broad-except
+            # The worker process died
+            result = {
+                "account": shard["name"],
+                "podcasts": {},
+                "error": str(error) or repr(error),
+            }
+        results.append(result)
+        logger.info(
+            "{} {}/{}: {} ({} podcasts)",
+            "✗" if result["error"] else "✓",
+            len(results),
+            len(shards),
+            result["account"],
+            len(shard["podcasts"]),
+        )
+    return results
+
+
+def sync_all(
+    config: Dict[str, Any],
+    args,
+    workers: int,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> Dict[str, Any]:
+    """Syncs all accounts of a config on a pool of worker processes.
+
+    The catalogs of accounts without podcasts in the config are listed first.
+    Then the podcasts of all accounts are synced in shards of ``shard_size``
+    (see :func:`plan_shards`). Without ``--token-cache``, the shards of an
+    account share its token through a token cache in a temporary directory.
+    Without ``--rate-limit-db``, all workers share one request budget through
+    a rate limiter database in that directory.
+
+    Args:
+        config (Dict[str, Any]): The config, as returned by :func:`load_config`.
+        args: The parsed command line arguments.
+        workers (int): Number of worker processes.
+        shard_size (int): Maximum number of podcasts per shard.
+
+    Returns:
+        Dict[str, Any]: Summary of the run, see :func:`summarize`.
+    """
+    started = time.perf_counter()
+    base_url = config.get("base_url") or os.environ.get("SPOTIFY_BASE_URL")
+    deadline_at = time.time() + args.deadline if args.deadline else None
+
+    with ExitStack() as stack:
+        args = _shared_files(stack, args)
+        executor = stack.enter_context(
+            ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(args.rate_limit_db,),
+            )
+        )
+
+        accounts, results = _resolve_catalogs(
+            executor, config["accounts"], base_url, args, deadline_at
+        )
+        results += _sync_shards(
+            executor, plan_shards(accounts, shard_size), base_url, args, deadline_at
+        )
+    return summarize(merge_results(results), time.perf_counter() - started)
@@ -0,0 +1,134 @@
+"""
+Planner for impressions over arbitrary date ranges.
+
+"total" and "faceted" impressions are only available for windows of exactly
+``IMPRESSIONS_DAYS_DIFF`` days after the start date. The planner covers a
+range with the fewest such windows, skips windows that were already
+requested in this session, and requests the others concurrently.
+"""
+
+import datetime as dt
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List
+
+from .connector import IMPRESSIONS_DAYS_DIFF
+from .prefetch import prefetched
+
+# Kinds of impressions that are only available for fixed windows
+FIXED_WINDOW_KINDS = ("total", "faceted")
+# Number of windows requested at the same time
+DEFAULT_PLANNER_CONCURRENCY = 4
+
+
+@dataclass(frozen=True)
+class ImpressionsWindow:
+    """A date range that impressions are requested for.
+
+    Attributes:
+        kind (str): Kind of impressions.
+        start (dt.date): First day of the window.
+        end (dt.date): Last day of the window.
+    """
+
+    kind: str
+    start: dt.date
+    end: dt.date
+
+    @property
+    def label(self) -> str:
+        """The window as ``<start>..<end>``, e.g. for logs and JSON keys."""
+        return f"{self.start.isoformat()}..{self.end.isoformat()}"
+
+
+def _as_date(day: dt.date) -> dt.date:
+    # Datetimes would make equal windows differ by their time
+    return day.date() if isinstance(day, dt.datetime) else day
+
+
+def plan_windows(kind: str, start: dt.date, end: dt.date) -> List[ImpressionsWindow]:
+    """Returns the fewest windows that cover the days from ``start`` to ``end``.
+
+    For "total" and "faceted", windows start at ``start`` and follow each
+    other without gaps. The last window ends at ``end``, so it overlaps with
+    the one before instead of reaching past the range. Ranges shorter than
+    a window get a single window from ``start`` on. Other kinds are not
+    restricted and get a single window for the whole range.
+    """
+    start, end = _as_date(start), _as_date(end)
+    if end < start:
+        raise ValueError(f"End date {end} is before start date {start}")
+
+    if kind not in FIXED_WINDOW_KINDS:
+        return [ImpressionsWindow(kind, start, end)]
+
+    length = dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
+    windows = []
+    window_start = start
+    while True:
+        window_end = window_start + length
+        if window_end >= end:
+            # Align the last window with the end of the range
+            window_start = max(start, end - length)
+            windows.append(ImpressionsWindow(kind, window_start, window_start + length))
+            return windows
+        windows.append(ImpressionsWindow(kind, window_start, window_end))
+        window_start = window_end + dt.timedelta(days=1)
+
+
+class ImpressionsPlanner:  # pylint: disable=too-few-public-methods
+    """Requests impressions of a podcast for arbitrary date ranges."""
+
+    def __init__(
+        self,
+        connector,
+        concurrency: int = DEFAULT_PLANNER_CONCURRENCY,
+    ):
+        """Initializes the ImpressionsPlanner object.
+
+        Args:
+            connector (SpotifyConnector): Connector of the podcast.
+            concurrency (int): Maximum number of windows requested at once.
+        """
+        self.connector = connector
+        self.concurrency = concurrency
+
+        # Responses of the windows requested in this session
+        self._results: Dict[ImpressionsWindow, dict] = {}
+        self._lock = Lock()
+
+    def _fetch_window(self, window: ImpressionsWindow) -> dict:
+        data = self.connector.impressions(window.kind, window.start, window.end)
+        with self._lock:
+            self._results[window] = data
+        return data
+
+    def fetch(
+        self, kind: str, start: dt.date, end: dt.date
+    ) -> Dict[ImpressionsWindow, dict]:
+        """Loads impressions for the days from ``start`` to ``end``.
+
+        Windows that were already requested by this planner are not requested
+        again. With a response cache on the connector, windows requested by
+        earlier runs are answered from the cache.
+
+        Args:
+            kind (str): Kind of impressions, see
+              :meth:`SpotifyConnector.impressions`.
+            start (dt.date): Earliest date to request data for.
+            end (dt.date): Most recent date to request data for.
+
+        Returns:
+            Dict[ImpressionsWindow, dict]: Response data from API per window,
+            ordered by start date.
+        """
+        windows = plan_windows(kind, start, end)
+        with self._lock:
+            missing = [window for window in windows if window not in self._results]
+
+        # Wait for all windows before reading them back
+        for _ in prefetched(self._fetch_window, missing, self.concurrency):
+            pass
+
+        with self._lock:
+            return {window: self._results[window] for window in windows}
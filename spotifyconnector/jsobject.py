@@ -0,0 +1,206 @@
+"""
+Parser for JavaScript object literals.
+
+The authorize page of the Spotify accounts service embeds its result as a
+JavaScript object (``const authorizationResponse = {...};``), which is not
+strict JSON: keys may be unquoted, strings single-quoted, and there may be
+trailing commas or comments. This parser reads such literals into Python
+values, without evaluating any code.
+"""
+
+import re
+from typing import Any, Tuple
+
+# Literal names and the values they stand for
+_CONSTANTS = {
+    "true": True,
+    "false": False,
+    "null": None,
+    "undefined": None,
+    "NaN": float("nan"),
+    "Infinity": float("inf"),
+}
+_ESCAPES = {
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+    "0": "\0",
+}
+
+_SPACE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.DOTALL)
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_NUMBER = re.compile(
+    r"[+-]?(?:0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|Infinity)"
+)
+_STRING_CHARS = {
+    "'": re.compile(r"[^'\\\n]*"),
+    '"': re.compile(r'[^"\\\n]*'),
+}
+
+
+class JSObjectError(ValueError):
+    """Raised when a JavaScript object literal can't be parsed."""
+
+    def __init__(self, message: str, text: str, pos: int):
+        super().__init__(f"{message} at position {pos}: {text[pos:pos + 20]!r}")
+        self.pos = pos
+
+
+class _Parser:
+    """Recursive descent parser over a string"""
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def skip(self, pos: int) -> int:
+        """Returns the position after whitespace and comments"""
+        return _SPACE.match(self.text, pos).end()
+
+    def value(self, pos: int) -> Tuple[Any, int]:
+        """Parses the value at ``pos``. Returns it and the position after it."""
+        pos = self.skip(pos)
+        char = self.text[pos : pos + 1]
+        if char == "{":
+            return self.object(pos + 1)
+        if char == "[":
+            return self.array(pos + 1)
+        if char in _STRING_CHARS:
+            return self.string(pos)
+
+        match = _NUMBER.match(self.text, pos)
+        if match:
+            return _number(match.group()), match.end()
+        match = _IDENTIFIER.match(self.text, pos)
+        if match and match.group() in _CONSTANTS:
+            return _CONSTANTS[match.group()], match.end()
+        raise JSObjectError("Expected a value", self.text, pos)
+
+    def object(self, pos: int) -> Tuple[dict, int]:
+        """Parses the members of an object after its ``{``"""
+        result = {}
+        while True:
+            pos = self.skip(pos)
+            if self.text.startswith("}", pos):
+                return result, pos + 1
+
+            key, pos = self.key(pos)
+            pos = self.skip(pos)
+            if not self.text.startswith(":", pos):
+                raise JSObjectError("Expected ':'", self.text, pos)
+            result[key], pos = self.value(pos + 1)
+
+            pos = self.skip(pos)
+            if self.text.startswith(",", pos):
+                pos += 1
+            elif not self.text.startswith("}", pos):
+                raise JSObjectError("Expected ',' or '}'", self.text, pos)
+
+    def key(self, pos: int) -> Tuple[str, int]:
+        """Parses an object key: a string, a name or a number"""
+        if self.text[pos : pos + 1] in _STRING_CHARS:
+            return self.string(pos)
+        match = _IDENTIFIER.match(self.text, pos) or _NUMBER.match(self.text, pos)
+        if match is None:
+            raise JSObjectError("Expected a key", self.text, pos)
+        return match.group(), match.end()
+
+    def array(self, pos: int) -> Tuple[list, int]:
+        """Parses the items of an array after its ``[``"""
+        result = []
+        while True:
+            pos = self.skip(pos)
+            if self.text.startswith("]", pos):
+                return result, pos + 1
+
+            item, pos = self.value(pos)
+            result.append(item)
+
+            pos = self.skip(pos)
+            if self.text.startswith(",", pos):
+                pos += 1
+            elif not self.text.startswith("]", pos):
+                raise JSObjectError("Expected ',' or ']'", self.text, pos)
+
+    def string(self, pos: int) -> Tuple[str, int]:
+        """Parses a single- or double-quoted string"""
+        quote = self.text[pos]
+        chars = _STRING_CHARS[quote]
+        parts = []
+        start = pos
+        pos += 1
+        while True:
+            match = chars.match(self.text, pos)
+            parts.append(match.group())
+            pos = match.end()
+            char = self.text[pos : pos + 1]
+            if char == quote:
+                return "".join(parts), pos + 1
+            if char != "\\":
+                raise JSObjectError("Unterminated string", self.text, start)
+            part, pos = self.escape(pos + 1)
+            parts.append(part)
+
+    def escape(self, pos: int) -> Tuple[str, int]:
+        """Parses the escape sequence after a backslash"""
+        char = self.text[pos : pos + 1]
+        if char in ("u", "x"):
+            digits = 4 if char == "u" else 2
+            code = self.text[pos + 1 : pos + 1 + digits]
+            if len(code) != digits or not all(
+                c in "0123456789abcdefABCDEF" for c in code
+            ):
+                raise JSObjectError("Invalid escape sequence", self.text, pos - 1)
+            return chr(int(code, 16)), pos + 1 + digits
+        if char == "\n":
+            # Line continuation
+            return "", pos + 1
+        if not char:
+            raise JSObjectError("Unterminated string", self.text, pos - 1)
+        return _ESCAPES.get(char, char), pos + 1
+
+
+def _number(text: str) -> Any:
+    sign = -1 if text.startswith("-") else 1
+    digits = text.lstrip("+-")
+    if digits == "Infinity":
+        return sign * float("inf")
+    if digits[:2] in ("0x", "0X"):
+        return sign * int(digits, 16)
+    if any(char in digits for char in ".eE"):
+        return float(text)
+    return int(text)
+
+
+def decode_js_object(text: str, pos: int = 0) -> Tuple[Any, int]:
+    """Parses the JavaScript literal that starts at ``pos`` of ``text``,
+    ignoring any text after it.
+
+    Args:
+        text (str): Text containing the literal, e.g. a script.
+        pos (int): Position of the literal (or whitespace before it).
+
+    Returns:
+        Tuple[Any, int]: The value and the position after the literal.
+
+    Raises:
+        JSObjectError: If there is no valid literal at ``pos``.
+    """
+    return _Parser(text).value(pos)
+
+
+def parse_js_object(text: str) -> Any:
+    """Parses a string that holds exactly one JavaScript literal,
+    like :func:`json.loads` for JSON.
+
+    Raises:
+        JSObjectError: If the string is not a valid literal.
+    """
+    parser = _Parser(text)
+    value, pos = parser.value(0)
+    pos = parser.skip(pos)
+    if pos != len(text):
+        raise JSObjectError("Unexpected text after the value", text, pos)
+    return value
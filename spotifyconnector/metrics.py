@@ -0,0 +1,197 @@
+"""
+Metrics of API calls.
+
+The connector reports one :class:`CallEvent` per call to its metrics hooks:
+the endpoint, the outcome, how many attempts it took, the size of the
+response and where the time went (authentication, network, JSON decoding
+and backoff sleeps). :class:`PrometheusTextfileExporter` is a hook that
+sums up the events for the textfile collector of the Prometheus node
+exporter.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .fileutil import write_atomic
+
+# Minimum seconds between two writes of the textfile, unless forced
+DEFAULT_WRITE_INTERVAL = 15.0
+
+# Phases of a call that time is spent in
+PHASES = ("auth", "network", "decode", "backoff")
+
+
+@dataclass
+class CallEvent:  # pylint: disable=too-many-instance-attributes
+    """Metrics of one API call, including all of its attempts.
+
+    Attributes:
+        endpoint (str): Endpoint name, e.g. ``streams``.
+        url (str): Requested URL, without query parameters.
+        status (Optional[int]): HTTP status of the last response, if any.
+        ok (bool): Whether the call returned data.
+        attempts (int): Requests sent, 0 for cache hits.
+        bytes (int): Size of the response body.
+        auth (float): Seconds spent authenticating.
+        network (float): Seconds spent sending requests and reading responses.
+        decode (float): Seconds spent decoding JSON.
+        backoff (float): Seconds spent sleeping before retries.
+        cached (bool): Whether the response came from the response cache.
+        shared (bool): Whether the response was shared from an identical
+          call in progress.
+        error (Optional[str]): Error that failed the call.
+    """
+
+    endpoint: str
+    url: str
+    status: Optional[int] = None
+    ok: bool = False
+    attempts: int = 0
+    bytes: int = 0
+    auth: float = 0.0
+    network: float = 0.0
+    decode: float = 0.0
+    backoff: float = 0.0
+    cached: bool = False
+    shared: bool = False
+    error: Optional[str] = None
+
+    @property
+    def seconds(self) -> float:
+        """Total seconds of the call."""
+        return self.auth + self.network + self.decode + self.backoff
+
+    @property
+    def outcome(self) -> str:
+        """HTTP status of the call, ``cached``, ``shared`` or ``error``."""
+        if self.cached:
+            return "cached"
+        if self.shared:
+            return "shared"
+        if self.status is not None:
+            return str(self.status)
+        return "error"
+
+
+MetricsHook = Callable[[CallEvent], None]
+
+
+def emit(hooks, event: CallEvent):
+    """Passes an event to each hook. Errors of hooks are logged, so that
+    metrics never fail a call."""
+    for hook in hooks:
+        try:
+            hook(event)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            logger.warning("Metrics hook {} failed: {}", hook, error)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusTextfileExporter:
+    """Metrics hook that writes counters in the Prometheus text format.
+
+    The file is replaced atomically, at most every ``write_interval``
+    seconds while events arrive and on :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        write_interval: float = DEFAULT_WRITE_INTERVAL,
+        prefix: str = "spotifyconnector",
+    ):
+        """Initializes the PrometheusTextfileExporter object.
+
+        Args:
+            path (str): File to write, e.g. in the node exporter's
+              ``--collector.textfile.directory``. Should end in ``.prom``.
+            write_interval (float): Minimum seconds between two writes.
+            prefix (str): Prefix of the metric names.
+        """
+        self.path = Path(path)
+        self.write_interval = write_interval
+        self.prefix = prefix
+
+        self._lock = Lock()
+        self._last_write: Optional[float] = None
+        self._calls: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._attempts: Dict[str, int] = defaultdict(int)
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+
+    def __call__(self, event: CallEvent):
+        with self._lock:
+            self._calls[event.endpoint, event.outcome] += 1
+            self._attempts[event.endpoint] += event.attempts
+            self._bytes[event.endpoint] += event.bytes
+            for phase in PHASES:
+                self._seconds[event.endpoint, phase] += getattr(event, phase)
+            due = (
+                self._last_write is None
+                or monotonic() - self._last_write >= self.write_interval
+            )
+        if due:
+            self.write()
+
+    def render(self) -> str:
+        """Returns the current counters in the Prometheus text format."""
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append(f"# HELP {self.prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {self.prefix}_{name} counter")
+            for labels, value in sorted(samples.items()):
+                label_text = ",".join(
+                    f'{key}="{_escape(label)}"' for key, label in labels
+                )
+                lines.append(f"{self.prefix}_{name}{{{label_text}}} {value}")
+
+        with self._lock:
+            metric(
+                "calls_total",
+                "API calls by endpoint and final status.",
+                {
+                    (("endpoint", endpoint), ("status", outcome)): count
+                    for (endpoint, outcome), count in self._calls.items()
+                },
+            )
+            metric(
+                "attempts_total",
+                "Requests sent, including retries.",
+                {(("endpoint", key),): value for key, value in self._attempts.items()},
+            )
+            metric(
+                "response_bytes_total",
+                "Bytes of response bodies.",
+                {(("endpoint", key),): value for key, value in self._bytes.items()},
+            )
+            metric(
+                "seconds_total",
+                "Seconds spent in API calls by phase.",
+                {
+                    (("endpoint", endpoint), ("phase", phase)): round(value, 6)
+                    for (endpoint, phase), value in self._seconds.items()
+                },
+            )
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Writes the counters to the file now."""
+        text = self.render()
+        with self._lock:
+            self._last_write = monotonic()
+            # The collector never reads a partially written file
+            write_atomic(self.path, text, mode=0o644)
+
+    def close(self):
+        """Writes the final counters."""
+        self.write()
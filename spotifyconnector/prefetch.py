@@ -0,0 +1,40 @@
+"""
+Ordered, bounded fan-out of calls to worker threads, shared by the episode
+listing, backfills and the impressions planner.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from itertools import islice
+from typing import Callable, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def prefetched(func: Callable[[T], R], args: Iterable[T], window: int) -> Iterator[R]:
+    """
+    Calls ``func`` for each of ``args`` on ``window`` worker threads and
+    yields the results in the order of ``args``.
+
+    At most ``window`` calls are outstanding (running or buffered) at any
+    time, so memory is bounded by the window and not by the number of args.
+    The calls run in the context of the caller, e.g. its deadline.
+    """
+    args = iter(args)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        try:
+            for arg in islice(args, window):
+                pending.append(executor.submit(copy_context().run, func, arg))
+
+            while pending:
+                result = pending.popleft().result()
+                for arg in islice(args, 1):
+                    pending.append(executor.submit(copy_context().run, func, arg))
+                yield result
+        finally:
+            # Don't start outstanding calls if the consumer stops early
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,273 @@
+"""
+Client-side rate limiting for the Spotify API.
+
+A token bucket whose refill rate is adjusted with AIMD (additive increase,
+multiplicative decrease): every successful request raises the rate a bit,
+every 429 response cuts it, and a ``Retry-After`` header pauses all callers.
+
+By default, all connectors in a process share one limiter. The SQLite-backed
+limiter shares one budget between several processes on the same host.
+"""
+
+import datetime as dt
+from contextlib import contextmanager
+from dataclasses import astuple, dataclass
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import Iterator, Optional
+
+# Requests per second at startup and the bounds of the adaptive rate
+DEFAULT_RATE = 5.0
+DEFAULT_MIN_RATE = 0.2
+DEFAULT_MAX_RATE = 20.0
+# Number of requests that can be sent at once
+DEFAULT_BURST = 10
+# Requests per second added after each successful request
+DEFAULT_INCREASE = 0.05
+# Factor applied to the rate after a 429 response
+DEFAULT_DECREASE = 0.5
+# Minimum seconds between two decreases, so a burst of 429s
+# from concurrent requests only counts once
+DEFAULT_COOLDOWN = 1.0
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """
+    Parses a ``Retry-After`` header (delay in seconds or HTTP date)
+    into seconds from now. Returns None if the header is missing or invalid.
+    """
+    if not isinstance(value, str):
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt.timezone.utc)
+    return max(0.0, (retry_at - dt.datetime.now(dt.timezone.utc)).total_seconds())
+
+
+@dataclass
+class _BucketState:
+    tokens: float
+    rate: float
+    updated: float
+    blocked_until: float = 0.0
+    last_decrease: float = float("-inf")
+
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter with AIMD rate adjustment."""
+
+    # Clock used for all timestamps, overridden by subclasses and tests
+    _clock = staticmethod(monotonic)
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        min_rate: float = DEFAULT_MIN_RATE,
+        max_rate: float = DEFAULT_MAX_RATE,
+        increase: float = DEFAULT_INCREASE,
+        decrease: float = DEFAULT_DECREASE,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ):
+        """Initializes the RateLimiter object.
+
+        Args:
+            rate (float): Initial rate in requests per second.
+            burst (int): Maximum number of requests sent at once.
+            min_rate (float): Lower bound of the adaptive rate.
+            max_rate (float): Upper bound of the adaptive rate.
+            increase (float): Requests per second added on each success.
+            decrease (float): Factor applied to the rate on each 429.
+            cooldown (float): Minimum seconds between two decreases.
+        """
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+
+        self._lock = Lock()
+        self._state = _BucketState(
+            tokens=burst,
+            rate=min(max(rate, min_rate), max_rate),
+            updated=self._clock(),
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[_BucketState]:
+        """Gives exclusive access to the bucket state."""
+        with self._lock:
+            yield self._state
+
+    @property
+    def rate(self) -> float:
+        """The current rate in requests per second."""
+        with self._transaction() as state:
+            return state.rate
+
+    def _take(self, state: _BucketState, now: float) -> float:
+        """Takes a token if possible. Returns the seconds to wait otherwise."""
+        if now < state.blocked_until:
+            return state.blocked_until - now
+
+        elapsed = max(0.0, now - state.updated)
+        state.tokens = min(self.burst, state.tokens + elapsed * state.rate)
+        state.updated = max(now, state.updated)
+        if state.tokens >= 1:
+            state.tokens -= 1
+            return 0.0
+        return (1 - state.tokens) / state.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until a request may be sent.
+
+        Args:
+            timeout (Optional[float]): Maximum seconds to wait (optional).
+
+        Returns:
+            bool: False if the request may not be sent within ``timeout``.
+        """
+        waited = 0.0
+        while True:
+            with self._transaction() as state:
+                wait = self._take(state, self._clock())
+            if wait <= 0:
+                return True
+            if timeout is not None and waited + wait > timeout:
+                return False
+            sleep(wait)
+            waited += wait
+
+    def on_success(self):
+        """Additively increases the rate after a successful request."""
+        with self._transaction() as state:
+            state.rate = min(self.max_rate, state.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        """Multiplicatively decreases the rate after a 429 response.
+
+        Args:
+            retry_after (Optional[float]): Seconds to pause all requests,
+              as sent by the API in the ``Retry-After`` header (optional).
+        """
+        now = self._clock()
+        with self._transaction() as state:
+            if now - state.last_decrease >= self.cooldown:
+                state.rate = max(self.min_rate, state.rate * self.decrease)
+                state.last_decrease = now
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            # Drop the remaining burst, tokens refill after the pause
+            state.tokens = 0.0
+            state.updated = max(now, state.blocked_until)
+
+
+class UnlimitedRateLimiter(RateLimiter):
+    """Rate limiter that never waits, for requests that don't reach the
+    Spotify API, e.g. replayed responses."""
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        return True
+
+    def on_success(self):
+        pass
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        pass
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """Rate limiter whose state is stored in a SQLite database,
+    so that several processes on one host share one budget.
+    """
+
+    # Wall clock time, as monotonic clocks are not comparable across processes
+    _clock = staticmethod(time)
+
+    def __init__(self, path: str, **kwargs):
+        """Initializes the SQLiteRateLimiter object.
+
+        The initial state is only written if the database is new; processes
+        joining later pick up the current rate.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            **kwargs: Arguments passed to :class:`RateLimiter`.
+        """
+        # Imported here, as most processes don't share their limiter
+        import sqlite3  # pylint: disable=import-outside-toplevel
+
+        super().__init__(**kwargs)
+        self.path = path
+        self._connection = sqlite3.connect(
+            path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limiter ("
+                "id INTEGER PRIMARY KEY CHECK (id = 0), "
+                "tokens REAL, rate REAL, updated REAL, "
+                "blocked_until REAL, last_decrease REAL)"
+            )
+            self._connection.execute(
+                "INSERT OR IGNORE INTO rate_limiter VALUES (0, ?, ?, ?, ?, ?)",
+                astuple(self._state),
+            )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[_BucketState]:
+        with self._lock:
+            # Take the write lock up front, so read-modify-write is atomic
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._connection.execute(
+                    "SELECT tokens, rate, updated, blocked_until, last_decrease "
+                    "FROM rate_limiter WHERE id = 0"
+                ).fetchone()
+                state = _BucketState(*row)
+                yield state
+                self._connection.execute(
+                    "UPDATE rate_limiter SET tokens = ?, rate = ?, updated = ?, "
+                    "blocked_until = ?, last_decrease = ? WHERE id = 0",
+                    astuple(state),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        """Closes the database connection."""
+        self._connection.close()
+
+
+_default_rate_limiter: Optional[RateLimiter] = None  # pylint: disable=invalid-name
+_default_lock = Lock()
+
+
+def get_default_rate_limiter() -> RateLimiter:
+    """Returns the rate limiter shared by all connectors in this process."""
+    global _default_rate_limiter  # pylint: disable=global-statement
+    with _default_lock:
+        if _default_rate_limiter is None:
+            _default_rate_limiter = RateLimiter()
+        return _default_rate_limiter
+
+
+def set_default_rate_limiter(rate_limiter: RateLimiter):
+    """Replaces the rate limiter shared by all connectors in this process,
+    e.g. with a :class:`SQLiteRateLimiter` to share it with other processes.
+    Connectors that were already created keep their limiter.
+    """
+    global _default_rate_limiter  # pylint: disable=global-statement
+    with _default_lock:
+        _default_rate_limiter = rate_limiter
@@ -0,0 +1,202 @@
+"""
+Compact record types for API responses.
+
+Records keep the values of a response row in ``__slots__`` instead of a
+dict, which takes a fraction of the memory when many rows are held.
+Keys that a record type doesn't know are kept as well, so ``to_dict``
+always returns the original row.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+R = TypeVar("R", bound="Record")
+
+
+class Record:
+    """Base class of the records.
+
+    Subclasses list their attributes in ``__slots__`` and the matching
+    response keys in ``_keys``.
+    """
+
+    __slots__ = ("_absent", "_extra")
+    _keys: Tuple[str, ...] = ()
+
+    def __init__(self, *values: Any, **extra: Any):
+        """Initializes the record from its values, in the order of ``_keys``.
+        Additional response keys can be given as keyword arguments."""
+        if len(values) != len(self._keys):
+            raise TypeError(
+                f"{type(self).__name__} takes {len(self._keys)} values, "
+                f"got {len(values)}"
+            )
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+        # Bit mask of the keys that were missing in the response
+        self._absent = 0
+        self._extra = extra or None
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+        """Creates a record from a response row."""
+        record = cls.__new__(cls)
+        absent = 0
+        for bit, (name, key) in enumerate(zip(cls.__slots__, cls._keys)):
+            if key in data:
+                setattr(record, name, data[key])
+            else:
+                setattr(record, name, None)
+                absent |= 1 << bit
+        record._absent = absent
+        if len(data) + bin(absent).count("1") > len(cls._keys):
+            record._extra = {
+                key: value for key, value in data.items() if key not in cls._keys
+            }
+        else:
+            record._extra = None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the record as the original response row."""
+        data = {
+            key: getattr(self, name)
+            for bit, (name, key) in enumerate(zip(self.__slots__, self._keys))
+            if not self._absent & (1 << bit)
+        }
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):  # pylint: disable=unidiomatic-typecheck
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+
+class Episode(Record):
+    """An episode of the episodes listing."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "release_date",
+        "duration",
+        "starts",
+        "streams",
+        "listeners",
+    )
+    _keys = ("id", "name", "releaseDate", "duration", "starts", "streams", "listeners")
+
+
+class StreamPoint(Record):
+    """Starts and streams of one day."""
+
+    __slots__ = ("date", "starts", "streams")
+    _keys = ("date", "starts", "streams")
+
+
+class ListenerPoint(Record):
+    """Listeners of one day."""
+
+    __slots__ = ("date", "count")
+    _keys = ("date", "count")
+
+
+class FollowerCount(Record):
+    """Followers of one day."""
+
+    __slots__ = ("date", "count")
+    _keys = ("date", "count")
+
+
+class AggregateFacet(Record):
+    """One entry of a facet of the aggregate data, e.g. the counts
+    of an age group. ``key`` is None for entries of list facets."""
+
+    __slots__ = ("facet", "key", "counts")
+    _keys = ("facet", "key", "counts")
+
+
+class RecordList(list):
+    """The rows of a response as records.
+
+    The other top-level values of the response (e.g. totals) are kept
+    in :attr:`meta`.
+    """
+
+    def __init__(
+        self,
+        records: Iterable[Record] = (),
+        key: Optional[str] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(records)
+        self.key = key
+        self.meta = meta or {}
+
+    @classmethod
+    def from_response(
+        cls, record_type: Type[Record], response: Dict[str, Any]
+    ) -> "RecordList":
+        """Converts the first array of rows in ``response`` to records."""
+        meta = dict(response)
+        for key, value in response.items():
+            if isinstance(value, list):
+                del meta[key]
+                return cls(map(record_type.from_dict, value), key, meta)
+        return cls((), None, meta)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the original response."""
+        data = dict(self.meta)
+        if self.key is not None:
+            data[self.key] = [record.to_dict() for record in self]
+        return data
+
+
+class FacetList(list):
+    """The entries of the facets of an aggregate response as records.
+
+    Top-level values that are not facets are kept in :attr:`meta`.
+    """
+
+    def __init__(
+        self,
+        facets: Iterable[AggregateFacet] = (),
+        meta: Optional[Dict[str, Any]] = None,
+    ):
+        super().__init__(facets)
+        self.meta = meta or {}
+
+    @classmethod
+    def from_response(cls, response: Dict[str, Any]) -> "FacetList":
+        """Converts the non-empty dict and list values of ``response``
+        to facet entries."""
+        facets: List[AggregateFacet] = []
+        meta = {}
+        for facet, value in response.items():
+            if isinstance(value, dict) and value:
+                facets.extend(
+                    AggregateFacet(facet, key, counts) for key, counts in value.items()
+                )
+            elif isinstance(value, list) and value:
+                facets.extend(AggregateFacet(facet, None, counts) for counts in value)
+            else:
+                meta[facet] = value
+        return cls(facets, meta)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the original response."""
+        data = dict(self.meta)
+        for entry in self:
+            if entry.key is None:
+                data.setdefault(entry.facet, []).append(entry.counts)
+            else:
+                data.setdefault(entry.facet, {})[entry.key] = entry.counts
+        return data
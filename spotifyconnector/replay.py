@@ -0,0 +1,289 @@
+"""
+Record and replay of API responses, for fast and deterministic offline runs.
+
+A :class:`Recorder` captures the response of every API request a connector
+makes into a gzip-compressed archive of JSON lines. A :class:`Replayer` serves
+the connector from such an archive, without network access or a login.
+
+Both are transports that are mounted on the connector's HTTP session:
+
+    with Recorder("run.jsonl.gz") as recorder:
+        connector = SpotifyConnector(..., transport=recorder)
+        ...
+
+    connector = SpotifyConnector(..., transport=Replayer("run.jsonl.gz"))
+
+Requests are matched by path (relative to the base URL) and query parameters.
+Replays on a later day match requests whose dates moved by the same number of
+days, so relative date ranges like "the last 7 days" are still found.
+"""
+
+import datetime as dt
+import gzip
+import json
+from abc import ABC, abstractmethod
+from http import HTTPStatus
+from io import BytesIO
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from loguru import logger
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+ARCHIVE_FORMAT = "spotifyconnector-archive"
+ARCHIVE_VERSION = 1
+# Responses that are retried by the connector are not recorded,
+# only the final response of a request is
+TRANSIENT_STATUSES = (401, 429, 500, 502, 503, 504)
+# Query parameters that hold dates, shifted when replaying on a later day
+DATE_PARAMS = ("start", "end")
+# Response headers kept in the archive
+RECORDED_HEADERS = ("Content-Type",)
+
+
+class ReplayMiss(LookupError):
+    """Raised when a replayed request is not in the archive.
+    Not retried by the connector, as the archive won't change.
+    """
+
+
+def _request_key(url: str, base_url: str) -> str:
+    """Returns the key of a request: its path relative to the base URL
+    and its sorted query parameters."""
+    parts = urlsplit(url)
+    path = f"{parts.scheme}://{parts.netloc}{parts.path}"
+    base_url = base_url.rstrip("/")
+    if path.startswith(base_url):
+        path = path[len(base_url) :]
+    query = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    return f"{path}?{urlencode(query)}" if query else path
+
+
+def _shift_dates(key: str, days: int) -> Optional[str]:
+    """Returns the key with its date parameters moved by ``days``,
+    or None if it has none."""
+    path, _, query = key.partition("?")
+    params = parse_qsl(query, keep_blank_values=True)
+    shifted = False
+    for i, (name, value) in enumerate(params):
+        if name not in DATE_PARAMS:
+            continue
+        try:
+            date = dt.date.fromisoformat(value)
+        except ValueError:
+            continue
+        params[i] = (name, (date + dt.timedelta(days=days)).isoformat())
+        shifted = True
+    return f"{path}?{urlencode(params)}" if shifted else None
+
+
+class Transport(ABC):
+    """Base class of the transports, which are mounted on the HTTP session
+    of a :class:`~spotifyconnector.account.SpotifyAccount`."""
+
+    # Whether requests go to Spotify, so a login and rate limiting are needed
+    online = True
+
+    @abstractmethod
+    def mount(self, session: requests.Session, base_url: str):
+        """Mounts the transport's adapter on ``session``.
+
+        Args:
+            session (requests.Session): Session of the account.
+            base_url (str): Base URL of the API.
+        """
+
+    def close(self):
+        """Releases the archive."""
+
+
+class _RecordingAdapter(BaseAdapter):
+    """Sends requests with another adapter and records the responses"""
+
+    def __init__(self, adapter: BaseAdapter, recorder: "Recorder", base_url: str):
+        super().__init__()
+        self._adapter = adapter
+        self._recorder = recorder
+        self._base_url = base_url
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        response = self._adapter.send(request, **kwargs)
+        if request.method == "GET" and response.status_code not in TRANSIENT_STATUSES:
+            # Reads streamed bodies as well, they are then served from memory
+            self._recorder.record(_request_key(request.url, self._base_url), response)
+        return response
+
+    def close(self):
+        self._adapter.close()
+
+
+class Recorder(Transport):
+    """Records the API responses of a connector to an archive.
+
+    Only requests to the API are recorded, not the login. Responses that the
+    connector retries (401, 429 and 5xx) are skipped. The archive is written
+    as responses arrive and complete once the recorder is closed.
+    """
+
+    def __init__(self, path: str):
+        """Initializes the Recorder object. An existing archive is replaced.
+
+        Args:
+            path (str): Path of the archive, e.g. ``run.jsonl.gz``.
+        """
+        self.path = path
+        self.count = 0
+        self._lock = Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        self._base_url: Optional[str] = None
+
+    def mount(self, session: requests.Session, base_url: str):
+        # Only the API is recorded, so tokens and cookies never reach the archive
+        session.mount(
+            base_url, _RecordingAdapter(session.get_adapter(base_url), self, base_url)
+        )
+        with self._lock:
+            if self._base_url is None:
+                self._base_url = base_url
+                self._write(
+                    {
+                        "format": ARCHIVE_FORMAT,
+                        "version": ARCHIVE_VERSION,
+                        "base_url": base_url,
+                        "recorded_at": dt.datetime.now().isoformat(),
+                    }
+                )
+
+    def _write(self, entry: dict):
+        self._file.write(json.dumps(entry, separators=(",", ":")))
+        self._file.write("\n")
+
+    def record(self, key: str, response: requests.Response):
+        """Adds a response to the archive."""
+        entry = {
+            "request": key,
+            "status": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in RECORDED_HEADERS
+                if name in response.headers
+            },
+            "body": response.content.decode("utf-8", errors="replace"),
+        }
+        with self._lock:
+            self._write(entry)
+            self.count += 1
+
+    def close(self):
+        """Completes the archive."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info("Recorded {} responses to {}", self.count, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _ReplayAdapter(BaseAdapter):
+    """Answers requests from an archive"""
+
+    def __init__(self, replayer: "Replayer", base_url: str):
+        super().__init__()
+        self._replayer = replayer
+        self._base_url = base_url
+
+    # pylint: disable-next=arguments-differ,unused-argument
+    def send(self, request, **kwargs):
+        key = _request_key(request.url, self._base_url)
+        entry = self._replayer.find(key) if request.method == "GET" else None
+        if entry is None:
+            raise ReplayMiss(
+                f"No recorded response for {request.method} {key} "
+                f"in {self._replayer.path}"
+            )
+        status, headers, body = entry
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = HTTPStatus(status).phrase
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.raw = BytesIO(body)
+        # The body is in memory, so streamed reads are served from it
+        response._content = body  # pylint: disable=protected-access
+        response._content_consumed = True  # pylint: disable=protected-access
+        return response
+
+    def close(self):
+        pass
+
+
+class Replayer(Transport):
+    """Serves API requests from an archive written by a :class:`Recorder`.
+
+    No requests leave the process: the login is skipped and requests that
+    are not in the archive raise :class:`ReplayMiss`.
+    """
+
+    online = False
+
+    def __init__(self, path: str, today: Optional[dt.date] = None):
+        """Initializes the Replayer object and loads the archive.
+
+        Args:
+            path (str): Path of the archive.
+            today (Optional[dt.date]): Day of the replay (optional), to match
+              requests whose dates moved since the recording. Defaults to
+              the current day.
+
+        Raises:
+            ValueError: If the file is not an archive of a supported version.
+        """
+        self.path = path
+        self._entries: Dict[str, Tuple[int, dict, bytes]] = {}
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            header = json.loads(file.readline() or "{}")
+            if header.get("format") != ARCHIVE_FORMAT:
+                raise ValueError(f"Not a response archive: {path}")
+            if header.get("version") != ARCHIVE_VERSION:
+                raise ValueError(
+                    f"Unsupported archive version {header.get('version')}: {path}"
+                )
+            for line in file:
+                entry = json.loads(line)
+                # A request recorded twice is answered with the last response
+                self._entries[entry["request"]] = (
+                    entry["status"],
+                    entry["headers"],
+                    entry["body"].encode("utf-8"),
+                )
+
+        self.base_url: str = header["base_url"]
+        self.recorded_at = dt.datetime.fromisoformat(header["recorded_at"])
+        self.shift_days = ((today or dt.date.today()) - self.recorded_at.date()).days
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find(self, key: str) -> Optional[Tuple[int, dict, bytes]]:
+        """Returns the status, headers and body recorded for a request key."""
+        entry = self._entries.get(key)
+        if entry is None and self.shift_days:
+            shifted = _shift_dates(key, -self.shift_days)
+            if shifted is not None:
+                entry = self._entries.get(shifted)
+        return entry
+
+    def mount(self, session: requests.Session, base_url: str):
+        adapter = _ReplayAdapter(self, base_url)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
@@ -0,0 +1,262 @@
+"""
+Retry policy for API calls and the login.
+
+One policy decides how often a call is attempted and how long to wait in
+between: delays grow with decorrelated jitter, so concurrent callers don't
+retry in lockstep, and a ``Retry-After`` header sent by the API takes
+precedence. Each endpoint family (e.g. ``impressions``) has a circuit
+breaker: after repeated failures, calls to it fail fast with
+:class:`CircuitOpen` for a while, instead of sleeping through their retries.
+"""
+
+import random
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Dict, Optional, Tuple, Type, TypeVar
+
+from loguru import logger
+
+from .deadline import check_deadline
+
+# Number of attempts of a call, including the first one
+DEFAULT_MAX_ATTEMPTS = 6
+# Seconds the delays between attempts start from, and their upper bound
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 120.0
+# Status codes of responses that are worth another attempt
+RETRY_STATUSES = (429, 502, 503, 504)
+# Failed attempts in a row after which an endpoint family is paused
+DEFAULT_FAILURE_THRESHOLD = 10
+# Seconds an endpoint family is paused, before calls are let through again
+DEFAULT_RESET_TIMEOUT = 60.0
+# Family of the login, so a broken accounts service doesn't retry on every call
+AUTH_FAMILY = "auth"
+
+R = TypeVar("R")
+
+
+class CircuitOpen(Exception):
+    """
+    Raised instead of calling an endpoint family that failed repeatedly
+    """
+
+    def __init__(self, family: str, retry_in: float):
+        super().__init__(
+            f"Calls to {family} are paused after repeated failures, "
+            f"retrying in {retry_in:.0f}s"
+        )
+        self.family = family
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Counts the failed attempts in a row of one endpoint family.
+
+    At the threshold, the circuit opens: calls fail fast until the reset
+    timeout has passed. Then a single call is let through (half-open) while
+    the others keep failing fast: its success closes the circuit and its
+    failure opens it again. If it reports neither within the reset timeout,
+    the next call is let through instead.
+    """
+
+    # Clock used for all timestamps, overridden in tests
+    _clock = staticmethod(monotonic)
+
+    def __init__(
+        self,
+        family: str,
+        failure_threshold: Optional[int] = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        """Initializes the CircuitBreaker object.
+
+        Args:
+            family (str): Name of the endpoint family, for errors and logs.
+            failure_threshold (Optional[int]): Failed attempts in a row that
+              open the circuit. None never opens it.
+            reset_timeout (float): Seconds the circuit stays open.
+        """
+        self.family = family
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._lock = Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        # When the call probing a half-open circuit was let through
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        """``closed``, ``open`` or ``half-open``."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._clock() < self._opened_at + self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def check(self):
+        """Raises CircuitOpen while the circuit is open, and while another
+        call probes the half-open circuit."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = self._clock()
+            retry_in = self._opened_at + self.reset_timeout - now
+            if retry_in <= 0 and self._probe_at is not None:
+                retry_in = self._probe_at + self.reset_timeout - now
+            if retry_in <= 0:
+                self._probe_at = now
+                return
+        raise CircuitOpen(self.family, retry_in)
+
+    def on_success(self):
+        """Closes the circuit after a successful attempt."""
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Calls to {} succeed again", self.family)
+            self._failures = 0
+            self._opened_at = None
+            self._probe_at = None
+
+    def on_failure(self):
+        """Counts a failed attempt and opens the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if (
+                self.failure_threshold is None
+                or self._failures < self.failure_threshold
+            ):
+                return
+            if self._opened_at is None:
+                logger.warning(
+                    "{} attempts in a row failed for {}, pausing its calls for {}s",
+                    self._failures,
+                    self.family,
+                    self.reset_timeout,
+                )
+            # Also reopens a half-open circuit
+            self._opened_at = self._clock()
+            self._probe_at = None
+
+
+class RetryPolicy:
+    """How API calls and the login are retried.
+
+    A policy is shared by all podcasts of an account, so that the circuit
+    breakers see the failures of all of them.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        jitter: bool = True,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+        failure_threshold: Optional[int] = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT,
+    ):
+        """Initializes the RetryPolicy object.
+
+        Args:
+            max_attempts (int): Attempts of a call, including the first one.
+            base_delay (float): Seconds the delays start from.
+            max_delay (float): Upper bound of a delay in seconds, also
+              applied to ``Retry-After``.
+            jitter (bool): Randomize the delays (decorrelated jitter).
+              Without jitter, each delay doubles the previous one.
+            retry_statuses (Tuple[int, ...]): Status codes that are retried.
+              Other errors (apart from a 401, which renews the token)
+              are raised right away.
+            failure_threshold (Optional[int]): Failed attempts in a row that
+              pause an endpoint family. None disables the circuit breakers.
+            reset_timeout (float): Seconds an endpoint family is paused.
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = Lock()
+
+    def next_delay(self, previous: float, retry_after: Optional[float] = None) -> float:
+        """Returns the seconds to wait before the next attempt.
+
+        Args:
+            previous (float): The previous delay, or ``base_delay`` before
+              the first retry.
+            retry_after (Optional[float]): Seconds the API asked to wait
+              in a ``Retry-After`` header (optional).
+        """
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        if not self.jitter:
+            return min(self.max_delay, previous * 2)
+        # Decorrelated jitter: random, but growing with the previous delay
+        upper = max(self.base_delay, previous * 3)
+        return min(self.max_delay, random.uniform(self.base_delay, upper))  # nosec B311
+
+    def breaker(self, family: str) -> CircuitBreaker:
+        """Returns the circuit breaker of an endpoint family."""
+        with self._breakers_lock:
+            if family not in self._breakers:
+                self._breakers[family] = CircuitBreaker(
+                    family, self.failure_threshold, self.reset_timeout
+                )
+            return self._breakers[family]
+
+    def call(
+        self,
+        func: Callable[[], R],
+        retry_on: Tuple[Type[Exception], ...],
+        family: str,
+    ) -> R:
+        """Calls ``func`` until it succeeds or the attempts are used up.
+
+        Args:
+            func (Callable[[], R]): Function to call.
+            retry_on (Tuple[Type[Exception], ...]): Errors that are retried.
+              Other errors are raised right away.
+            family (str): Endpoint family of the circuit breaker.
+
+        Returns:
+            R: The return value of ``func``.
+
+        Raises:
+            CircuitOpen: If the family is paused.
+            DeadlineExceeded: If a retry would wait past the current deadline.
+        """
+        breaker = self.breaker(family)
+        delay = self.base_delay
+        attempt = 1
+        while True:
+            breaker.check()
+            try:
+                result = func()
+            except retry_on as error:
+                breaker.on_failure()
+                if attempt == self.max_attempts:
+                    raise
+                delay = self.next_delay(delay)
+                logger.info(
+                    "{} failed: {} (attempt {}/{}), next delay: {:.1f}s",
+                    family,
+                    str(error),
+                    attempt,
+                    self.max_attempts,
+                    delay,
+                )
+                check_deadline(family, delay)
+                sleep(delay)
+                attempt += 1
+            else:
+                breaker.on_success()
+                return result
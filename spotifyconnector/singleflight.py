@@ -0,0 +1,122 @@
+"""
+Deduplication of identical concurrent API calls.
+
+When several threads request the same URL with the same params at the same
+time, only the first one (the leader) goes to the network. The others wait
+for it and get its response, or its error. Once the call is done, the next
+identical request goes to the network again; keeping responses is up to the
+response cache.
+
+Waiters keep to their own deadline. A leader that ran out of time or hit an
+open circuit doesn't pass that on: its waiters make the call themselves.
+"""
+
+import copy
+from dataclasses import dataclass, replace
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .deadline import DeadlineExceeded, current_deadline
+from .retry import CircuitOpen
+
+# Errors of the leader that depend on its own state, so waiters don't share them
+UNSHARED_ERRORS = (DeadlineExceeded, CircuitOpen)
+
+
+@dataclass
+class FlightStats:
+    """Counters of a :class:`SingleFlight`.
+
+    Attributes:
+        calls (int): Calls that were made.
+        hits (int): Calls that were saved by waiting for an identical one.
+    """
+
+    calls: int = 0
+    hits: int = 0
+
+
+class _Flight:  # pylint: disable=too-few-public-methods
+    """A call in progress and its outcome"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-safe coalescing of identical concurrent calls by key."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self._stats = FlightStats()
+
+    @property
+    def stats(self) -> FlightStats:
+        """A snapshot of the call and hit counters."""
+        with self._lock:
+            return replace(self._stats)
+
+    def do(
+        self, key: str, func: Callable[[], Any], what: str = "call"
+    ) -> Tuple[Any, bool]:
+        """Calls ``func``, unless a call with the same key is in progress.
+        Then waits for that call instead, at most until the deadline of the
+        current context.
+
+        Args:
+            key (str): Key of the call, e.g. the URL and params of a request.
+            func (Callable[[], Any]): Function to call.
+            what (str): Name of the call in the deadline report,
+              e.g. the endpoint.
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from
+            another call. Shared results are copies, so callers can't modify
+            each other's results.
+
+        Raises:
+            DeadlineExceeded: If the deadline passes while waiting.
+            Exception: The error raised by ``func``, also in waiting callers,
+              except for :data:`UNSHARED_ERRORS`.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                if flight is None:
+                    flight = self._flights[key] = _Flight()
+                    self._stats.calls += 1
+                    break
+                flight.waiters += 1
+                self._stats.hits += 1
+
+            deadline = current_deadline()
+            if not flight.done.wait(None if deadline is None else deadline.remaining()):
+                raise deadline.cancel(what)
+            if isinstance(flight.error, UNSHARED_ERRORS):
+                # Make the call, or wait for the next leader
+                continue
+            if flight.error is not None:
+                raise flight.error
+            return copy.deepcopy(flight.result), True
+
+        result = None
+        try:
+            result = func()
+            return result, False
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            # Later calls start a new flight, waiting ones get this outcome
+            with self._lock:
+                del self._flights[key]
+            if flight.waiters and flight.error is None:
+                # Waiters copy from a snapshot, as the caller may modify the result
+                flight.result = copy.deepcopy(result)
+            flight.done.set()
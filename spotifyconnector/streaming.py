@@ -0,0 +1,194 @@
+"""
+Incremental decoding of API responses, so rows can be processed while the
+response body is still being read.
+
+The responses of the list endpoints are JSON objects with one large array of
+rows (e.g. ``episodes`` or ``detailedStreams``) and a few small values (e.g.
+``totalPages``). :class:`JSONRowParser` returns each row of the array as soon
+as it is complete. Only the current row is buffered, so memory is bounded by
+the size of a row instead of the size of the response.
+"""
+
+import codecs
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Bytes read from the response at once
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Parser states: what is expected next
+_START = "start"
+_KEY = "key"
+_COLON = "colon"
+_VALUE = "value"
+_NEXT_KEY = "next_key"
+_ROW = "row"
+_NEXT_ROW = "next_row"
+_DONE = "done"
+
+# Returned if the buffer ends before the value
+_INCOMPLETE = object()
+
+
+class JSONRowParser:
+    """Incremental parser for a JSON object with an array of rows.
+
+    Feed it the response body in chunks. The rows of the array under ``key``
+    (or of the first array, if no key is given) are returned as soon as they
+    are complete. All other top-level values are collected in :attr:`meta`.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        """Initializes the JSONRowParser object.
+
+        Args:
+            key (Optional[str]): Key of the array of rows (optional).
+              Defaults to the first array in the object.
+        """
+        self.key = key
+        self.meta: Dict[str, Any] = {}
+
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._current_key: Optional[str] = None
+        self._rows_found = False
+
+    def feed(self, data: bytes) -> List[Any]:
+        """Parses the next chunk of the body. Returns the completed rows."""
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(data)
+        self._pos = 0
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        """Parses the rest of the body. Returns the remaining rows.
+
+        Raises:
+            ValueError: If the body is not a complete JSON object.
+        """
+        self._buffer = self._buffer[self._pos :] + self._text_decoder.decode(
+            b"", final=True
+        )
+        self._pos = 0
+        rows = self._parse(final=True)
+        if self._state != _DONE:
+            raise ValueError("Incomplete JSON response")
+        return rows
+
+    def _decode(self, final: bool) -> Any:
+        """Decodes the value at the current position, if it is complete."""
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return _INCOMPLETE
+        if end == len(self._buffer) and not final:
+            # A number at the end of the buffer may continue in the next chunk
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+    def _expect(self, char: str, expected: str):
+        if char not in expected:
+            raise ValueError(
+                f"Unexpected {char!r} in JSON response, expected one of {expected!r}"
+            )
+        self._pos += 1
+
+    def _parse(self, final: bool) -> List[Any]:  # pylint: disable=too-many-branches
+        rows = []
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos >= len(self._buffer):
+                return rows
+            char = self._buffer[self._pos]
+
+            if self._state == _START:
+                self._expect(char, "{")
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                    continue
+                key = self._decode(final)
+                if key is _INCOMPLETE:
+                    return rows
+                self._current_key = key
+                self._state = _COLON
+            elif self._state == _COLON:
+                self._expect(char, ":")
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if char == "[" and self._is_rows_key(self._current_key):
+                    self._pos += 1
+                    self._rows_found = True
+                    self._state = _ROW
+                    continue
+                value = self._decode(final)
+                if value is _INCOMPLETE:
+                    return rows
+                self.meta[self._current_key] = value
+                self._state = _NEXT_KEY
+            elif self._state == _NEXT_KEY:
+                self._expect(char, ",}")
+                self._state = _KEY if char == "," else _DONE
+            elif self._state in (_ROW, _NEXT_ROW):
+                if not self._parse_rows(rows, final):
+                    return rows
+            else:
+                raise ValueError("Unexpected data after the JSON response")
+
+    def _parse_rows(self, rows: List[Any], final: bool) -> bool:
+        """Parses rows until the end of the array, in a tight loop as this is
+        where almost all of the body is. Returns False if the buffer ends first.
+        """
+        buffer, pos, size = self._buffer, self._pos, len(self._buffer)
+        scan_once, skip = self._decoder.scan_once, _WHITESPACE.match
+        expect_row = self._state == _ROW
+
+        while pos < size:
+            char = buffer[pos]
+            if char in " \t\n\r":
+                pos = skip(buffer, pos).end()
+                continue
+            if char == "]":
+                self._pos = pos + 1
+                self._state = _NEXT_KEY
+                return True
+            if not expect_row:
+                self._pos = pos
+                self._expect(char, ",]")
+                pos += 1
+                expect_row = True
+                continue
+
+            try:
+                row, end = scan_once(buffer, pos)
+            except (StopIteration, json.JSONDecodeError) as error:
+                if final:
+                    raise ValueError(
+                        f"Invalid row in JSON response at {pos}"
+                    ) from error
+                break
+            if end == size and not final:
+                # A number at the end of the buffer may continue in the next chunk
+                break
+            rows.append(row)
+            pos = end
+            expect_row = False
+
+        self._pos = pos
+        self._state = _ROW if expect_row else _NEXT_ROW
+        return False
+
+    def _is_rows_key(self, key: str) -> bool:
+        if self.key is not None:
+            return key == self.key
+        return not self._rows_found
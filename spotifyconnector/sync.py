@@ -0,0 +1,177 @@
+"""
+Incremental sync, which only requests the days that were not fetched yet.
+
+A watermark (the last day that was fetched) is kept per show, endpoint and
+episode. The next sync starts a few days before the watermark, so that late
+corrections by Spotify are still picked up.
+"""
+
+import datetime as dt
+import json
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from loguru import logger
+
+from .fileutil import default_cache_dir, write_json_atomic
+
+# Endpoints that can be synced incrementally (all take a start and end date)
+SYNC_ENDPOINTS = ("streams", "listeners", "followers", "aggregate")
+# Days before the watermark that are requested again
+DEFAULT_OVERLAP_DAYS = 2
+# Days requested if there is no watermark yet
+DEFAULT_INITIAL_DAYS = 7
+
+
+def default_watermark_path() -> Path:
+    """Returns the default watermark file (in ``$XDG_CACHE_HOME``)."""
+    return default_cache_dir("sync") / "watermarks.json"
+
+
+class WatermarkStore:
+    """Thread-safe watermarks, stored in a JSON file.
+
+    Changes are only written to the file by :meth:`save`.
+    """
+
+    def __init__(self, path=None):
+        """Initializes the WatermarkStore object.
+
+        Args:
+            path (Optional[str]): JSON file to store watermarks in.
+              Defaults to ``~/.cache/spotifyconnector/sync/watermarks.json``.
+        """
+        self.path = Path(path) if path else default_watermark_path()
+        self._lock = Lock()
+        self._dirty = False
+        self._watermarks: Dict[str, str] = {}
+
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                self._watermarks = dict(json.load(file))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as error:
+            logger.warning("Ignoring unreadable watermark file: {}", error)
+
+    @staticmethod
+    def key(show: str, endpoint: str, episode: Optional[str] = None) -> str:
+        """Returns the key of a watermark."""
+        return f"{show}/{endpoint}/{episode or '-'}"
+
+    def get(
+        self, show: str, endpoint: str, episode: Optional[str] = None
+    ) -> Optional[dt.date]:
+        """Returns the last day fetched, if any."""
+        with self._lock:
+            value = self._watermarks.get(self.key(show, endpoint, episode))
+        return dt.date.fromisoformat(value) if value else None
+
+    def set(
+        self, show: str, endpoint: str, day: dt.date, episode: Optional[str] = None
+    ):
+        """Sets the last day fetched."""
+        with self._lock:
+            self._watermarks[self.key(show, endpoint, episode)] = day.isoformat()
+            self._dirty = True
+
+    def save(self):
+        """Writes the watermarks to the file, if they were changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(self.path, dict(sorted(self._watermarks.items())))
+            self._dirty = False
+
+
+class IncrementalSync:
+    """Requests data of a podcast from its watermarks on."""
+
+    def __init__(
+        self,
+        connector,
+        store: WatermarkStore,
+        overlap_days: int = DEFAULT_OVERLAP_DAYS,
+        initial_days: int = DEFAULT_INITIAL_DAYS,
+    ):
+        """Initializes the IncrementalSync object.
+
+        Args:
+            connector (SpotifyConnector): Connector of the podcast to sync.
+            store (WatermarkStore): Store for the watermarks.
+            overlap_days (int): Days before the watermark that are requested
+              again, to pick up late corrections.
+            initial_days (int): Days requested if there is no watermark yet.
+        """
+        self.connector = connector
+        self.store = store
+        self.overlap_days = overlap_days
+        self.initial_days = initial_days
+
+    def window(
+        self,
+        endpoint: str,
+        episode: Optional[str] = None,
+        end: Optional[dt.date] = None,
+    ) -> Optional[Tuple[dt.date, dt.date]]:
+        """Returns the date range to request for an endpoint,
+        or None if it is up to date.
+
+        Args:
+            endpoint (str): One of :data:`SYNC_ENDPOINTS`.
+            episode (Optional[str]): ID of the episode (optional).
+            end (Optional[dt.date]): Last day to request. Defaults to today.
+        """
+        end = end or dt.date.today()
+        watermark = self.store.get(self.connector.podcast_id, endpoint, episode)
+        if watermark is None:
+            return end - dt.timedelta(days=self.initial_days), end
+
+        start = watermark + dt.timedelta(days=1 - self.overlap_days)
+        if start > end:
+            return None
+        return start, end
+
+    def fetch(
+        self,
+        endpoint: str,
+        episode: Optional[str] = None,
+        end: Optional[dt.date] = None,
+    ) -> Optional[Any]:
+        """Requests an endpoint from its watermark on and moves the watermark.
+
+        The watermark is only moved if the request succeeds. Note that
+        ``aggregate`` data only covers the requested window.
+
+        Args:
+            endpoint (str): One of :data:`SYNC_ENDPOINTS`.
+            episode (Optional[str]): ID of the episode (optional).
+              Not supported by ``followers``.
+            end (Optional[dt.date]): Last day to request. Defaults to today.
+
+        Returns:
+            Optional[Any]: Response data from API,
+            or None if the endpoint is up to date.
+        """
+        if endpoint not in SYNC_ENDPOINTS:
+            raise ValueError(f"Endpoint {endpoint} can't be synced incrementally")
+
+        window = self.window(endpoint, episode, end)
+        if window is None:
+            logger.debug("{} is up to date", endpoint)
+            return None
+
+        start, end = window
+        logger.info(
+            "Syncing {} from {} to {} (episode = {})", endpoint, start, end, episode
+        )
+        func = getattr(self.connector, endpoint)
+        if episode is None:
+            data = func(start, end)
+        else:
+            data = func(start, end, episode=episode)
+
+        self.store.set(self.connector.podcast_id, endpoint, end, episode)
+        return data
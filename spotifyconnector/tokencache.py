@@ -0,0 +1,90 @@
+"""
+Persistent cache for Spotify Bearer tokens, so short-lived processes can reuse
+a token that is still valid instead of authenticating on every run.
+
+Tokens are stored in one file per set of credentials. File names are derived
+from a hash of the credentials, so the cookies never appear on disk.
+"""
+
+import datetime as dt
+import hashlib
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from loguru import logger
+
+from .fileutil import default_cache_dir, write_json_atomic
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Not available on Windows, locking is skipped there
+    fcntl = None
+
+
+class FileTokenCache:
+    """Stores Bearer tokens as files in a directory."""
+
+    def __init__(self, directory=None):
+        """Initializes the FileTokenCache object.
+
+        Args:
+            directory (Optional[str]): Directory to store tokens in.
+              Defaults to ``~/.cache/spotifyconnector/tokens``.
+        """
+        self.directory = Path(directory) if directory else default_cache_dir("tokens")
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+
+    @staticmethod
+    def key(client_id: str, sp_dc: str, sp_key: str) -> str:
+        """Returns the cache key for a set of credentials."""
+        credentials = "\0".join((client_id or "", sp_dc or "", sp_key or ""))
+        return hashlib.sha256(credentials.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """Holds an exclusive lock for ``key`` across processes, so only one
+        process authenticates while the others wait for its token.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        lock_path = self.directory / f"{key}.lock"
+        with open(lock_path, "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self, key: str) -> Optional[Tuple[str, dt.datetime]]:
+        """Returns the cached Bearer token and its expiry time, if any."""
+        try:
+            with open(self._path(key), encoding="utf-8") as file:
+                data = json.load(file)
+            return data["access_token"], dt.datetime.fromtimestamp(data["expires"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            logger.warning("Ignoring unreadable token cache entry: {}", error)
+            return None
+
+    def store(self, key: str, bearer: str, expires: dt.datetime):
+        """Stores a Bearer token and its expiry time."""
+        write_json_atomic(
+            self._path(key),
+            {"access_token": bearer, "expires": expires.timestamp()},
+        )
+
+    def clear(self, key: str):
+        """Removes a cached Bearer token."""
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
@@ -2,16 +2,44 @@
 Shared pytest fixtures and configuration for SpotifyConnector tests.
 """
 
+import datetime as dt
+import io
+import json
+from unittest.mock import Mock, patch
+
 import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
 
+from spotifyconnector.cache import ResponseCache
 from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.deadline import Deadline
+from spotifyconnector.ratelimit import UnlimitedRateLimiter
+from spotifyconnector.retry import CircuitBreaker
+
+BASE_URL = "https://generic.wg.spotify.com/podcasters/v0"
+
+
+class FakeClock:
+    """Clock that only advances when told to, or when sleeping."""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
 
 
 @pytest.fixture
 def spotify_connector():
     """Create a SpotifyConnector instance for testing."""
     return SpotifyConnector(
-        base_url="https://generic.wg.spotify.com/podcasters/v0",
+        base_url=BASE_URL,
         client_id="test_client_id",
         podcast_id="test_podcast_id",
         sp_dc="test_sp_dc",
@@ -19,6 +47,58 @@ def spotify_connector():
     )
 
 
+@pytest.fixture
+def connector(spotify_connector, mock_bearer_token):
+    """SpotifyConnector with a valid bearer token."""
+    spotify_connector._bearer = mock_bearer_token
+    spotify_connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+    return spotify_connector
+
+
+@pytest.fixture
+def make_connector():
+    """Factory of connectors that skip authentication and rate limiting."""
+
+    def make(**kwargs):
+        kwargs.setdefault("rate_limiter", UnlimitedRateLimiter())
+        connector = SpotifyConnector(
+            BASE_URL, "client_id", "podcast_id", "dc", "key", **kwargs
+        )
+        connector.account._ensure_auth = Mock()
+        return connector
+
+    return make
+
+
+@pytest.fixture
+def make_response():
+    """Factory of API responses with a JSON body."""
+
+    def make(status_code=200, data=None, headers=None) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers or {})
+        body = data if data is not None else {"test": "data"}
+        response.raw = io.BytesIO(json.dumps(body).encode("utf-8"))
+        return response
+
+    return make
+
+
+@pytest.fixture
+def clock():
+    """Fake clock of deadlines, circuit breakers and response caches.
+    Waits of rate limiters advance it instead of sleeping."""
+    fake = FakeClock()
+    with (
+        patch.object(CircuitBreaker, "_clock", fake),
+        patch.object(Deadline, "_clock", fake),
+        patch.object(ResponseCache, "_clock", fake),
+        patch("spotifyconnector.ratelimit.sleep", fake.sleep),
+    ):
+        yield fake
+
+
 @pytest.fixture
 def mock_bearer_token():
     """Mock bearer token for testing."""
@@ -28,8 +108,6 @@ def mock_bearer_token():
 @pytest.fixture
 def sample_dates():
     """Sample date range for testing."""
-    import datetime as dt
-
     return {
         "start": dt.date(2025, 6, 28),
         "end": dt.date(2025, 6, 29),
@@ -0,0 +1,227 @@
+"""
+Test the account-level SpotifyAccount and the paginated catalog.
+"""
+
+import datetime as dt
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from spotifyconnector.connector import SpotifyAccount, SpotifyConnector
+from spotifyconnector.ratelimit import RateLimiter
+
+
+@pytest.fixture
+def account():
+    return SpotifyAccount(
+        base_url="https://generic.wg.spotify.com/podcasters/v0",
+        client_id="test_client_id",
+        sp_dc="test_sp_dc",
+        sp_key="test_sp_key",
+    )
+
+
+def _fake_authenticate(account, calls):
+    def authenticate():
+        calls.append(1)
+        account._bearer = f"token_{len(calls)}"
+        account._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+
+    return patch.object(account, "_authenticate", authenticate)
+
+
+class TestSpotifyAccount:
+    """Test that podcasts of an account share its token and session."""
+
+    def test_podcasts_share_token_and_session(self, account):
+        """Test that many podcasts authenticate only once."""
+        podcasts = [account.podcast(f"show_{i}") for i in range(3)]
+        calls = []
+
+        with _fake_authenticate(account, calls):
+            for podcast in podcasts:
+                podcast._ensure_auth()
+
+        assert len(calls) == 1
+        assert {podcast._bearer for podcast in podcasts} == {"token_1"}
+        assert {id(podcast._session) for podcast in podcasts} == {id(account._session)}
+        assert [podcast.podcast_id for podcast in podcasts] == [
+            "show_0",
+            "show_1",
+            "show_2",
+        ]
+
+    def test_podcast_urls(self, account):
+        """Test that each view builds URLs for its own podcast."""
+        assert account.podcast("show_1")._show_or_episode_url("metadata") == (
+            f"{account.base_url}/shows/show_1/metadata"
+        )
+
+    def test_view_does_not_close_account(self, account):
+        """Test that closing a podcast view keeps the shared session open."""
+        with patch.object(account._session, "close") as mock_close:
+            account.podcast("show_1").close()
+            mock_close.assert_not_called()
+
+            account.close()
+            mock_close.assert_called_once()
+
+    def test_standalone_connector_owns_account(self, spotify_connector):
+        """Test that a connector created directly gets its own account."""
+        assert isinstance(spotify_connector.account, SpotifyAccount)
+        assert spotify_connector.account.sp_dc == "test_sp_dc"
+
+        spotify_connector._bearer = "token"
+        assert spotify_connector.account._bearer == "token"
+
+    def test_accounts_url(self):
+        """Test that logins go to a configured accounts service."""
+        account = SpotifyAccount(
+            "http://127.0.0.1:8080/api",
+            "client_id",
+            "sp_dc",
+            "sp_key",
+            accounts_url="http://127.0.0.1:8080/",
+        )
+        html = (
+            "const authorizationResponse = {type: 'authorization_response', "
+            "response: {code: 'code', state: 'state'}};"
+        )
+        with (
+            patch(
+                "spotifyconnector.account._pkce_secrets",
+                return_value=("state", "verifier", "challenge"),
+            ),
+            patch.object(
+                account._session, "get", return_value=Mock(text=html)
+            ) as mock_get,
+            patch.object(
+                account._session,
+                "post",
+                return_value=Mock(
+                    json=lambda: {"access_token": "t", "expires_in": 3600}
+                ),
+            ) as mock_post,
+        ):
+            account._authenticate()
+
+        assert mock_get.call_args.args[0] == "http://127.0.0.1:8080/oauth2/v2/auth"
+        assert mock_post.call_args.args[0] == "http://127.0.0.1:8080/api/token"
+        assert account._bearer == "t"
+
+
+class TestCatalog:
+    """Test the paginated catalog iterator."""
+
+    def test_catalog_follows_total_pages(self, account):
+        """Test that all pages are requested when totalPages is known."""
+        requested = []
+
+        def request(url, *, params=None):
+            requested.append(params["page"])
+            return {
+                "shows": [{"name": f"show_{params['page']}"}],
+                "totalPages": 3,
+            }
+
+        podcast = account.podcast()
+        with patch.object(SpotifyConnector, "_request", side_effect=request):
+            shows = list(podcast.catalog())
+
+        assert [show["name"] for show in shows] == ["show_1", "show_2", "show_3"]
+        assert requested == [1, 2, 3]
+
+    def test_catalog_stops_on_short_page(self, account):
+        """Test that pagination stops on a page with fewer shows than size."""
+        pages = {1: [{"name": "a"}, {"name": "b"}], 2: [{"name": "c"}]}
+
+        def request(url, *, params=None):
+            assert url.endswith("/user/shows")
+            return {"shows": pages[params["page"]]}
+
+        with patch.object(SpotifyConnector, "_request", side_effect=request):
+            shows = list(account.catalog(size=2))
+
+        assert [show["name"] for show in shows] == ["a", "b", "c"]
+
+
+class TestTokenRefresh:
+    """Test refresh-ahead and single-flight re-authentication."""
+
+    def test_token_refreshed_before_expiry(self, account):
+        """Test that a token is renewed shortly before, not after, it expires."""
+        account._bearer = "token"
+
+        account._bearer_expires = dt.datetime.now() + dt.timedelta(minutes=30)
+        assert not account._needs_auth()
+
+        account._bearer_expires = dt.datetime.now() + dt.timedelta(minutes=4)
+        assert account._needs_auth()
+
+    def test_401_reauthenticates_once_per_token(self):
+        """Test that concurrent 401s for the same token share one re-auth."""
+        account = SpotifyAccount(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+            rate_limiter=RateLimiter(rate=1000, burst=100),
+        )
+        podcast = account.podcast("show_1")
+        workers = 8
+        rejected = threading.Barrier(workers)
+
+        def send(request, **kwargs):
+            if request.headers["Authorization"] == "Bearer token_1":
+                # Let all workers get rejected before anyone re-authenticates
+                rejected.wait(timeout=5)
+                return Mock(status_code=401, ok=False)
+            return Mock(status_code=200, ok=True, json=Mock(return_value={}))
+
+        calls = []
+        with (
+            _fake_authenticate(account, calls),
+            patch.object(account._session, "send", side_effect=send),
+        ):
+            podcast._ensure_auth()
+            # Different episodes, so the requests are not coalesced
+            threads = [
+                threading.Thread(target=podcast.metadata, args=(f"episode_{i}",))
+                for i in range(workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 2
+        assert account._bearer == "token_2"
+
+    def test_background_refresh(self):
+        """Test that the token is renewed without a request and the refresher
+        stops when the account is closed."""
+        account = SpotifyAccount(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+            background_refresh=True,
+        )
+        calls = []
+
+        # Tokens are valid for an hour, refresh them 0.1s after retrieval
+        margin = dt.timedelta(hours=1) - dt.timedelta(seconds=0.1)
+        with (
+            _fake_authenticate(account, calls),
+            patch("spotifyconnector.account.BACKGROUND_REFRESH_MARGIN", margin),
+        ):
+            account._ensure_auth()
+            deadline = time.monotonic() + 5
+            while len(calls) < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            account.close()
+
+        assert len(calls) >= 3
+        assert not account._refresher.is_alive()
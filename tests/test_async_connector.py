@@ -0,0 +1,216 @@
+"""
+Test the asyncio AsyncSpotifyConnector.
+
+Requests are served by an httpx.MockTransport, so no network is needed.
+"""
+
+import asyncio
+import datetime as dt
+from unittest.mock import patch
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from spotifyconnector.aio import AsyncSpotifyConnector  # noqa: E402
+from spotifyconnector.cache import MemoryCache  # noqa: E402
+from spotifyconnector.connector import SpotifyConnector  # noqa: E402
+from spotifyconnector.deadline import Deadline, DeadlineExceeded  # noqa: E402
+from spotifyconnector.retry import RetryPolicy  # noqa: E402
+
+BASE_URL = "https://generic.wg.spotify.com/podcasters/v0"
+
+
+def _connector(handler, **kwargs):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    connector = AsyncSpotifyConnector(
+        base_url=BASE_URL,
+        client_id="test_client_id",
+        podcast_id="test_podcast_id",
+        sp_dc="test_sp_dc",
+        sp_key="test_sp_key",
+        client=client,
+        **kwargs,
+    )
+    connector._bearer = "test_bearer"
+    connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+    return connector
+
+
+class TestAsyncConnector:
+    """Test the AsyncSpotifyConnector endpoints and request handling."""
+
+    def test_shares_helpers_with_sync_connector(self):
+        """Test that URL and date helpers are not duplicated."""
+        for name in ("_build_url", "_date_params", "_set_impression_date_range"):
+            assert getattr(AsyncSpotifyConnector, name) is getattr(
+                SpotifyConnector, name
+            )
+
+    def test_streams_request(self):
+        """Test that streams builds the same URL and params as the sync class."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={"detailedStreams": []})
+
+        connector = _connector(handler)
+        result = asyncio.run(
+            connector.streams(dt.date(2025, 6, 28), dt.date(2025, 6, 29), episode="e1")
+        )
+
+        assert result == {"detailedStreams": []}
+        assert str(seen[0].url) == (
+            f"{BASE_URL}/episodes/e1/detailedStreams?start=2025-06-28&end=2025-06-29"
+        )
+        assert seen[0].headers["Authorization"] == "Bearer test_bearer"
+
+    def test_503_is_retried_without_blocking(self):
+        """Test that throttling responses are retried with asyncio.sleep."""
+        responses = [httpx.Response(503), httpx.Response(200, json={"ok": True})]
+
+        connector = _connector(
+            lambda request: responses.pop(0), retry_policy=RetryPolicy(jitter=False)
+        )
+        with patch("spotifyconnector.aio.asyncio.sleep") as mock_sleep:
+            result = asyncio.run(connector.metadata())
+
+        assert result == {"ok": True}
+        mock_sleep.assert_called_once_with(4.0)
+
+    def test_episodes_async_generator_paginates(self):
+        """Test that episodes yields all pages in order."""
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            return httpx.Response(
+                200, json={"episodes": [{"id": f"e{page}"}], "totalPages": 3}
+            )
+
+        async def collect(connector):
+            return [
+                episode["id"]
+                async for episode in connector.episodes(dt.date(2025, 6, 28))
+            ]
+
+        assert asyncio.run(collect(_connector(handler))) == ["e1", "e2", "e3"]
+
+    def test_cached_pages_stop_at_deadline(self, clock):
+        """Test that the listing stops between pages at the deadline, also
+        if the pages come from the response cache."""
+
+        def handler(request):
+            page = int(request.url.params["page"])
+            return httpx.Response(
+                200, json={"episodes": [{"id": f"e{page}"}], "totalPages": 3}
+            )
+
+        async def collect(connector):
+            episodes = []
+            async for episode in connector.episodes(dt.date(2025, 6, 28)):
+                episodes.append(episode["id"])
+                clock.now += 6
+            return episodes
+
+        connector = _connector(handler, response_cache=MemoryCache())
+        assert asyncio.run(collect(connector)) == ["e1", "e2", "e3"]
+
+        with Deadline(10):
+            with pytest.raises(DeadlineExceeded, match="episodes"):
+                asyncio.run(collect(connector))
+
+        assert connector._response_cache.stats.hits == 2
+
+    def test_concurrent_callers_authenticate_once(self):
+        """Test that concurrent requests share a single authentication."""
+        connector = _connector(lambda request: httpx.Response(200, json={}))
+        connector._bearer = None
+        calls = []
+
+        async def fake_authenticate():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            connector._bearer = "new_bearer"
+            connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+
+        async def run():
+            with patch.object(connector, "_authenticate", fake_authenticate):
+                await asyncio.gather(*(connector.me() for _ in range(10)))
+
+        asyncio.run(run())
+        assert len(calls) == 1
+
+    def test_valid_token_skips_auth_lock(self):
+        """Test that requests with a valid token don't wait for the lock,
+        e.g. while another coroutine holds it."""
+        connector = _connector(lambda request: httpx.Response(200, json={}))
+
+        async def run():
+            async with connector._auth_lock:
+                await asyncio.wait_for(connector._ensure_auth(), timeout=1)
+
+        asyncio.run(run())
+
+    def test_login_keeps_to_deadline(self, clock):
+        """Test that the login requests wait at most until the deadline, and
+        that the token request is cancelled when the deadline is used up."""
+        timeouts = []
+
+        def handler(request):
+            timeouts.append(request.extensions["timeout"]["read"])
+            clock.now += 10
+            return httpx.Response(200, text="<html></html>")
+
+        connector = _connector(handler)
+        connector._bearer = None
+
+        with patch.object(connector, "_extract_auth_code", return_value="code"):
+            with Deadline(10) as deadline:
+                with pytest.raises(DeadlineExceeded, match="auth"):
+                    asyncio.run(connector.me())
+
+        assert timeouts == [10]
+        assert deadline.report()["cancelled"] == {"auth": 1}
+
+    def test_401_reauthenticates_once_per_token(self):
+        """Test that callers rejected with the same token re-auth only once."""
+        connector = _connector(
+            lambda request: (
+                httpx.Response(401)
+                if request.headers["Authorization"] == "Bearer test_bearer"
+                else httpx.Response(200, json={})
+            )
+        )
+        calls = []
+
+        async def fake_authenticate():
+            calls.append(1)
+            connector._bearer = "new_bearer"
+
+        async def run():
+            with patch.object(connector, "_authenticate", fake_authenticate):
+                await asyncio.gather(*(connector.me() for _ in range(5)))
+
+        asyncio.run(run())
+        assert len(calls) == 1
+
+    def test_concurrency_limit(self):
+        """Test that no more than max_concurrency requests are in flight."""
+        in_flight = []
+        peak = []
+
+        async def handler(request):
+            in_flight.append(1)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.01)
+            in_flight.pop()
+            return httpx.Response(200, json={})
+
+        connector = _connector(handler, max_concurrency=3)
+
+        async def run():
+            await asyncio.gather(*(connector.performance("e") for _ in range(12)))
+
+        asyncio.run(run())
+        assert max(peak) == 3
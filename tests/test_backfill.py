@@ -0,0 +1,151 @@
+"""
+Test the chunked historical backfill.
+"""
+
+import datetime as dt
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from spotifyconnector.backfill import date_chunks, day_rows
+from spotifyconnector.connector import MaxRetriesException, SpotifyConnector
+from spotifyconnector.retry import CircuitOpen, RetryPolicy
+
+
+def _fake_streams(fail_start=None):
+    """Streams endpoint returning one row per day after a random delay."""
+
+    def streams(start, end, episode=None):
+        time.sleep(random.uniform(0, 0.005))
+        if start == fail_start:
+            raise requests.exceptions.ConnectionError("boom")
+        days = (end - start).days + 1
+        rows = [
+            {"date": (start + dt.timedelta(days=i)).isoformat(), "streams": i}
+            for i in range(days)
+        ]
+        # The API does not guarantee any order within a response
+        return {"detailedStreams": rows[::-1], "total": days}
+
+    return streams
+
+
+class TestDateChunks:
+    """Test splitting a date range into chunks."""
+
+    def test_chunks_cover_range_without_overlap(self):
+        """Test that chunks are consecutive and the last one is cut short."""
+        chunks = date_chunks(dt.date(2024, 1, 1), dt.date(2024, 1, 25), 10)
+
+        assert [(chunk.start.day, chunk.end.day) for chunk in chunks] == [
+            (1, 10),
+            (11, 20),
+            (21, 25),
+        ]
+
+    def test_invalid_chunk_size(self):
+        """Test that chunks must have at least one day."""
+        with pytest.raises(ValueError):
+            date_chunks(dt.date(2024, 1, 1), dt.date(2024, 1, 2), 0)
+
+    def test_day_rows_are_sorted(self):
+        """Test that only dated rows are returned, in date order."""
+        response = {
+            "counts": [{"date": "2024-01-02"}, {"date": "2024-01-01"}],
+            "total": 2,
+        }
+
+        assert day_rows(response) == [{"date": "2024-01-01"}, {"date": "2024-01-02"}]
+
+
+class TestBackfill:
+    """Test the concurrent backfill of the connector."""
+
+    def test_rows_merged_in_date_order(self, spotify_connector):
+        """Test that concurrent chunks yield every day once, in order."""
+        start, end = dt.date(2023, 1, 1), dt.date(2024, 12, 31)
+        with patch.object(SpotifyConnector, "streams", side_effect=_fake_streams()):
+            backfill = spotify_connector.backfill(
+                "streams", start, end, chunk_days=30, concurrency=8
+            )
+            dates = [row["date"] for row in backfill]
+
+        assert len(dates) == (end - start).days + 1
+        assert dates == sorted(dates)
+        assert backfill.failed == []
+
+    def test_failed_chunks_are_reported(self, spotify_connector):
+        """Test that a failed chunk is skipped and listed for a retry."""
+        fail_start = dt.date(2024, 1, 11)
+        with patch.object(
+            SpotifyConnector, "streams", side_effect=_fake_streams(fail_start)
+        ):
+            backfill = spotify_connector.backfill(
+                "streams", dt.date(2024, 1, 1), dt.date(2024, 1, 30), chunk_days=10
+            )
+            rows = list(backfill)
+
+        assert len(rows) == 20
+        assert [(chunk.start, chunk.end) for chunk in backfill.failed] == [
+            (fail_start, dt.date(2024, 1, 20))
+        ]
+        assert isinstance(backfill.failed[0].error, requests.exceptions.ConnectionError)
+
+    def test_chunks_failing_on_open_circuit_are_reported(
+        self, make_connector, make_response
+    ):
+        """Test that chunks are still reported as failed, not raised, once
+        the circuit of the endpoint family is open."""
+        connector = make_connector(
+            retry_policy=RetryPolicy(max_attempts=2, failure_threshold=2)
+        )
+        with (
+            patch(
+                "requests.Session.send",
+                side_effect=lambda *args, **kwargs: make_response(503),
+            ),
+            patch("spotifyconnector.connector.sleep"),
+        ):
+            backfill = connector.backfill(
+                "streams",
+                dt.date(2024, 1, 1),
+                dt.date(2024, 1, 30),
+                chunk_days=10,
+                concurrency=1,
+            )
+            rows = list(backfill)
+
+        assert rows == []
+        assert [type(chunk.error) for chunk in backfill.failed] == [
+            MaxRetriesException,
+            CircuitOpen,
+            CircuitOpen,
+        ]
+
+    def test_episode_is_passed(self, spotify_connector):
+        """Test that episode backfills request the episode's data."""
+        with patch.object(
+            SpotifyConnector, "listeners", return_value={"counts": []}
+        ) as mock_listeners:
+            list(
+                spotify_connector.backfill(
+                    "listeners",
+                    dt.date(2024, 1, 1),
+                    dt.date(2024, 1, 1),
+                    episode="e1",
+                )
+            )
+
+        mock_listeners.assert_called_once_with(
+            dt.date(2024, 1, 1), dt.date(2024, 1, 1), episode="e1"
+        )
+
+    def test_unsupported_endpoint(self, spotify_connector):
+        """Test that endpoints without per-day rows are rejected."""
+        with pytest.raises(ValueError):
+            spotify_connector.backfill(
+                "aggregate", dt.date(2024, 1, 1), dt.date(2024, 1, 2)
+            )
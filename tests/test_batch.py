@@ -0,0 +1,99 @@
+"""
+Test running batches of endpoint calls.
+"""
+
+import datetime as dt
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.batch import BatchResult, Call, call
+from spotifyconnector.connector import MaxRetriesException, SpotifyConnector
+
+START = dt.date(2025, 1, 1)
+END = dt.date(2025, 1, 7)
+
+
+class TestBatch:
+    """Test SpotifyConnector.batch."""
+
+    def test_results_in_input_order(self, spotify_connector):
+        """Test that values and errors are returned in the order of the calls,
+        whatever order the calls finish in."""
+        first_started = threading.Event()
+
+        def request(url, *, params=None):
+            if url.endswith("/metadata"):
+                # The other calls finish only after this one started
+                first_started.set()
+                return {"url": url}
+            if url.endswith("/episodes/episode_2/performance"):
+                raise MaxRetriesException(url, 503, 6)
+            first_started.wait(timeout=5)
+            return {"url": url, "params": params}
+
+        with patch.object(SpotifyConnector, "_request", side_effect=request):
+            results = spotify_connector.batch(
+                [
+                    "metadata",
+                    ("streams", START, END),
+                    call("listeners", START, END, episode="episode_1"),
+                    ("performance", "episode_2"),
+                    Call("performance", ("episode_3",)),
+                ],
+                concurrency=4,
+            )
+
+        assert [result.ok for result in results] == [True, True, True, False, True]
+        assert results[0].value["url"].endswith("/shows/test_podcast_id/metadata")
+        assert results[1].value["params"] == {
+            "start": "2025-01-01",
+            "end": "2025-01-07",
+        }
+        assert "/episodes/episode_1/" in results[2].value["url"]
+        assert isinstance(results[3].error, MaxRetriesException)
+        with pytest.raises(MaxRetriesException):
+            results[3].result()
+        assert results[4].result()["url"].endswith("/episode_3/performance")
+
+    def test_concurrency_limit(self, spotify_connector):
+        """Test that no more than ``concurrency`` calls run at once."""
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def request(url, *, params=None):
+            with lock:
+                running.append(url)
+                peak.append(len(running))
+            threading.Event().wait(0.01)
+            with lock:
+                running.remove(url)
+            return {}
+
+        calls = [("performance", f"episode_{i}") for i in range(12)]
+        with patch.object(SpotifyConnector, "_request", side_effect=request):
+            results = spotify_connector.batch(calls, concurrency=3)
+
+        assert len(results) == 12
+        assert max(peak) <= 3
+
+    def test_iterators_are_read(self, spotify_connector):
+        """Test that paginated methods return lists."""
+        with patch.object(
+            SpotifyConnector,
+            "_request",
+            return_value={"episodes": [{"id": "1"}, {"id": "2"}], "totalPages": 1},
+        ):
+            (result,) = spotify_connector.batch([("episodes", START, END)])
+
+        assert result == BatchResult(
+            Call("episodes", (START, END)), [{"id": "1"}, {"id": "2"}]
+        )
+
+    def test_unknown_method_rejected(self, spotify_connector):
+        """Test that methods that can't be batched are rejected up front."""
+        with pytest.raises(ValueError, match="close"):
+            spotify_connector.batch(["metadata", "close"])
+        assert spotify_connector.batch([]) == []
@@ -0,0 +1,169 @@
+"""
+Test the response caches and their use by the connector.
+"""
+
+import datetime as dt
+import os
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.cache import FileCache, MemoryCache, ResponseCache
+from spotifyconnector.connector import SpotifyConnector
+
+
+def _params(end: dt.date) -> dict:
+    return {"start": (end - dt.timedelta(days=7)).isoformat(), "end": end.isoformat()}
+
+
+class TestCachePolicy:
+    """Test the cache keys and time to live."""
+
+    def test_key_ignores_param_order(self):
+        """Test that the same params in a different order share an entry."""
+        assert ResponseCache.key("url", {"a": 1, "b": "2"}) == ResponseCache.key(
+            "url", {"b": 2, "a": "1"}
+        )
+        assert ResponseCache.key("url", {"a": 1}) != ResponseCache.key("url", {"a": 2})
+
+    def test_base_class_is_abstract(self):
+        """Test that the base class needs a subclass to store entries."""
+        with pytest.raises(TypeError, match="abstract"):
+            ResponseCache()
+
+    def test_ttl_per_endpoint(self):
+        """Test that endpoints can have their own TTL or disable caching."""
+        cache = MemoryCache(ttl=60, endpoint_ttls={"metadata": 3600, "me": 0})
+
+        assert cache.ttl_for("streams") == 60
+        assert cache.ttl_for("metadata") == 3600
+        assert cache.ttl_for("me") == 0
+
+    def test_past_ranges_get_history_ttl(self):
+        """Test that settled date ranges are cached long, recent ones briefly."""
+        cache = MemoryCache(ttl=60, history_ttl=86400, settled_days=3)
+        today = dt.date.today()
+
+        assert cache.ttl_for("streams", _params(today - dt.timedelta(days=3))) == 86400
+        assert cache.ttl_for("streams", _params(today - dt.timedelta(days=2))) == 60
+        assert cache.ttl_for("streams", _params(today)) == 60
+
+
+class TestMemoryCache:
+    """Test the in-memory LRU cache."""
+
+    def test_hits_misses_and_expiry(self, clock):
+        """Test that entries are returned until their TTL is over."""
+        cache = MemoryCache(ttl=60)
+
+        assert cache.get("streams", "url") is None
+        cache.set("streams", "url", None, {"streams": 1})
+        assert cache.get("streams", "url") == {"streams": 1}
+
+        clock.now += 61
+        assert cache.get("streams", "url") is None
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 2
+        assert cache.stats.expirations == 1
+
+    def test_least_recently_used_is_evicted(self, clock):
+        """Test that a full cache evicts the entry used least recently."""
+        cache = MemoryCache(max_entries=2)
+        cache.set("streams", "a", None, {"a": 1})
+        cache.set("streams", "b", None, {"b": 1})
+        cache.get("streams", "a")
+        cache.set("streams", "c", None, {"c": 1})
+
+        assert cache.get("streams", "b") is None
+        assert cache.get("streams", "a") == {"a": 1}
+        assert len(cache) == 2
+        assert cache.stats.evictions == 1
+
+    def test_cached_response_is_not_shared(self, clock):
+        """Test that modifying a returned response does not change the cache."""
+        cache = MemoryCache()
+        cache.set("streams", "url", None, {"streams": [1]})
+
+        cache.get("streams", "url")["streams"].append(2)
+
+        assert cache.get("streams", "url") == {"streams": [1]}
+
+
+class TestFileCache:
+    """Test the on-disk cache."""
+
+    def test_entries_survive_instances(self, tmp_path, clock):
+        """Test that a new cache on the same directory sees stored responses."""
+        FileCache(tmp_path).set("streams", "url", {"end": "x"}, {"streams": 1})
+
+        cache = FileCache(tmp_path)
+        assert cache.get("streams", "url", {"end": "x"}) == {"streams": 1}
+
+        clock.now += 3600
+        assert cache.get("streams", "url", {"end": "x"}) is None
+        assert not list(tmp_path.glob("*.json"))
+
+    def test_least_recently_used_files_are_evicted(self, tmp_path, clock):
+        """Test that the oldest files are removed when the cache is full."""
+        cache = FileCache(tmp_path, max_entries=2)
+        for age, url in enumerate(["c", "b", "a"]):
+            cache.set("streams", url, None, {url: 1})
+            os.utime(cache._path(url), (1000 - age, 1000 - age))
+
+        cache.set("streams", "d", None, {"d": 1})
+
+        assert cache.get("streams", "a") is None
+        assert cache.get("streams", "b") is None
+        assert cache.get("streams", "c") == {"c": 1}
+        assert cache.get("streams", "d") == {"d": 1}
+        assert cache.stats.evictions == 2
+
+
+class TestConnectorCache:
+    """Test that the connector answers repeated requests from the cache."""
+
+    @pytest.fixture
+    def connector(self):
+        return SpotifyConnector(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            podcast_id="test_podcast_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+            response_cache=MemoryCache(endpoint_ttls={"metadata": 0}),
+        )
+
+    def test_repeated_window_is_cached(self, connector):
+        """Test that the same window is only requested once."""
+        start = dt.date(2024, 1, 1)
+        with patch.object(
+            SpotifyConnector, "_fetch", return_value={"streams": 1}
+        ) as mock_fetch:
+            connector.streams(start, start + dt.timedelta(days=6))
+            connector.streams(start, start + dt.timedelta(days=6))
+            connector.streams(start, start + dt.timedelta(days=7))
+
+        assert mock_fetch.call_count == 2
+        assert connector._response_cache.stats.hits == 1
+
+    def test_disabled_endpoint_is_not_cached(self, connector):
+        """Test that an endpoint with a TTL of 0 always goes to the network."""
+        with patch.object(SpotifyConnector, "_fetch", return_value={}) as mock_fetch:
+            connector.metadata()
+            connector.metadata()
+
+        assert mock_fetch.call_count == 2
+
+    def test_endpoint_names(self, connector):
+        """Test that URLs are mapped to the connector method names."""
+        streams_url = connector._show_or_episode_url("detailedStreams", "episode_1")
+        impressions_url, _ = connector._impressions_request(
+            "faceted", dt.date(2024, 1, 1), None
+        )
+
+        assert connector._endpoint_name(streams_url) == "streams"
+        assert connector._endpoint_name(impressions_url) == "impressions"
+        assert connector._endpoint_name(connector._build_url("user", "me")) == "me"
+        assert (
+            connector._endpoint_name(connector._build_url("user", "shows")) == "catalog"
+        )
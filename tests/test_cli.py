@@ -0,0 +1,128 @@
+"""
+Test the command line interface in spotifyconnector.__main__.
+"""
+
+import random
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+
+from spotifyconnector import __main__ as cli
+
+
+def _fake_connector():
+    """A connector whose endpoints echo their arguments after a random delay."""
+
+    def endpoint(name):
+        def call(*args, episode=None):
+            time.sleep(random.uniform(0, 0.005))
+            if name == "performance" and episode == "e2":
+                raise ValueError("boom")
+            return {"endpoint": name, "episode": episode}
+
+        return call
+
+    connector = Mock()
+    for name in ("metadata", "streams", "listeners", "aggregate", "performance"):
+        setattr(connector, name, endpoint(name))
+    return connector
+
+
+def _logged_calls(concurrency, episode_count=6):
+    episodes = [{"id": f"e{i}"} for i in range(episode_count)]
+    with patch.object(cli, "log_status") as mock_log:
+        cli.fetch_episodes(_fake_connector(), iter(episodes), concurrency)
+    return [call.args for call in mock_log.call_args_list]
+
+
+class TestCli:
+    """Test the CLI argument parsing and per-episode fan-out."""
+
+    def test_concurrency_defaults_to_one(self):
+        """Test that the CLI runs sequentially by default."""
+        assert cli.parse_args([]).concurrency == 1
+        assert cli.parse_args(["--concurrency", "8"]).concurrency == 8
+
+    def test_concurrency_must_be_positive(self):
+        """Test that a concurrency below one is rejected."""
+        with pytest.raises(SystemExit):
+            cli.parse_args(["--concurrency", "0"])
+
+    def test_record_and_replay_are_exclusive(self):
+        """Test that a run either records or replays."""
+        assert cli.parse_args(["--replay", "run.jsonl.gz"]).replay == "run.jsonl.gz"
+        with pytest.raises(SystemExit):
+            cli.parse_args(["--record", "a.jsonl.gz", "--replay", "b.jsonl.gz"])
+
+    def test_deadline_must_be_positive(self):
+        """Test that a run's deadline is optional and must be positive."""
+        assert cli.parse_args([]).deadline is None
+        assert cli.parse_args(["--deadline", "600"]).deadline == 600
+        with pytest.raises(SystemExit):
+            cli.parse_args(["--deadline", "0"])
+
+    def test_sync_all_options(self):
+        """Test that sync-all needs a config and rejects per-run files."""
+        args = cli.parse_args(
+            ["sync-all", "--config", "accounts.json", "--workers", "2"]
+        )
+        assert (args.command, args.config, args.workers) == (
+            "sync-all",
+            "accounts.json",
+            2,
+        )
+        with pytest.raises(SystemExit):
+            cli.parse_args(["sync-all", "--config", "accounts.json", "--workers", "0"])
+        with pytest.raises(SystemExit):
+            cli.parse_args(
+                ["sync-all", "--config", "accounts.json", "--shard-size", "0"]
+            )
+        with pytest.raises(SystemExit):
+            cli.parse_args(["--incremental", "sync-all", "--config", "accounts.json"])
+
+    def test_sync_all_invalid_config(self, tmp_path):
+        """Test that an unreadable config stops sync-all with an error
+        instead of a traceback."""
+        with patch.object(cli, "sync_all") as mock_sync_all:
+            with pytest.raises(SystemExit) as exit_info:
+                cli.main(["sync-all", "--config", str(tmp_path / "missing.json")])
+
+        assert exit_info.value.code == 1
+        mock_sync_all.assert_not_called()
+
+    def test_concurrent_results_logged_in_sequential_order(self):
+        """Test that a concurrent run logs exactly like a sequential run."""
+        sequential = _logged_calls(concurrency=1)
+        concurrent = _logged_calls(concurrency=8)
+
+        assert concurrent == sequential
+        assert len(concurrent) == 6 * 5
+        assert concurrent[0] == (
+            "episode_metadata",
+            True,
+            {"endpoint": "metadata", "episode": "e0"},
+        )
+
+    def test_failed_call_logged_without_stopping_run(self):
+        """Test that an endpoint error is logged and other calls still run."""
+        calls = _logged_calls(concurrency=4)
+
+        assert ("episode_performance", False, {"error": "boom"}) in calls
+        assert calls[-1][0] == "episode_performance"
+        assert calls[-1][1] is True
+
+    def test_listed_episodes_logged_when_listing_fails(self):
+        """Test that episodes listed before a failed page are still logged."""
+
+        def episodes():
+            for i in range(3):
+                yield {"id": f"e{i}"}
+            raise ValueError("page failed")
+
+        with patch.object(cli, "log_status") as mock_log:
+            with pytest.raises(ValueError, match="page failed"):
+                cli.fetch_episodes(_fake_connector(), episodes(), concurrency=4)
+
+        calls = [call.args for call in mock_log.call_args_list]
+        assert calls == _logged_calls(concurrency=1, episode_count=3)
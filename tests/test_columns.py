@@ -0,0 +1,119 @@
+"""
+Test the columnar time series.
+"""
+
+import datetime as dt
+from array import array
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.columns import TimeSeries
+
+STREAMS = {
+    "detailedStreams": [
+        {"date": "2024-01-01", "starts": 3, "streams": 2},
+        {"date": "2024-01-02", "starts": 5, "streams": 4},
+    ],
+    "total": 6,
+}
+
+
+def _ordinal(year, month, day):
+    return dt.date(year, month, day).toordinal()
+
+
+class TestTimeSeries:
+    """Test converting daily rows to columns."""
+
+    def test_from_response(self):
+        """Test that dates become ordinals and counts become columns."""
+        series = TimeSeries.from_response(STREAMS, label="e1")
+
+        assert len(series) == 2
+        assert series.fields == ["starts", "streams"]
+        assert series["date"] == array(
+            "q", [_ordinal(2024, 1, 1), _ordinal(2024, 1, 2)]
+        )
+        assert series["starts"] == array("q", [3, 5])
+        assert series.totals() == {"starts": 8, "streams": 6}
+        assert series.labels == ["e1"]
+
+    def test_fields_and_missing_counts(self):
+        """Test that given fields are used and missing counts are 0."""
+        rows = iter(
+            [
+                {"date": "2024-01-01T00:00:00", "count": 1},
+                {"date": "2024-01-02", "count": None},
+                {"date": "2024-01-03"},
+            ]
+        )
+        series = TimeSeries.from_rows(rows, fields=["count"])
+
+        assert series["date"][0] == _ordinal(2024, 1, 1)
+        assert series["count"] == array("q", [1, 0, 0])
+
+    def test_empty_response(self):
+        """Test that a response without rows gives an empty series."""
+        series = TimeSeries.from_response({"counts": []}, fields=["count"])
+
+        assert len(series) == 0
+        assert series.fields == ["count"]
+
+    def test_concat_keeps_sources(self):
+        """Test that concatenated rows remember their part."""
+        first = TimeSeries.from_response(STREAMS, label="e1")
+        second = TimeSeries.from_response(STREAMS, label="e2")
+        both = TimeSeries.concat([first, second])
+        all_three = TimeSeries.concat(
+            [both, TimeSeries.from_response(STREAMS, label="e3")]
+        )
+
+        assert len(all_three) == 6
+        assert all_three.labels == ["e1", "e2", "e3"]
+        assert all_three["source"] == array("q", [0, 0, 1, 1, 2, 2])
+        assert all_three.totals() == {"starts": 24, "streams": 18}
+
+    def test_concat_different_columns(self):
+        """Test that series with different columns can't be concatenated."""
+        listeners = TimeSeries.from_rows([{"date": "2024-01-01", "count": 1}])
+
+        with pytest.raises(ValueError):
+            TimeSeries.concat([TimeSeries.from_response(STREAMS), listeners])
+
+    def test_to_numpy(self):
+        """Test that the NumPy views share the columns."""
+        numpy = pytest.importorskip("numpy")
+        series = TimeSeries.from_response(STREAMS)
+
+        columns = series.to_numpy()
+
+        assert columns["starts"].dtype == numpy.int64
+        assert columns["starts"].tolist() == [3, 5]
+        assert columns["date"].tolist() == list(series.dates)
+
+
+class TestConnectorTimeSeries:
+    """Test requesting endpoints as columns."""
+
+    def test_connector_time_series(self, connector, make_response):
+        """Test that the connector streams an endpoint into a series."""
+        with patch(
+            "requests.Session.send", return_value=make_response(200, STREAMS)
+        ) as mock_send:
+            series = connector.time_series(
+                "streams", dt.date(2024, 1, 1), dt.date(2024, 1, 2), episode="e1"
+            )
+
+        assert "/episodes/e1/detailedStreams?" in mock_send.call_args.args[0].url
+        assert mock_send.call_args.kwargs["stream"] is True
+        assert series.labels == ["e1"]
+        assert series.totals() == {"starts": 8, "streams": 6}
+
+    @pytest.mark.parametrize(
+        "endpoint, episode", [("metadata", None), ("followers", "e1")]
+    )
+    def test_endpoints_without_daily_rows(self, connector, endpoint, episode):
+        """Test that only endpoints with daily rows are supported."""
+        with pytest.raises(ValueError):
+            connector.time_series(endpoint, dt.date(2024, 1, 1), episode=episode)
@@ -17,6 +17,7 @@ from spotifyconnector.connector import (
     MaxRetriesException,
     SpotifyConnector,
 )
+from spotifyconnector.retry import RetryPolicy
 
 
 class TestConnectionHandling:
@@ -120,17 +121,15 @@ class TestConnectionHandling:
 
     def test_authenticate_handles_connection_errors(self, spotify_connector):
         """Test that _authenticate method properly handles connection errors."""
-        with patch("requests.get") as mock_get:
+        with patch("requests.Session.get") as mock_get:
             mock_get.side_effect = ConnectionError("DNS resolution failed")
 
-            # Should eventually raise RetryError after retries (tenacity wraps the ConnectionError)
-            with pytest.raises(Exception) as exc_info:  # Catch any exception type
-                spotify_connector._authenticate()
+            # Should raise the ConnectionError of the last attempt
+            with patch("spotifyconnector.retry.sleep"):
+                with pytest.raises(ConnectionError, match="DNS resolution failed"):
+                    spotify_connector._authenticate()
 
-            # The exception should be related to connection/retry errors
-            assert "ConnectionError" in str(exc_info.value) or "RetryError" in str(
-                exc_info.value
-            )
+            assert mock_get.call_count == 6
 
     def test_max_retries_exception_with_network_error(self, spotify_connector):
         """Test MaxRetriesException details when network errors occur."""
@@ -160,8 +159,16 @@ class TestConnectionHandling:
                 expected_url, params={"start": "2025-06-28", "end": "2025-06-28"}
             )
 
-    def test_exponential_backoff_timing(self, spotify_connector):
+    def test_exponential_backoff_timing(self):
         """Test that exponential backoff increases delay properly."""
+        spotify_connector = SpotifyConnector(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            podcast_id="test_podcast_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+            retry_policy=RetryPolicy(jitter=False),
+        )
         with patch("requests.Session.send") as mock_send:
             mock_send.side_effect = ConnectionError("Network error")
 
@@ -0,0 +1,200 @@
+"""
+Test the request timeouts and the deadlines of connector runs.
+"""
+
+import datetime as dt
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from spotifyconnector import __main__ as cli
+from spotifyconnector.connector import SpotifyAccount
+from spotifyconnector.deadline import Deadline, DeadlineExceeded, check_deadline
+
+
+class TestTimeouts:
+    """Test the connect and read timeouts of requests."""
+
+    def test_endpoint_timeouts(self, make_connector, make_response):
+        """Test that endpoints use their own timeout or the default one."""
+        connector = make_connector(
+            timeout=(5, 30), endpoint_timeouts={"impressions": 120}
+        )
+        with patch("requests.Session.send", return_value=make_response()) as mock_send:
+            connector.metadata()
+            connector.impressions("daily", dt.date(2025, 6, 1), dt.date(2025, 6, 2))
+
+        timeouts = [call.kwargs["timeout"] for call in mock_send.call_args_list]
+        assert timeouts == [(5, 30), (120, 120)]
+
+    def test_deadline_cuts_timeouts(self, clock, make_connector, make_response):
+        """Test that requests wait at most until the deadline, and that
+        finished calls are counted."""
+        connector = make_connector(timeout=(5, 30))
+        with patch("requests.Session.send", return_value=make_response()) as mock_send:
+            with Deadline(10) as deadline:
+                connector.metadata()
+
+        assert mock_send.call_args.kwargs["timeout"] == (5, 10)
+        assert deadline.report()["finished"] == {"metadata": 1}
+
+
+class TestDeadline:
+    """Test that calls, retries and pagination keep to the deadline."""
+
+    def test_retry_past_deadline_is_cancelled(
+        self, clock, make_connector, make_response
+    ):
+        """Test that a retry that would sleep past the deadline is given up."""
+        connector = make_connector()
+        with patch("requests.Session.send") as mock_send:
+            mock_send.return_value = make_response(503, headers={"Retry-After": "30"})
+            with patch("spotifyconnector.connector.sleep") as mock_sleep:
+                with Deadline(10) as deadline:
+                    with pytest.raises(DeadlineExceeded, match="metadata"):
+                        connector.metadata()
+
+        assert mock_send.call_count == 1
+        mock_sleep.assert_not_called()
+        assert deadline.report()["cancelled"] == {"metadata": 1}
+
+    def test_deadline_expires_during_auth(self, clock, make_connector):
+        """Test that a request is cancelled, not sent with a timeout of 0,
+        when the login uses up the deadline."""
+        connector = make_connector()
+        connector.account._ensure_auth.side_effect = lambda: setattr(
+            clock, "now", clock.now + 10
+        )
+        with patch("requests.Session.send") as mock_send:
+            with Deadline(10) as deadline:
+                with pytest.raises(DeadlineExceeded, match="metadata"):
+                    connector.metadata()
+
+        mock_send.assert_not_called()
+        assert deadline.report()["cancelled"] == {"metadata": 1}
+
+    def test_deadline_expires_in_rate_limiter(self, clock, make_connector):
+        """Test that a request is cancelled when the wait for the rate
+        limiter ends right at the deadline."""
+        rate_limiter = Mock()
+
+        def acquire(timeout=None):
+            clock.now += timeout
+            return True
+
+        rate_limiter.acquire.side_effect = acquire
+        connector = make_connector(rate_limiter=rate_limiter)
+        with patch("requests.Session.send") as mock_send:
+            with Deadline(10):
+                with pytest.raises(DeadlineExceeded, match="metadata"):
+                    connector.metadata()
+
+        mock_send.assert_not_called()
+
+    def test_login_keeps_to_deadline(self, clock, make_response):
+        """Test that the token request is cancelled when the authorize
+        request uses up the deadline."""
+        account = SpotifyAccount("https://example.com", "client_id", "dc", "key")
+
+        def get(*args, **kwargs):
+            clock.now += 10
+            return make_response()
+
+        with (
+            patch.object(account._session, "get", side_effect=get) as mock_get,
+            patch.object(account._session, "post") as mock_post,
+            patch.object(account, "_extract_auth_code", return_value="code"),
+        ):
+            with Deadline(10):
+                with pytest.raises(DeadlineExceeded, match="auth"):
+                    account._login()
+
+        assert mock_get.call_args.kwargs["timeout"] == (10, 10)
+        mock_post.assert_not_called()
+
+    def test_pagination_stops_at_deadline(self, clock, make_connector, make_response):
+        """Test that the episode listing stops between pages."""
+        connector = make_connector()
+
+        def send(request, **kwargs):
+            clock.now += 6
+            page = int(request.url.split("page=")[1].split("&")[0])
+            return make_response(
+                data={"episodes": [{"id": f"e{page}"}], "totalPages": 3}
+            )
+
+        episodes = []
+        with patch("requests.Session.send", side_effect=send):
+            with Deadline(10) as deadline:
+                with pytest.raises(DeadlineExceeded, match="episodes"):
+                    for episode in connector.episodes(dt.date(2025, 6, 1)):
+                        episodes.append(episode["id"])
+
+        assert episodes == ["e1", "e2"]
+        report = deadline.report()
+        assert report["expired"]
+        assert report["finished"] == {"episodes": 2}
+        assert report["cancelled"] == {"episodes": 1}
+
+    def test_deadline_applies_in_worker_threads(
+        self, clock, make_connector, make_response
+    ):
+        """Test that the calls of a batch keep to the caller's deadline."""
+        connector = make_connector()
+        with patch("requests.Session.send", return_value=make_response()) as mock_send:
+            with Deadline(10) as deadline:
+                clock.now += 10
+                results = connector.batch(["metadata", ("metadata", "e1")])
+
+        mock_send.assert_not_called()
+        assert all(isinstance(result.error, DeadlineExceeded) for result in results)
+        assert deadline.report()["cancelled"] == {"metadata": 2}
+
+    def test_no_deadline_outside_block(self, clock, make_connector, make_response):
+        """Test that a deadline only applies inside its block."""
+        connector = make_connector()
+        with Deadline(10):
+            pass
+        clock.now += 60
+        with patch("requests.Session.send", return_value=make_response()):
+            assert connector.metadata() == {"test": "data"}
+
+    def test_finished_episodes_reported_at_deadline(
+        self, clock, make_connector, make_response
+    ):
+        """Test that the CLI still reports the episodes whose calls finished
+        when the deadline stops the episode listing."""
+        connector = make_connector()
+        calls_per_episode = len(cli.episode_calls(connector, "e0"))
+        lock = threading.Lock()
+        sent = []
+        all_sent = threading.Event()
+
+        def send(request, **kwargs):
+            with lock:
+                sent.append(request.url)
+                if len(sent) == 2 * calls_per_episode:
+                    all_sent.set()
+            return make_response()
+
+        def episodes():
+            yield {"id": "e0"}
+            yield {"id": "e1"}
+            # The calls of both episodes are done when the deadline fires
+            assert all_sent.wait(5)
+            clock.now += 10
+            check_deadline("episodes")
+
+        reporter = Mock()
+        with patch("requests.Session.send", side_effect=send):
+            with Deadline(10):
+                with pytest.raises(DeadlineExceeded, match="episodes"):
+                    cli.fetch_episodes(connector, episodes(), 4, reporter=reporter)
+
+        assert [call.args[0]["id"] for call in reporter.episode.call_args_list] == [
+            "e0",
+            "e1",
+        ]
+        statuses = [call.args[1] for call in reporter.status.call_args_list]
+        assert statuses == [True] * 2 * calls_per_episode
@@ -0,0 +1,94 @@
+"""
+Test episode pagination in SpotifyConnector.episodes.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+
+class _FakeApi:
+    """Serves episode pages and tracks how many requests run in parallel."""
+
+    def __init__(self, total_pages, size=2):
+        self.total_pages = total_pages
+        self.size = size
+        self.requested = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def request(self, url, *, params=None):
+        with self._lock:
+            self.requested.append(params["page"])
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+        # Later pages answer faster to shake up completion order
+        time.sleep(0.002 * (self.total_pages - params["page"]))
+
+        with self._lock:
+            self.in_flight -= 1
+        page = params["page"]
+        return {
+            "episodes": [{"id": f"{page}-{i}"} for i in range(self.size)],
+            "totalPages": self.total_pages,
+        }
+
+
+def _expected(total_pages, size=2):
+    return [f"{page}-{i}" for page in range(1, total_pages + 1) for i in range(size)]
+
+
+class TestEpisodes:
+    """Test sequential and prefetched episode pagination."""
+
+    def test_sequential_pagination(self, spotify_connector, sample_dates):
+        """Test that all pages are requested one after another by default."""
+        api = _FakeApi(total_pages=4)
+        with patch.object(spotify_connector, "_request", api.request):
+            episodes = list(spotify_connector.episodes(sample_dates["start"]))
+
+        assert [episode["id"] for episode in episodes] == _expected(4)
+        assert api.requested == [1, 2, 3, 4]
+        assert api.peak == 1
+
+    @pytest.mark.parametrize("prefetch", [1, 3, 10])
+    def test_prefetch_yields_in_server_order(
+        self, spotify_connector, sample_dates, prefetch
+    ):
+        """Test that prefetched pages are yielded in order, within the window."""
+        api = _FakeApi(total_pages=8)
+        with patch.object(spotify_connector, "_request", api.request):
+            episodes = list(
+                spotify_connector.episodes(sample_dates["start"], prefetch=prefetch)
+            )
+
+        assert [episode["id"] for episode in episodes] == _expected(8)
+        assert sorted(api.requested) == list(range(1, 9))
+        assert api.peak <= prefetch
+
+    def test_prefetch_single_page(self, spotify_connector, sample_dates):
+        """Test that a single page does not start any prefetching."""
+        api = _FakeApi(total_pages=1)
+        with patch.object(spotify_connector, "_request", api.request):
+            episodes = list(
+                spotify_connector.episodes(sample_dates["start"], prefetch=4)
+            )
+
+        assert [episode["id"] for episode in episodes] == _expected(1)
+        assert api.requested == [1]
+
+    def test_prefetch_is_lazy(self, spotify_connector, sample_dates):
+        """Test that only the prefetch window is requested ahead of the consumer."""
+        api = _FakeApi(total_pages=20)
+        with patch.object(spotify_connector, "_request", api.request):
+            episodes = spotify_connector.episodes(sample_dates["start"], prefetch=2)
+            # Consume the first two pages only
+            for _ in range(4):
+                next(episodes)
+            episodes.close()
+
+        assert len(api.requested) <= 2 + 2
@@ -0,0 +1,151 @@
+"""
+Test exporting endpoint data to files.
+"""
+
+import csv
+import gzip
+import json
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector import __main__ as cli
+from spotifyconnector.export import Exporter, response_rows
+
+STREAMS = {
+    "detailedStreams": [
+        {"date": "2024-01-01", "starts": 3, "streams": 2},
+        {"date": "2024-01-02", "starts": 5, "streams": 4},
+    ],
+    "total": 6,
+}
+
+
+class TestExporter:
+    """Test writing rows to one file per endpoint."""
+
+    def test_response_rows(self):
+        """Test that the rows array is found, other responses are one row."""
+        assert response_rows(STREAMS) == STREAMS["detailedStreams"]
+        assert response_rows({"name": "Show", "tags": ["a"]}) == [
+            {"name": "Show", "tags": ["a"]}
+        ]
+        assert response_rows([{"id": 1}]) == [{"id": 1}]
+        assert response_rows(None) == []
+
+    @pytest.mark.parametrize("data", ["text", [{"id": 1}, 2], {"ids": [{}, "e2"]}])
+    def test_rows_must_be_objects(self, tmp_path, data):
+        """Test that responses with rows that aren't objects are rejected
+        before any of their rows are written."""
+        with pytest.raises(ValueError, match="must be objects"):
+            response_rows(data)
+
+        with Exporter(tmp_path, "csv") as exporter:
+            exporter.status("metadata", True, data)
+
+        assert not list(tmp_path.iterdir())
+
+    def test_ndjson_gzip(self, tmp_path):
+        """Test that compressed NDJSON files hold one row per line."""
+        with Exporter(tmp_path, "ndjson", compress=True) as exporter:
+            exporter.status("streams", True, STREAMS)
+            exporter.status("episode_streams", True, STREAMS, episode="e1")
+
+        with gzip.open(tmp_path / "streams.ndjson.gz", "rt") as file:
+            assert [json.loads(line) for line in file] == STREAMS["detailedStreams"]
+        with gzip.open(tmp_path / "episode_streams.ndjson.gz", "rt") as file:
+            assert json.loads(next(file)) == {
+                "episode": "e1",
+                "date": "2024-01-01",
+                "starts": 3,
+                "streams": 2,
+            }
+
+    def test_csv(self, tmp_path):
+        """Test that CSV files have a header and JSON-encoded nested values."""
+        with Exporter(tmp_path, "csv") as exporter:
+            exporter.status("metadata", True, {"name": "Show", "tags": ["a", "b"]})
+            exporter.status("metadata", True, {"name": "Other", "tags": []})
+
+        with open(tmp_path / "metadata.csv", newline="", encoding="utf-8") as file:
+            assert list(csv.DictReader(file)) == [
+                {"name": "Show", "tags": '["a","b"]'},
+                {"name": "Other", "tags": "[]"},
+            ]
+
+    def test_failed_call_writes_nothing(self, tmp_path):
+        """Test that errors are only logged."""
+        with Exporter(tmp_path) as exporter:
+            exporter.status("streams", False, {"error": "boom"})
+
+        assert not list(tmp_path.iterdir())
+
+    def test_unsupported_format(self, tmp_path):
+        """Test that unknown formats are rejected."""
+        with pytest.raises(ValueError):
+            Exporter(tmp_path, "xml")
+
+
+class TestExportCommand:
+    """Test the export subcommand."""
+
+    def test_parse_export_args(self):
+        """Test that the export options are parsed after the subcommand."""
+        args = cli.parse_args(
+            ["--concurrency", "4", "export", "--out", "data", "--format", "csv"]
+        )
+
+        assert args.command == "export"
+        assert args.concurrency == 4
+        assert (args.out, args.format, args.gzip) == ("data", "csv", False)
+        assert cli.parse_args([]).command is None
+
+    def test_export_refreshes_token_in_background(self, tmp_path):
+        """Test that only exports renew the token in the background."""
+        for argv, background_refresh in (
+            (["export", "--out", str(tmp_path)], True),
+            ([], False),
+        ):
+            with (
+                patch.object(cli, "SpotifyConnector") as mock_connector,
+                patch.object(cli, "run"),
+            ):
+                cli.main(argv)
+
+            kwargs = mock_connector.call_args.kwargs
+            assert kwargs["background_refresh"] is background_refresh
+            mock_connector.return_value.close.assert_called_once()
+
+    def test_export_requires_out(self):
+        """Test that the output directory is required."""
+        with pytest.raises(SystemExit):
+            cli.parse_args(["export"])
+
+    def test_episodes_exported(self, tmp_path):
+        """Test that episode rows and per-episode calls go to their files."""
+        calls = [
+            ("episode_streams", lambda: STREAMS, (), {}),
+            ("episode_performance", lambda: {"median": 1}, (), {}),
+        ]
+        episodes = [{"id": "e1", "name": "One"}, {"id": "e2", "name": "Two"}]
+
+        with Exporter(tmp_path) as exporter:
+            with pytest.MonkeyPatch.context() as monkeypatch:
+                monkeypatch.setattr(cli, "episode_calls", lambda *args: calls)
+                cli.fetch_episodes(None, iter(episodes), 2, reporter=exporter)
+
+        def read(name):
+            with open(tmp_path / f"{name}.ndjson", encoding="utf-8") as file:
+                return [json.loads(line) for line in file]
+
+        assert read("episodes") == episodes
+        assert [row["episode"] for row in read("episode_streams")] == [
+            "e1",
+            "e1",
+            "e2",
+            "e2",
+        ]
+        assert read("episode_performance") == [
+            {"episode": "e1", "median": 1},
+            {"episode": "e2", "median": 1},
+        ]
@@ -0,0 +1,292 @@
+"""
+Test the config and the summaries of the multi-account sync.
+"""
+
+import datetime as dt
+import json
+import threading
+import time
+from argparse import Namespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from spotifyconnector.auth import REFRESH_MARGIN
+from spotifyconnector.fleet import (
+    _spotify_account,
+    load_config,
+    merge_results,
+    plan_shards,
+    summarize,
+    sync_account,
+    sync_all,
+)
+
+ACCOUNT = {"client_id": "id", "sp_dc": "dc", "sp_key": "key"}
+
+
+def _write(tmp_path, name, content):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def _args(**kwargs):
+    defaults = {
+        "concurrency": 1,
+        "token_cache": None,
+        "out": None,
+        "deadline": None,
+        "rate_limit_db": None,
+    }
+    return Namespace(**{**defaults, **kwargs})
+
+
+class TestConfig:
+    """Test reading and validating the config file."""
+
+    def test_json_config_defaults(self, tmp_path):
+        """Test that accounts get a name and a list of podcasts."""
+        config = {"accounts": [{**ACCOUNT, "podcasts": ["p1", 2]}, ACCOUNT]}
+        path = _write(tmp_path, "accounts.json", json.dumps(config))
+
+        accounts = load_config(path)["accounts"]
+
+        assert [account["name"] for account in accounts] == ["account-0", "account-1"]
+        assert [account["podcasts"] for account in accounts] == [["p1", "2"], []]
+
+    def test_yaml_config(self, tmp_path):
+        """Test that YAML configs are read if PyYAML is installed."""
+        pytest.importorskip("yaml")
+        path = _write(
+            tmp_path,
+            "accounts.yaml",
+            "accounts:\n  - name: acme\n    client_id: id\n"
+            "    sp_dc: dc\n    sp_key: key\n    podcasts: [p1]\n",
+        )
+
+        assert load_config(path)["accounts"][0]["podcasts"] == ["p1"]
+
+    def test_invalid_yaml(self, tmp_path):
+        """Test that unparseable YAML is reported as an invalid config."""
+        pytest.importorskip("yaml")
+        path = _write(tmp_path, "accounts.yaml", "accounts: [\n")
+
+        with pytest.raises(ValueError, match="not valid YAML"):
+            load_config(path)
+
+    @pytest.mark.parametrize(
+        "config, message",
+        [
+            ({}, "list of accounts"),
+            ({"accounts": [{"client_id": "id"}]}, "lacks sp_dc, sp_key"),
+            (
+                {"accounts": [{**ACCOUNT, "name": "a"}, {**ACCOUNT, "name": "a"}]},
+                "used twice",
+            ),
+        ],
+    )
+    def test_invalid_config(self, tmp_path, config, message):
+        """Test that invalid configs are rejected before the run."""
+        path = _write(tmp_path, "accounts.json", json.dumps(config))
+        with pytest.raises(ValueError, match=message):
+            load_config(path)
+
+
+class TestSyncAccount:
+    """Test the sync of an account in a worker and the run summary."""
+
+    def test_podcasts_share_the_account(self):
+        """Test that all podcasts of an account are synced with one login,
+        and that their results and failures are counted."""
+
+        def run(connector, args, reporter):
+            if connector == "podcast-p2":
+                raise RuntimeError("boom")
+            reporter.status("metadata", True, {})
+            reporter.status("streams", False, {"error": "timeout"})
+
+        account = MagicMock()
+        account.__enter__.return_value = account
+        account.podcast.side_effect = lambda podcast_id: f"podcast-{podcast_id}"
+        with patch("spotifyconnector.fleet.SpotifyAccount", return_value=account):
+            with patch("spotifyconnector.__main__.run", side_effect=run):
+                result = sync_account(
+                    {**ACCOUNT, "name": "acme", "podcasts": ["p1", "p2"]},
+                    "https://example.com",
+                    _args(),
+                )
+
+        assert result["account"] == "acme"
+        assert result["error"] is None
+        assert result["podcasts"]["p1"] == {
+            "ok": 1,
+            "failed": 1,
+            "failures": [{"endpoint": "streams", "episode": None, "error": "timeout"}],
+        }
+        assert result["podcasts"]["p2"]["failures"][0]["error"] == "boom"
+        account.close.assert_not_called()
+        account.__exit__.assert_called_once()
+
+    def test_catalog_is_used_without_podcasts(self):
+        """Test that an account without podcasts syncs its whole catalog."""
+        account = MagicMock()
+        account.__enter__.return_value = account
+        account.catalog.return_value = iter([{"id": "s1"}, {"id": "s2"}])
+        with patch("spotifyconnector.fleet.SpotifyAccount", return_value=account):
+            with patch("spotifyconnector.__main__.run"):
+                result = sync_account(
+                    {**ACCOUNT, "name": "acme", "podcasts": []},
+                    "https://example.com",
+                    _args(),
+                )
+
+        assert list(result["podcasts"]) == ["s1", "s2"]
+
+    def test_token_renewed_in_background(self):
+        """Test that after the first token, only the background refresher
+        logs in and request threads never wait for a login."""
+        account = _spotify_account(ACCOUNT, "https://example.com", _args())
+        logins = []
+
+        def login():
+            logins.append(threading.current_thread().name)
+            account._bearer = f"token_{len(logins)}"
+            # Requests would log in again after 1s, the refresher does after 0.2s
+            account._bearer_expires = (
+                dt.datetime.now() + REFRESH_MARGIN + dt.timedelta(seconds=1)
+            )
+
+        def requests(stop):
+            while time.monotonic() < stop:
+                account._ensure_auth()
+                time.sleep(0.01)
+
+        margin = REFRESH_MARGIN + dt.timedelta(seconds=0.8)
+        with (
+            patch.object(account, "_login", side_effect=login),
+            patch("spotifyconnector.account.BACKGROUND_REFRESH_MARGIN", margin),
+        ):
+            stop = time.monotonic() + 1.5
+            threads = [
+                threading.Thread(target=requests, args=(stop,), name=f"request-{i}")
+                for i in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            account.close()
+
+        assert logins[0].startswith("request-")
+        assert len(logins) > 2
+        assert set(logins[1:]) == {"spotifyconnector-token-refresh"}
+
+    def test_summary_merges_accounts(self):
+        """Test that the run summary adds up the results of all accounts."""
+        podcast = {"ok": 3, "failed": 1, "failures": []}
+        results = [
+            {"account": "b", "podcasts": {"p1": podcast, "p2": podcast}, "error": None},
+            {"account": "a", "podcasts": {}, "error": "Login required"},
+        ]
+
+        summary = summarize(results, 1.5)
+
+        assert summary["accounts"] == 2
+        assert summary["failed_accounts"] == ["a"]
+        assert summary["podcasts"] == 2
+        assert summary["calls"] == {"ok": 6, "failed": 2}
+        assert [result["account"] for result in summary["results"]] == ["a", "b"]
+
+
+class TestShards:
+    """Test spreading the podcasts of the accounts over workers."""
+
+    def test_large_accounts_are_split(self):
+        """Test that podcasts are split into shards, largest accounts first."""
+        small = {**ACCOUNT, "name": "small", "podcasts": ["s1", "s2"]}
+        large = {**ACCOUNT, "name": "large", "podcasts": [f"l{i}" for i in range(25)]}
+
+        shards = plan_shards([small, large], shard_size=10)
+
+        assert [(shard["name"], len(shard["podcasts"])) for shard in shards] == [
+            ("large", 10),
+            ("large", 10),
+            ("large", 5),
+            ("small", 2),
+        ]
+        assert sum((shard["podcasts"] for shard in shards[:3]), []) == large["podcasts"]
+
+    def test_shard_results_are_merged(self):
+        """Test that the summary has one result per account."""
+        podcast = {"ok": 1, "failed": 0, "failures": []}
+        results = [
+            {"account": "a", "podcasts": {"p1": podcast}, "error": None, "seconds": 1},
+            {
+                "account": "a",
+                "podcasts": {"p2": podcast},
+                "error": "boom",
+                "seconds": 2,
+            },
+            {"account": "b", "podcasts": {}, "error": None},
+        ]
+
+        merged = merge_results(results)
+
+        assert merged[0] == {
+            "account": "a",
+            "podcasts": {"p1": podcast, "p2": podcast},
+            "error": "boom",
+            "seconds": 3,
+        }
+        assert summarize(merged, 1.0)["accounts"] == 2
+
+    def test_shards_share_the_token_cache(self):
+        """Test that the shards of an account, including those of a listed
+        catalog, run on the pool with one token cache, and that all workers
+        share one rate limiter."""
+        shards = []
+
+        def sync(account, base_url, args, deadline_at=None):
+            shards.append((account["name"], account["podcasts"], args.token_cache))
+            podcasts = {
+                podcast: {"ok": 1, "failed": 0} for podcast in account["podcasts"]
+            }
+            return {"account": account["name"], "podcasts": podcasts, "error": None}
+
+        def listing(account, base_url, args, deadline_at=None):
+            return {
+                "account": account["name"],
+                "podcasts": ["c1", "c2", "c3"],
+                "error": None,
+            }
+
+        config = {
+            "base_url": "https://example.com",
+            "accounts": [
+                {**ACCOUNT, "name": "acme", "podcasts": ["p1", "p2", "p3"]},
+                {**ACCOUNT, "name": "catalog", "podcasts": []},
+            ],
+        }
+        with (
+            patch("spotifyconnector.fleet.ProcessPoolExecutor", ThreadPoolExecutor),
+            patch("spotifyconnector.fleet.sync_account", side_effect=sync),
+            patch("spotifyconnector.fleet.list_podcasts", side_effect=listing),
+            patch("spotifyconnector.fleet.set_default_rate_limiter") as mock_set,
+        ):
+            summary = sync_all(config, _args(), workers=2, shard_size=2)
+
+        assert sorted(shard[:2] for shard in shards) == [
+            ("acme", ["p1", "p2"]),
+            ("acme", ["p3"]),
+            ("catalog", ["c1", "c2"]),
+            ("catalog", ["c3"]),
+        ]
+        assert len({shard[2] for shard in shards}) == 1
+        assert shards[0][2] is not None
+        limiters = {call.args[0].path for call in mock_set.call_args_list}
+        assert len(limiters) == 1
+        assert limiters.pop().endswith("ratelimit.db")
+        assert (summary["accounts"], summary["podcasts"]) == (2, 6)
+        assert summary["calls"]["ok"] == 6
@@ -0,0 +1,52 @@
+"""
+Test that importing the package stays fast, by keeping heavy dependencies
+out of imports that don't need them.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+
+def _imported_modules(code: str) -> set:
+    """Runs ``code`` in a fresh interpreter and returns the loaded modules."""
+    output = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint('\\n'.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(output.split())
+
+
+class TestImports:
+    """Test the modules loaded by imports of the package."""
+
+    def test_package_import_is_lazy(self):
+        """Test that importing the package doesn't import the connector."""
+        modules = _imported_modules("import spotifyconnector")
+
+        assert "spotifyconnector.connector" not in modules
+        assert "requests" not in modules
+        assert "loguru" not in modules
+
+    def test_connector_import(self):
+        """Test that the connector is imported on first use, without the
+        dependencies that are only needed later or not at all."""
+        modules = _imported_modules(
+            "import spotifyconnector\nspotifyconnector.SpotifyConnector"
+        )
+
+        assert "spotifyconnector.connector" in modules
+        assert not {"yaml", "tenacity", "sqlite3", "httpx", "numpy"} & modules
+
+    def test_lazy_attributes(self):
+        """Test that the public names resolve and unknown names still fail."""
+        import spotifyconnector
+        from spotifyconnector.connector import SpotifyConnector
+
+        assert spotifyconnector.SpotifyConnector is SpotifyConnector
+        assert "SpotifyAccount" in dir(spotifyconnector)
+        with pytest.raises(AttributeError):
+            spotifyconnector.missing  # pylint: disable=pointless-statement
@@ -0,0 +1,136 @@
+"""
+Test the impressions window planner.
+"""
+
+import datetime as dt
+from unittest.mock import Mock
+
+import pytest
+
+from spotifyconnector import __main__ as cli
+from spotifyconnector.connector import IMPRESSIONS_DAYS_DIFF
+from spotifyconnector.impressions import ImpressionsPlanner, plan_windows
+
+START = dt.date(2024, 1, 1)
+
+
+def _days(first: int, last: int):
+    return (
+        START + dt.timedelta(days=first - 1),
+        START + dt.timedelta(days=last - 1),
+    )
+
+
+class TestPlanWindows:
+    """Test covering date ranges with fixed windows."""
+
+    @pytest.mark.parametrize("days", [1, 30, 31, 59, 60, 61, 365])
+    def test_fewest_windows_cover_range(self, days):
+        """Test that every day is covered by as few windows as possible."""
+        end = START + dt.timedelta(days=days - 1)
+        windows = plan_windows("total", START, end)
+
+        window_days = IMPRESSIONS_DAYS_DIFF + 1
+        assert len(windows) == -(-days // window_days)
+        assert all(
+            window.end - window.start == dt.timedelta(days=IMPRESSIONS_DAYS_DIFF)
+            for window in windows
+        )
+        covered = {
+            window.start + dt.timedelta(days=i)
+            for window in windows
+            for i in range(window_days)
+        }
+        assert all(START + dt.timedelta(days=i) in covered for i in range(days))
+
+    def test_windows_stay_in_range(self):
+        """Test that the last window is aligned with the end of the range."""
+        windows = plan_windows("faceted", *_days(1, 61))
+
+        assert [(window.start, window.end) for window in windows] == [
+            _days(1, 30),
+            _days(31, 60),
+            _days(32, 61),
+        ]
+
+    def test_daily_is_not_split(self):
+        """Test that kinds without fixed windows get the range as is."""
+        windows = plan_windows("daily", *_days(1, 90))
+
+        assert [(window.start, window.end) for window in windows] == [_days(1, 90)]
+
+    def test_datetimes_are_truncated(self):
+        """Test that windows from datetimes are equal to those from dates."""
+        start = dt.datetime(2024, 1, 1, 13, 37)
+
+        assert plan_windows("total", start, start) == plan_windows(
+            "total", START, START
+        )
+
+
+class TestImpressionsPlanner:
+    """Test fetching planned windows."""
+
+    def test_results_labelled_by_window(self):
+        """Test that each window is requested once and labelled."""
+        connector = Mock()
+        connector.impressions.side_effect = lambda kind, start, end: {
+            "kind": kind,
+            "start": start.isoformat(),
+        }
+        planner = ImpressionsPlanner(connector)
+
+        results = planner.fetch("total", *_days(1, 60))
+
+        assert [window.label for window in results] == [
+            "2024-01-01..2024-01-30",
+            "2024-01-31..2024-02-29",
+        ]
+        assert [data["start"] for data in results.values()] == [
+            "2024-01-01",
+            "2024-01-31",
+        ]
+        assert connector.impressions.call_count == 2
+
+    def test_fetched_windows_are_not_requested_again(self):
+        """Test that overlapping ranges reuse the windows of this session."""
+        connector = Mock()
+        connector.impressions.return_value = {}
+        planner = ImpressionsPlanner(connector)
+
+        planner.fetch("total", *_days(1, 60))
+        planner.fetch("total", *_days(31, 90))
+
+        requested = [call.args[1] for call in connector.impressions.call_args_list]
+        assert sorted(requested) == [_days(1, 1)[0], _days(31, 31)[0], _days(61, 61)[0]]
+
+    def test_cli_logs_each_window(self):
+        """Test that the CLI logs the response of each window like a
+        separate call, and a failed fetch as one error."""
+        connector = Mock()
+        connector.impressions.side_effect = lambda kind, start, end: {
+            "start": start.isoformat()
+        }
+        reporter = Mock()
+
+        cli.fetch_impressions(
+            ImpressionsPlanner(connector),
+            "impressions_total",
+            "total",
+            *_days(1, 60),
+            reporter,
+        )
+        connector.impressions.side_effect = ValueError("boom")
+        cli.fetch_impressions(
+            ImpressionsPlanner(connector),
+            "impressions_faceted",
+            "faceted",
+            *_days(1, 10),
+            reporter,
+        )
+
+        assert [call.args for call in reporter.status.call_args_list] == [
+            ("impressions_total", True, {"start": "2024-01-01"}),
+            ("impressions_total", True, {"start": "2024-01-31"}),
+            ("impressions_faceted", False, {"error": "boom"}),
+        ]
@@ -0,0 +1,70 @@
+"""
+Test the parser for JavaScript object literals of the authorize page.
+"""
+
+import pytest
+
+from spotifyconnector.jsobject import JSObjectError, decode_js_object, parse_js_object
+
+
+class TestJSObject:
+    """Test parse_js_object and decode_js_object."""
+
+    def test_authorization_response(self):
+        """Test the shapes of the authorize page: unquoted keys with single-
+        or double-quoted strings."""
+        assert parse_js_object(
+            "{type: 'authorization_response', response: {code: 'AQB-x_1', "
+            "state: 'abc'}}"
+        ) == {
+            "type": "authorization_response",
+            "response": {"code": "AQB-x_1", "state": "abc"},
+        }
+        assert parse_js_object(
+            '{"type": "authorization_response",\n'
+            ' "response": {"error": "login_required", "state": "abc"}}'
+        ) == {
+            "type": "authorization_response",
+            "response": {"error": "login_required", "state": "abc"},
+        }
+
+    def test_values(self):
+        """Test numbers, constants, arrays, escapes, comments and trailing
+        commas."""
+        assert parse_js_object(
+            "{a: [1, -2.5, 1e3, 0x1F, true, false, null, undefined,], "
+            "'b c': 'it\\'s \\\"\\u00e9\\n', $d: \"x\" /* comment */, // comment\n"
+            "1: {},}"
+        ) == {
+            "a": [1, -2.5, 1000.0, 31, True, False, None, None],
+            "b c": "it's \"é\n",
+            "$d": "x",
+            "1": {},
+        }
+
+    def test_decode_ignores_following_text(self):
+        """Test that a literal is read from a script up to its end, even if
+        its strings contain semicolons."""
+        script = "const authorizationResponse = {code: 'a;b'}; next();"
+        value, end = decode_js_object(script, script.index("=") + 1)
+
+        assert value == {"code": "a;b"}
+        assert script[end:] == "; next();"
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "{a: 1",
+            "{a 1}",
+            "{a: 'x}",
+            "{a: foo}",
+            "[1 2]",
+            "{a: 1} x",
+            "{a: '\\u12'}",
+        ],
+    )
+    def test_invalid(self, text):
+        """Test that invalid literals are rejected."""
+        with pytest.raises(JSObjectError):
+            parse_js_object(text)
@@ -0,0 +1,166 @@
+"""
+Test the metrics hooks of the connector and the Prometheus textfile exporter.
+"""
+
+import datetime as dt
+import json
+from unittest.mock import PropertyMock, patch
+
+import pytest
+
+from spotifyconnector.cache import MemoryCache
+from spotifyconnector.connector import MaxRetriesException
+from spotifyconnector.metrics import CallEvent, PrometheusTextfileExporter
+
+DAY = dt.date(2024, 1, 1)
+BODY = {"detailedStreams": [{"date": "2024-01-01", "starts": 1}], "total": 1}
+
+
+class TestMetricsHooks:
+    """Test the events reported per call."""
+
+    def test_retried_call(self, connector, make_response):
+        """Test that attempts, status and bytes of a retried call are reported."""
+        events = []
+        connector.metrics_hooks.append(events.append)
+        with (
+            patch("spotifyconnector.connector.sleep") as mock_sleep,
+            patch(
+                "requests.Session.send",
+                side_effect=[make_response(503), make_response(200, BODY)],
+            ),
+        ):
+            connector.streams(DAY)
+
+        mock_sleep.assert_called_once()
+        [event] = events
+        assert event.endpoint == "streams"
+        assert (event.ok, event.status, event.attempts) == (True, 200, 2)
+        assert event.bytes == len(json.dumps(BODY))
+        assert event.network > 0
+        assert event.seconds >= event.network
+
+    def test_failed_call(self, connector, make_response):
+        """Test that a call failing after all retries is reported."""
+        events = []
+        connector.metrics_hooks.append(events.append)
+        with (
+            patch("spotifyconnector.connector.sleep"),
+            patch(
+                "requests.Session.send", side_effect=lambda *a, **k: make_response(503)
+            ),
+        ):
+            with pytest.raises(MaxRetriesException):
+                connector.streams(DAY)
+
+        [event] = events
+        assert not event.ok
+        assert event.outcome == "503"
+        assert event.attempts == 6
+        assert "MaxRetriesException" in event.error
+
+    def test_cache_hit(self, connector, make_response):
+        """Test that cache hits are reported without attempts."""
+        events = []
+        connector.metrics_hooks.append(events.append)
+        connector._response_cache = MemoryCache()
+        with patch("requests.Session.send", return_value=make_response(200, BODY)):
+            connector.streams(DAY)
+            connector.streams(DAY)
+
+        assert [event.outcome for event in events] == ["200", "cached"]
+        assert events[1].attempts == 0
+
+    def test_streamed_rows(self, connector, make_response):
+        """Test that streamed calls are reported once all rows were read."""
+        events = []
+        connector.metrics_hooks.append(events.append)
+        with patch("requests.Session.send", return_value=make_response(200, BODY)):
+            rows = connector.streams(DAY, stream=True)
+            assert not events
+            assert list(rows) == BODY["detailedStreams"]
+
+        [event] = events
+        assert event.ok
+        assert event.bytes == len(json.dumps(BODY))
+
+    def test_no_events_without_hooks(self, connector, make_response):
+        """Test that calls are not recorded if no hooks are registered."""
+        with (
+            patch("spotifyconnector.connector.sleep"),
+            patch(
+                "requests.Session.send",
+                side_effect=[
+                    make_response(503),
+                    make_response(200, BODY),
+                    make_response(200, BODY),
+                ],
+            ),
+            patch("spotifyconnector.connector.CallEvent") as mock_event,
+        ):
+            assert connector.streams(DAY) == BODY
+            assert list(connector.streams(DAY, stream=True)) == BODY["detailedStreams"]
+
+        mock_event.assert_not_called()
+
+    def test_failing_hook_does_not_fail_call(self, connector, make_response):
+        """Test that errors of hooks are only logged."""
+
+        def broken_hook(event):
+            raise RuntimeError("broken")
+
+        connector.metrics_hooks.append(broken_hook)
+        with patch("requests.Session.send", return_value=make_response(200, BODY)):
+            assert connector.streams(DAY) == BODY
+
+    def test_body_not_decoded_for_disabled_trace(self, connector, make_response):
+        """Test that the body is only decoded for the log at TRACE level."""
+        with (
+            patch("requests.Session.send", return_value=make_response(200, BODY)),
+            patch("requests.Response.text", new_callable=PropertyMock) as mock_text,
+        ):
+            connector.streams(DAY)
+
+        mock_text.assert_not_called()
+
+
+class TestPrometheusTextfileExporter:
+    """Test summing up events in the Prometheus text format."""
+
+    def test_counters(self, tmp_path):
+        """Test that events are summed up per endpoint and written to the file."""
+        path = tmp_path / "spotify.prom"
+        exporter = PrometheusTextfileExporter(path, write_interval=3600)
+
+        exporter(CallEvent("streams", "u", 200, True, 2, 100, network=0.5, backoff=2))
+        exporter(CallEvent("streams", "u", ok=True, cached=True))
+        exporter(CallEvent("episodes", "u", 503, False, 6, error="boom"))
+        exporter.close()
+
+        text = path.read_text(encoding="utf-8")
+        assert "# TYPE spotifyconnector_calls_total counter" in text
+        assert 'spotifyconnector_calls_total{endpoint="streams",status="200"} 1' in text
+        assert (
+            'spotifyconnector_calls_total{endpoint="streams",status="cached"} 1' in text
+        )
+        assert 'spotifyconnector_attempts_total{endpoint="episodes"} 6' in text
+        assert 'spotifyconnector_response_bytes_total{endpoint="streams"} 100' in text
+        assert (
+            'spotifyconnector_seconds_total{endpoint="streams",phase="backoff"} 2'
+            in text
+        )
+        assert list(tmp_path.iterdir()) == [path]
+        # Readable by the collector, which runs as another user
+        assert path.stat().st_mode & 0o777 == 0o644
+
+    def test_write_interval(self, tmp_path):
+        """Test that the file is not rewritten for every event."""
+        path = tmp_path / "spotify.prom"
+        exporter = PrometheusTextfileExporter(path, write_interval=3600)
+
+        exporter(CallEvent("streams", "u", 200, True, 1))
+        exporter(CallEvent("streams", "u", 200, True, 1))
+
+        assert 'status="200"} 1' in path.read_text(encoding="utf-8")
+        exporter.close()
+        assert 'status="200"} 2' in path.read_text(encoding="utf-8")
@@ -0,0 +1,164 @@
+"""
+Test the adaptive client-side rate limiter.
+"""
+
+import datetime as dt
+from email.utils import format_datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.ratelimit import (
+    RateLimiter,
+    SQLiteRateLimiter,
+    get_default_rate_limiter,
+    parse_retry_after,
+)
+
+
+def _limiter(clock, cls=RateLimiter, *args, **kwargs):
+    with patch.object(cls, "_clock", staticmethod(clock)):
+        limiter = cls(*args, **kwargs)
+    limiter._clock = clock
+    return limiter
+
+
+class TestRateLimiter:
+    """Test the token bucket and its AIMD adjustment."""
+
+    def test_burst_then_paced(self, clock):
+        """Test that a burst passes at once and later requests are paced."""
+        limiter = _limiter(clock, rate=2.0, burst=3, increase=0)
+
+        for _ in range(3):
+            limiter.acquire()
+        assert clock.sleeps == []
+
+        limiter.acquire()
+        limiter.acquire()
+        assert clock.sleeps == [0.5, 0.5]
+
+    def test_acquire_timeout(self, clock):
+        """Test that acquire gives up instead of waiting past its timeout."""
+        limiter = _limiter(clock, rate=1.0, burst=1, increase=0)
+        assert limiter.acquire(timeout=0.5)
+
+        assert not limiter.acquire(timeout=0.5)
+        assert clock.sleeps == []
+        assert limiter.acquire(timeout=1.0)
+        assert clock.sleeps == [1.0]
+
+    def test_throttle_decreases_once_per_cooldown(self, clock):
+        """Test that concurrent 429s only cut the rate once."""
+        limiter = _limiter(clock, rate=8.0, decrease=0.5, cooldown=1.0)
+
+        limiter.on_throttle()
+        limiter.on_throttle()
+        assert limiter.rate == 4.0
+
+        clock.now += 1.0
+        limiter.on_throttle()
+        assert limiter.rate == 2.0
+
+    def test_rate_stays_within_bounds(self, clock):
+        """Test that the adaptive rate is clamped to min_rate and max_rate."""
+        limiter = _limiter(
+            clock, rate=1.0, min_rate=0.5, max_rate=1.2, increase=0.1, cooldown=0
+        )
+
+        for _ in range(10):
+            limiter.on_success()
+        assert limiter.rate == pytest.approx(1.2)
+
+        for _ in range(10):
+            limiter.on_throttle()
+        assert limiter.rate == 0.5
+
+    def test_retry_after_pauses_requests(self, clock):
+        """Test that Retry-After blocks all requests for the given time."""
+        limiter = _limiter(clock, rate=10.0, burst=10)
+
+        limiter.on_throttle(retry_after=30)
+        limiter.acquire()
+
+        assert sum(clock.sleeps) >= 30
+
+    def test_sqlite_limiter_shares_state(self, clock, tmp_path):
+        """Test that two limiters on one database share rate and tokens."""
+        path = str(tmp_path / "ratelimit.sqlite")
+        first = _limiter(clock, SQLiteRateLimiter, path, rate=4.0, burst=2)
+        second = _limiter(clock, SQLiteRateLimiter, path, rate=10.0, burst=2)
+
+        # The second limiter joins with the existing state
+        assert second.rate == 4.0
+
+        # The burst used by the first limiter is gone for the second one
+        first.acquire()
+        first.acquire()
+        second.acquire()
+        assert clock.sleeps == [0.25]
+
+        first.on_throttle()
+        assert second.rate == 2.0
+
+        first.close()
+        second.close()
+
+
+class TestRetryAfter:
+    """Test parsing of the Retry-After header."""
+
+    def test_seconds(self):
+        assert parse_retry_after("12") == 12.0
+
+    def test_http_date(self):
+        retry_at = dt.datetime.now(dt.timezone.utc) + dt.timedelta(seconds=60)
+        assert 55 < parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 60
+
+    @pytest.mark.parametrize("value", [None, "", "soon", Mock()])
+    def test_invalid(self, value):
+        assert parse_retry_after(value) is None
+
+
+class TestConnectorRateLimiting:
+    """Test that the connector feeds its rate limiter."""
+
+    def test_default_limiter_shared_between_connectors(self, spotify_connector):
+        """Test that connectors share the process-wide limiter by default."""
+        other = SpotifyConnector("url", "client_id", "podcast_id", "dc", "key")
+
+        assert spotify_connector._rate_limiter is get_default_rate_limiter()
+        assert other._rate_limiter is spotify_connector._rate_limiter
+
+    def test_429_with_retry_after_throttles(self, spotify_connector, make_response):
+        """Test that 429 responses and Retry-After are reported to the limiter."""
+        limiter = Mock(spec=RateLimiter)
+        spotify_connector._rate_limiter = limiter
+
+        with patch("requests.Session.send") as mock_send:
+            mock_send.side_effect = [
+                make_response(429, headers={"Retry-After": "7"}),
+                make_response(200),
+            ]
+            with patch.object(spotify_connector, "_ensure_auth"):
+                with patch("spotifyconnector.connector.sleep"):
+                    result = spotify_connector._request("https://test.example.com")
+
+        assert result == {"test": "data"}
+        assert limiter.acquire.call_count == 2
+        limiter.on_throttle.assert_called_once_with(7.0)
+        limiter.on_success.assert_called_once()
+
+    def test_503_does_not_throttle(self, spotify_connector, make_response):
+        """Test that server errors are retried without cutting the rate."""
+        limiter = Mock(spec=RateLimiter)
+        spotify_connector._rate_limiter = limiter
+
+        with patch("requests.Session.send") as mock_send:
+            mock_send.side_effect = [make_response(503), make_response(200)]
+            with patch.object(spotify_connector, "_ensure_auth"):
+                with patch("spotifyconnector.connector.sleep"):
+                    spotify_connector._request("https://test.example.com")
+
+        limiter.on_throttle.assert_not_called()
@@ -0,0 +1,147 @@
+"""
+Test the compact record types and the records flag of the endpoints.
+"""
+
+import datetime as dt
+import pickle
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.records import (
+    Episode,
+    FacetList,
+    FollowerCount,
+    ListenerPoint,
+    RecordList,
+    StreamPoint,
+)
+
+DAY = dt.date(2024, 1, 1)
+
+
+class TestRecords:
+    """Test converting rows to records and back."""
+
+    @pytest.mark.parametrize(
+        "record_type, row",
+        [
+            (StreamPoint, {"date": "2024-01-01", "starts": 3, "streams": 2}),
+            (ListenerPoint, {"date": "2024-01-01", "count": 7}),
+            (FollowerCount, {"date": "2024-01-01", "count": 0}),
+            (
+                Episode,
+                {
+                    "id": "e1",
+                    "name": "Folge 1",
+                    "releaseDate": "2024-01-01",
+                    "duration": 1800,
+                    "starts": 10,
+                    "streams": 8,
+                    "listeners": 5,
+                },
+            ),
+        ],
+    )
+    def test_round_trip(self, record_type, row):
+        """Test that a row survives the conversion unchanged."""
+        assert record_type.from_dict(row).to_dict() == row
+
+    def test_missing_and_unknown_keys(self):
+        """Test that missing keys stay missing and unknown keys are kept."""
+        row = {"id": "e1", "name": None, "explicit": True}
+        record = Episode.from_dict(row)
+
+        assert record.id == "e1"
+        assert record.name is None
+        assert record.release_date is None
+        assert record.to_dict() == row
+
+    def test_no_instance_dict(self):
+        """Test that records only use slots."""
+        record = StreamPoint("2024-01-01", 1, 1)
+
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.other = 1
+
+    def test_equality_and_pickle(self):
+        """Test that records compare by value and can be pickled."""
+        record = ListenerPoint("2024-01-01", 4, extra=1)
+
+        assert record == ListenerPoint.from_dict(
+            {"date": "2024-01-01", "count": 4, "extra": 1}
+        )
+        assert record != ListenerPoint("2024-01-01", 4)
+        assert pickle.loads(pickle.dumps(record)) == record
+
+
+class TestRecordLists:
+    """Test converting whole responses to records and back."""
+
+    def test_record_list_keeps_other_values(self):
+        """Test that values besides the rows are kept for the round trip."""
+        response = {
+            "detailedStreams": [{"date": "2024-01-01", "starts": 1, "streams": 1}],
+            "total": 1,
+        }
+        records = RecordList.from_response(StreamPoint, response)
+
+        assert records == [StreamPoint("2024-01-01", 1, 1)]
+        assert records.meta == {"total": 1}
+        assert records.to_dict() == response
+
+    def test_facet_list_round_trip(self):
+        """Test that dict and list facets are split into entries."""
+        response = {
+            "ageFacetedCounts": {
+                "18-22": {"counts": {"female": 1, "male": 2}},
+                "23-27": {"counts": {"female": 3, "male": 4}},
+            },
+            "countryCounts": [{"country": "DE", "count": 5}],
+            "empty": {},
+            "total": 10,
+        }
+        facets = FacetList.from_response(response)
+
+        assert [(facet.facet, facet.key) for facet in facets] == [
+            ("ageFacetedCounts", "18-22"),
+            ("ageFacetedCounts", "23-27"),
+            ("countryCounts", None),
+        ]
+        assert facets.to_dict() == response
+
+
+class TestRecordsFlag:
+    """Test the records flag of the endpoints."""
+
+    def test_streams(self, spotify_connector):
+        """Test that streams returns a RecordList with records."""
+        response = {"detailedStreams": [{"date": "2024-01-01", "starts": 1}]}
+        with patch.object(spotify_connector, "_request", return_value=response):
+            result = spotify_connector.streams(DAY, records=True)
+
+        assert isinstance(result, RecordList)
+        assert result[0].starts == 1
+        assert result.to_dict() == response
+
+    def test_aggregate(self, spotify_connector):
+        """Test that aggregate returns facet records."""
+        response = {"genderedCounts": {"counts": {"female": 1}}}
+        with patch.object(spotify_connector, "_request", return_value=response):
+            result = spotify_connector.aggregate(DAY, records=True)
+
+        assert isinstance(result, FacetList)
+        assert result.to_dict() == response
+
+    def test_episodes(self, spotify_connector):
+        """Test that episodes yields records across pages."""
+        pages = [
+            {"episodes": [{"id": "e1"}, {"id": "e2"}], "totalPages": 2},
+            {"episodes": [{"id": "e3"}], "totalPages": 2},
+        ]
+        with patch.object(spotify_connector, "_request", side_effect=pages):
+            episodes = list(spotify_connector.episodes(DAY, records=True))
+
+        assert all(isinstance(episode, Episode) for episode in episodes)
+        assert [episode.id for episode in episodes] == ["e1", "e2", "e3"]
@@ -0,0 +1,127 @@
+"""
+Test recording API responses to an archive and replaying them.
+"""
+
+import datetime as dt
+import json
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.ratelimit import RateLimiter, UnlimitedRateLimiter
+from spotifyconnector.replay import Recorder, Replayer, ReplayMiss
+
+BASE_URL = "https://generic.wg.spotify.com/podcasters/v0"
+
+
+class FakeAdapter(BaseAdapter):
+    """Answers requests with their URL and two rows, and fails the first
+    request to each URL with a 503."""
+
+    def __init__(self):
+        super().__init__()
+        self.requests = []
+
+    def send(self, request, **kwargs):
+        self.requests.append(request.url)
+        response = requests.Response()
+        response.status_code = 503 if self.requests.count(request.url) == 1 else 200
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(
+            {"url": request.url, "rows": [{"row": 1}, {"row": 2}]}
+        ).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def _connector(**kwargs):
+    return SpotifyConnector(BASE_URL, "client_id", "show", "sp_dc", "sp_key", **kwargs)
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """An archive of a metadata and a streams call."""
+    monkeypatch.setattr("spotifyconnector.connector.sleep", lambda seconds: None)
+    path = tmp_path / "run.jsonl.gz"
+    session = requests.Session()
+    adapter = FakeAdapter()
+    session.mount("https://", adapter)
+
+    with Recorder(str(path)) as recorder:
+        connector = _connector(
+            session=session,
+            transport=recorder,
+            rate_limiter=RateLimiter(rate=1000, burst=100),
+        )
+        connector._bearer = "token"
+        connector._bearer_expires = dt.datetime.now() + dt.timedelta(hours=1)
+        recorded = {
+            "metadata": connector.metadata(),
+            "streams": connector.streams(dt.date(2025, 1, 3), dt.date(2025, 1, 9)),
+        }
+
+    assert len(adapter.requests) == 4
+    assert recorder.count == 2
+    return path, recorded
+
+
+class TestReplay:
+    """Test the Recorder and the Replayer."""
+
+    def test_replay_returns_recorded_responses(self, archive):
+        """Test that replayed calls return the final recorded responses
+        without a login."""
+        path, recorded = archive
+        replayer = Replayer(str(path))
+        connector = _connector(transport=replayer)
+
+        assert len(replayer) == 2
+        assert isinstance(connector.account.rate_limiter, UnlimitedRateLimiter)
+        assert connector.metadata() == recorded["metadata"]
+        assert (
+            connector.streams(dt.date(2025, 1, 3), dt.date(2025, 1, 9))
+            == recorded["streams"]
+        )
+        assert (
+            list(
+                connector.streams(dt.date(2025, 1, 3), dt.date(2025, 1, 9), stream=True)
+            )
+            == recorded["streams"]["rows"]
+        )
+
+    def test_unrecorded_request_raises(self, archive):
+        """Test that a request missing from the archive fails without retries."""
+        path, _ = archive
+        connector = _connector(transport=Replayer(str(path)))
+
+        with pytest.raises(ReplayMiss, match="/shows/show/listeners"):
+            connector.listeners(dt.date(2025, 1, 3), dt.date(2025, 1, 9))
+
+    def test_dates_shift_with_replay_day(self, archive):
+        """Test that a replay days later matches requests with shifted dates."""
+        path, recorded = archive
+        recorded_on = Replayer(str(path)).recorded_at.date()
+        replayer = Replayer(str(path), today=recorded_on + dt.timedelta(days=5))
+        connector = _connector(transport=replayer)
+
+        assert (
+            connector.streams(dt.date(2025, 1, 8), dt.date(2025, 1, 14))
+            == recorded["streams"]
+        )
+        with pytest.raises(ReplayMiss):
+            connector.streams(dt.date(2025, 1, 1), dt.date(2025, 1, 7))
+
+    def test_not_an_archive(self, tmp_path):
+        """Test that other files are rejected."""
+        path = tmp_path / "other.jsonl.gz"
+        with Recorder(str(path)):
+            pass
+
+        with pytest.raises(ValueError, match="Not a response archive"):
+            Replayer(str(path))
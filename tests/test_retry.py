@@ -0,0 +1,142 @@
+"""
+Test the retry policy and the circuit breakers of endpoint families.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from requests.exceptions import ConnectionError, HTTPError
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.retry import CircuitBreaker, CircuitOpen, RetryPolicy
+
+
+class TestRetryPolicy:
+    """Test the delays and the retry decisions of the policy."""
+
+    def test_delays(self):
+        """Test that jittered delays stay within their bounds and plain
+        delays double, both capped at the maximum."""
+        policy = RetryPolicy(base_delay=2.0, max_delay=30.0)
+        delay = policy.base_delay
+        for _ in range(100):
+            previous, delay = delay, policy.next_delay(delay)
+            assert 2.0 <= delay <= min(30.0, previous * 3)
+
+        plain = RetryPolicy(base_delay=2.0, max_delay=30.0, jitter=False)
+        delays = [plain.next_delay(2.0 * 2**i) for i in range(5)]
+        assert delays == [4.0, 8.0, 16.0, 30.0, 30.0]
+        assert plain.next_delay(4.0, retry_after=7.0) == 7.0
+        assert plain.next_delay(4.0, retry_after=600.0) == 30.0
+
+    def test_retry_after_sets_delay(self, make_connector, make_response):
+        """Test that the delay after a 429 is the one of its Retry-After."""
+        connector = make_connector()
+        with patch("requests.Session.send") as mock_send:
+            mock_send.side_effect = [
+                make_response(429, headers={"Retry-After": "7"}),
+                make_response(200),
+            ]
+            with patch("spotifyconnector.connector.sleep") as mock_sleep:
+                assert connector.metadata() == {"test": "data"}
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    def test_client_errors_are_not_retried(self, make_connector, make_response):
+        """Test that errors outside the retry statuses are raised right away."""
+        connector = make_connector()
+        with patch(
+            "requests.Session.send", return_value=make_response(404)
+        ) as mock_send:
+            with pytest.raises(HTTPError):
+                connector.metadata()
+
+        assert mock_send.call_count == 1
+
+    def test_failed_login_is_not_retried_per_attempt(self):
+        """Test that a failing login is only retried by its own policy,
+        not again by each attempt of the request that needed it."""
+        connector = SpotifyConnector(
+            "https://generic.wg.spotify.com/podcasters/v0",
+            "client_id",
+            "podcast_id",
+            "dc",
+            "key",
+            retry_policy=RetryPolicy(max_attempts=3),
+        )
+        with patch.object(connector.account, "_login") as mock_login:
+            mock_login.side_effect = ConnectionError("accounts service down")
+            with patch("spotifyconnector.retry.sleep"):
+                with pytest.raises(ConnectionError):
+                    connector.metadata()
+
+        assert mock_login.call_count == 3
+
+
+class TestCircuitBreaker:
+    """Test that failing endpoint families are paused."""
+
+    def test_open_circuit_fails_fast(self, clock, make_connector, make_response):
+        """Test that an endpoint family fails fast after repeated failures,
+        while other families are still called."""
+        connector = make_connector(
+            retry_policy=RetryPolicy(max_attempts=2, failure_threshold=4)
+        )
+        impressions = f"{connector.base_url}/shows/podcast_id/impressions/total"
+        with patch("requests.Session.send") as mock_send:
+            mock_send.side_effect = lambda *args, **kwargs: make_response(503)
+            with patch("spotifyconnector.connector.sleep"):
+                for _ in range(2):
+                    with pytest.raises(Exception, match="503"):
+                        connector._request(impressions)
+                assert mock_send.call_count == 4
+
+                with pytest.raises(CircuitOpen, match="impressions"):
+                    connector._request(impressions)
+                assert mock_send.call_count == 4
+
+            mock_send.side_effect = None
+            mock_send.return_value = make_response(200)
+            assert connector.metadata() == {"test": "data"}
+
+    def test_half_open_circuit(self, clock):
+        """Test that calls go through again after the reset timeout, and that
+        a failure reopens the circuit while a success closes it."""
+        breaker = CircuitBreaker("streams", failure_threshold=2, reset_timeout=60)
+        breaker.on_failure()
+        breaker.check()
+        breaker.on_failure()
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpen):
+            breaker.check()
+
+        clock.now += 60
+        assert breaker.state == "half-open"
+        breaker.check()
+        breaker.on_failure()
+        assert breaker.state == "open"
+
+        clock.now += 60
+        breaker.on_success()
+        assert breaker.state == "closed"
+        breaker.on_failure()
+        breaker.check()
+
+    def test_half_open_circuit_lets_one_call_probe(self, clock):
+        """Test that only one call probes a half-open circuit, and that the
+        next call probes if it doesn't report back within the reset timeout."""
+        breaker = CircuitBreaker("streams", failure_threshold=1, reset_timeout=60)
+        breaker.on_failure()
+        clock.now += 60
+
+        breaker.check()
+        with pytest.raises(CircuitOpen):
+            breaker.check()
+
+        clock.now += 60
+        breaker.check()
+        with pytest.raises(CircuitOpen):
+            breaker.check()
+        breaker.on_success()
+        breaker.check()
+        breaker.check()
@@ -0,0 +1,99 @@
+"""
+Test HTTP session pooling in SpotifyConnector.
+
+These tests verify that the connector reuses a single keep-alive session
+for data and authentication requests instead of creating one per call.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from spotifyconnector.connector import SpotifyConnector, create_session
+
+
+def _ok_response(data):
+    response = Mock()
+    response.status_code = 200
+    response.ok = True
+    response.json.return_value = data
+    return response
+
+
+class TestSessionPooling:
+    """Test the pooled HTTP session owned by SpotifyConnector."""
+
+    def test_create_session_mounts_pooled_adapter(self):
+        """Test that the session adapter uses the configured pool settings."""
+        session = create_session(pool_connections=3, pool_maxsize=7)
+
+        adapter = session.get_adapter("https://generic.wg.spotify.com")
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+        assert session.get_adapter("http://localhost") is adapter
+
+    def test_same_session_reused_across_requests(self, spotify_connector):
+        """Test that all data requests go through the same session object."""
+        sessions = []
+
+        def send(session, request, **kwargs):
+            sessions.append(session)
+            return _ok_response({"test": "data"})
+
+        with patch.object(requests.Session, "send", autospec=True) as mock_send:
+            mock_send.side_effect = send
+            with patch.object(spotify_connector, "_ensure_auth"):
+                spotify_connector._request("https://test.example.com/a")
+                spotify_connector._request("https://test.example.com/b")
+
+        assert len(sessions) == 2
+        assert sessions[0] is sessions[1] is spotify_connector._session
+
+    def test_injected_session_is_used_and_not_closed(self):
+        """Test that an external session is used as-is and left open."""
+        session = Mock(spec=requests.Session)
+        session.prepare_request.side_effect = lambda request: request.prepare()
+        session.send.return_value = _ok_response({"test": "data"})
+
+        connector = SpotifyConnector(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            podcast_id="test_podcast_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+            session=session,
+        )
+        with patch.object(connector, "_ensure_auth"):
+            assert connector._request("https://test.example.com/test") == {
+                "test": "data"
+            }
+
+        connector.close()
+        session.send.assert_called_once()
+        session.close.assert_not_called()
+
+    def test_owned_session_closed_on_exit(self):
+        """Test that the context manager closes the connector-owned session."""
+        connector = SpotifyConnector(
+            base_url="https://generic.wg.spotify.com/podcasters/v0",
+            client_id="test_client_id",
+            podcast_id="test_podcast_id",
+            sp_dc="test_sp_dc",
+            sp_key="test_sp_key",
+        )
+
+        with patch.object(connector._session, "close") as mock_close:
+            with connector:
+                pass
+            mock_close.assert_called_once()
+
+    def test_authenticate_uses_connector_session(self, spotify_connector):
+        """Test that the auth calls are made through the pooled session."""
+        with patch.object(spotify_connector._session, "get") as mock_get:
+            mock_get.side_effect = requests.exceptions.HTTPError("401")
+            with patch("spotifyconnector.retry.sleep"):
+                with pytest.raises(Exception):
+                    spotify_connector._authenticate()
+
+        assert mock_get.call_count > 0
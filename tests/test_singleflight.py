@@ -0,0 +1,183 @@
+"""
+Test the coalescing of identical concurrent requests.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.deadline import Deadline, DeadlineExceeded
+from spotifyconnector.retry import CircuitOpen
+from spotifyconnector.singleflight import SingleFlight
+
+WORKERS = 8
+
+
+def _wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def _run_concurrently(target, workers=WORKERS):
+    results = [None] * workers
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as error:  # pylint: disable=broad-except
+            results[i] = error
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class TestSingleFlight:
+    """Test the SingleFlight helper."""
+
+    def test_concurrent_calls_share_one_call(self):
+        """Test that waiting callers get copies of the leader's result."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {"data": [1, 2]}
+
+        threads, results = _run_concurrently(lambda: flight.do("key", func))
+        _wait_for(lambda: flight.stats.hits == WORKERS - 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * (
+            WORKERS - 1
+        )
+        assert len({id(result) for result, _ in results}) == WORKERS
+        assert all(result == {"data": [1, 2]} for result, _ in results)
+        assert flight.stats.calls == 1
+
+    def test_error_is_raised_in_all_callers(self):
+        """Test that waiting callers get the leader's error."""
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def func():
+            release.wait(timeout=5)
+            raise ValueError("failed")
+
+        threads, results = _run_concurrently(lambda: flight.do("key", func))
+        _wait_for(lambda: flight.stats.hits == WORKERS - 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.parametrize(
+        "error", [DeadlineExceeded("metadata", 1), CircuitOpen("metadata", 30)]
+    )
+    def test_leader_state_errors_are_not_shared(self, error):
+        """Test that waiters make the call themselves when the leader ran
+        out of time or hit an open circuit."""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(timeout=5)
+                raise error
+            return "data"
+
+        threads, results = _run_concurrently(lambda: flight.do("key", func))
+        _wait_for(lambda: flight.stats.hits == WORKERS - 1)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert results.count(error) == 1
+        assert sorted(result[0] for result in results if result is not error) == [
+            "data"
+        ] * (WORKERS - 1)
+
+    def test_waiter_keeps_to_its_deadline(self):
+        """Test that a waiter gives up at its own deadline while the
+        leader's call goes on."""
+        flight = SingleFlight()
+        release = threading.Event()
+        threads, results = _run_concurrently(
+            lambda: flight.do("key", lambda: release.wait(timeout=5)), workers=1
+        )
+        _wait_for(lambda: flight.stats.calls == 1)
+
+        with Deadline(0.05) as deadline:
+            with pytest.raises(DeadlineExceeded, match="metadata"):
+                flight.do("key", lambda: False, what="metadata")
+        release.set()
+        threads[0].join()
+
+        assert deadline.report()["cancelled"] == {"metadata": 1}
+        assert results == [(True, False)]
+
+    def test_sequential_calls_are_not_shared(self):
+        """Test that a finished call is not reused."""
+        flight = SingleFlight()
+
+        assert flight.do("key", lambda: 1) == (1, False)
+        assert flight.do("key", lambda: 2) == (2, False)
+        assert flight.stats.calls == 2
+        assert flight.stats.hits == 0
+
+        with pytest.raises(KeyError):
+            flight.do("key", lambda: {}["missing"])
+        assert flight.do("key", lambda: 3) == (3, False)
+
+
+class TestConnectorSingleFlight:
+    """Test that connectors coalesce identical requests."""
+
+    def test_identical_requests_coalesced(self, spotify_connector):
+        """Test that concurrent metadata calls make one request, while other
+        URLs and params are requested separately."""
+        release = threading.Event()
+        fetched = []
+
+        def fetch(url, endpoint, *, params=None):
+            fetched.append((url, params))
+            release.wait(timeout=5)
+            return {"url": url}
+
+        events = []
+        spotify_connector.metrics_hooks.append(events.append)
+        with patch.object(spotify_connector, "_fetch", side_effect=fetch):
+            threads, results = _run_concurrently(spotify_connector.metadata)
+            _wait_for(lambda: spotify_connector.single_flight.stats.hits == WORKERS - 1)
+            other = threading.Thread(
+                target=spotify_connector.metadata, args=("episode_1",)
+            )
+            other.start()
+            _wait_for(lambda: len(fetched) == 2)
+            release.set()
+            for thread in threads + [other]:
+                thread.join()
+
+        assert len(fetched) == 2
+        assert all(result == results[0] for result in results)
+        assert [event.outcome for event in events] == ["shared"] * (WORKERS - 1)
+
+    def test_podcasts_of_account_share_flights(self, spotify_connector):
+        """Test that the flights are shared by all podcasts of an account."""
+        podcast = spotify_connector.account.podcast("test_podcast_id")
+
+        assert podcast.single_flight is spotify_connector.single_flight
+        assert isinstance(podcast, SpotifyConnector)
@@ -0,0 +1,118 @@
+"""
+Test the incremental JSON row parser and the streaming endpoints.
+"""
+
+import datetime as dt
+import json
+import random
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.streaming import JSONRowParser
+
+
+def _parse(body: bytes, key=None, chunk_size=None):
+    parser = JSONRowParser(key)
+    rows = []
+    pos = 0
+    while pos < len(body):
+        size = chunk_size or random.randint(1, 16)
+        rows.extend(parser.feed(body[pos : pos + size]))
+        pos += size
+    rows.extend(parser.close())
+    return rows, parser.meta
+
+
+class TestJSONRowParser:
+    """Test parsing rows from a body that arrives in chunks."""
+
+    @pytest.mark.parametrize("indent", [None, 2])
+    def test_rows_and_meta_from_random_chunks(self, indent):
+        """Test that rows and other values survive any chunking."""
+        data = {
+            "totalPages": 12,
+            "nested": {"rows": [1, 2]},
+            "episodes": [
+                {"id": i, "name": "Folge ü" * i, "x": i / 3} for i in range(40)
+            ],
+            "total": 1234567,
+        }
+        body = json.dumps(data, indent=indent, ensure_ascii=False).encode("utf-8")
+
+        for _ in range(20):
+            rows, meta = _parse(body, key="episodes")
+            assert rows == data["episodes"]
+            assert meta == {
+                "totalPages": 12,
+                "nested": {"rows": [1, 2]},
+                "total": 1234567,
+            }
+
+    def test_first_array_without_key(self):
+        """Test that the first array holds the rows if no key is given."""
+        rows, meta = _parse(b'{"counts": [{"date": "2024-01-01"}], "other": [1]}')
+
+        assert rows == [{"date": "2024-01-01"}]
+        assert meta == {"other": [1]}
+
+    def test_rows_returned_before_body_is_complete(self):
+        """Test that complete rows are returned while the body is still open."""
+        parser = JSONRowParser("rows")
+
+        assert parser.feed(b'{"rows": [{"a": 1}, {"a"') == [{"a": 1}]
+        assert parser.feed(b": 2}]}") == [{"a": 2}]
+        assert parser.close() == []
+
+    def test_empty_array(self):
+        """Test that an empty array yields no rows."""
+        assert _parse(b'{"rows": [], "totalPages": 1}', key="rows", chunk_size=1) == (
+            [],
+            {"totalPages": 1},
+        )
+
+    @pytest.mark.parametrize(
+        "body", [b'{"rows": [1, 2', b'{"rows": [1 2]}', b"[1, 2]", b'{"a": 1} x']
+    )
+    def test_invalid_body(self, body):
+        """Test that truncated or malformed bodies raise an error."""
+        with pytest.raises(ValueError):
+            _parse(body)
+
+
+class TestStreamingEndpoints:
+    """Test that endpoints yield rows from streamed responses."""
+
+    def test_streams_rows(self, connector, make_response):
+        """Test that streamed stream data yields its daily rows."""
+        rows = [{"date": "2024-01-01", "starts": 1, "streams": 2}]
+        with patch(
+            "requests.Session.send",
+            return_value=make_response(200, {"detailedStreams": rows, "total": 2}),
+        ) as mock_send:
+            result = connector.streams(
+                dt.date(2024, 1, 1), dt.date(2024, 1, 1), stream=True
+            )
+            assert list(result) == rows
+
+        assert mock_send.call_args.kwargs["stream"] is True
+
+    def test_episodes_pages(self, connector, make_response):
+        """Test that streamed episodes follow the pagination."""
+        pages = [
+            make_response(
+                200, {"episodes": [{"id": "e1"}, {"id": "e2"}], "totalPages": 2}
+            ),
+            make_response(200, {"episodes": [{"id": "e3"}], "totalPages": 2}),
+        ]
+        with patch("requests.Session.send", side_effect=pages):
+            episodes = list(connector.episodes(dt.date(2024, 1, 1), stream=True))
+
+        assert [episode["id"] for episode in episodes] == ["e1", "e2", "e3"]
+
+    def test_stream_and_prefetch_exclusive(self, spotify_connector):
+        """Test that streaming can't be combined with prefetching."""
+        with pytest.raises(ValueError):
+            next(
+                spotify_connector.episodes(dt.date(2024, 1, 1), prefetch=2, stream=True)
+            )
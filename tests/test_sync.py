@@ -0,0 +1,134 @@
+"""
+Test the incremental sync and its watermarks.
+"""
+
+import datetime as dt
+from unittest.mock import Mock
+
+import pytest
+
+from spotifyconnector import __main__ as cli
+from spotifyconnector.export import Exporter
+from spotifyconnector.sync import IncrementalSync, WatermarkStore
+
+TODAY = dt.date(2024, 3, 10)
+# Endpoints called by a CLI run of a podcast
+ENDPOINTS = ("metadata", "streams", "followers", "impressions", "aggregate")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return WatermarkStore(tmp_path / "watermarks.json")
+
+
+@pytest.fixture
+def connector():
+    connector = Mock(podcast_id="show_1")
+    connector.streams.return_value = {"detailedStreams": []}
+    return connector
+
+
+class TestWatermarkStore:
+    """Test storing watermarks."""
+
+    def test_saved_watermarks_are_loaded(self, store):
+        """Test that watermarks survive a new store on the same file."""
+        store.set("show_1", "streams", dt.date(2024, 3, 1))
+        store.set("show_1", "streams", dt.date(2024, 3, 2), episode="e1")
+        store.save()
+
+        loaded = WatermarkStore(store.path)
+        assert loaded.get("show_1", "streams") == dt.date(2024, 3, 1)
+        assert loaded.get("show_1", "streams", "e1") == dt.date(2024, 3, 2)
+        assert loaded.get("show_1", "listeners") is None
+
+    def test_unsaved_changes_are_not_written(self, store):
+        """Test that the file is only written by save."""
+        store.set("show_1", "streams", dt.date(2024, 3, 1))
+
+        assert not store.path.exists()
+
+
+class TestIncrementalSync:
+    """Test that only days after the watermark are requested."""
+
+    def test_first_sync_requests_initial_days(self, connector, store):
+        """Test that a show without watermark gets the initial window."""
+        sync = IncrementalSync(connector, store, initial_days=7)
+
+        sync.fetch("streams", end=TODAY)
+
+        connector.streams.assert_called_once_with(dt.date(2024, 3, 3), TODAY)
+        assert store.get("show_1", "streams") == TODAY
+
+    def test_next_sync_starts_at_watermark_with_overlap(self, connector, store):
+        """Test that the next run requests the new days plus the overlap."""
+        store.set("show_1", "streams", dt.date(2024, 3, 8), episode="e1")
+        sync = IncrementalSync(connector, store, overlap_days=2)
+
+        sync.fetch("streams", episode="e1", end=TODAY)
+
+        connector.streams.assert_called_once_with(
+            dt.date(2024, 3, 7), TODAY, episode="e1"
+        )
+        assert store.get("show_1", "streams", "e1") == TODAY
+
+    def test_up_to_date_endpoint_is_skipped(self, connector, store):
+        """Test that nothing is requested without new days and overlap."""
+        store.set("show_1", "streams", TODAY)
+        sync = IncrementalSync(connector, store, overlap_days=0)
+
+        assert sync.fetch("streams", end=TODAY) is None
+        connector.streams.assert_not_called()
+
+    def test_failed_request_keeps_watermark(self, connector, store):
+        """Test that the watermark only moves after a successful request."""
+        store.set("show_1", "streams", dt.date(2024, 3, 1))
+        connector.streams.side_effect = ValueError("boom")
+        sync = IncrementalSync(connector, store)
+
+        with pytest.raises(ValueError):
+            sync.fetch("streams", end=TODAY)
+
+        assert store.get("show_1", "streams") == dt.date(2024, 3, 1)
+
+    def test_unsupported_endpoint(self, connector, store):
+        """Test that endpoints without a date range are rejected."""
+        with pytest.raises(ValueError):
+            IncrementalSync(connector, store).fetch("metadata")
+
+    def test_cli_episode_calls_use_sync(self, connector, store):
+        """Test that the CLI requests ranged episode data through the sync."""
+        sync = IncrementalSync(connector, store)
+        calls = {
+            name: func for name, func, _, _ in cli.episode_calls(connector, "e1", sync)
+        }
+
+        calls["episode_streams"]()
+
+        assert store.get("show_1", "streams", "e1") == dt.date.today()
+        assert cli.parse_args(["--incremental"]).incremental == ""
+        assert cli.parse_args([]).incremental is None
+
+    def test_second_cli_run_skips_up_to_date_endpoints(self, tmp_path):
+        """Test that a second export on the same day neither requests nor
+        exports endpoints that are up to date."""
+        connector = Mock(podcast_id="show_1")
+        for name in ENDPOINTS:
+            getattr(connector, name).return_value = {"rows": [{"day": "2024-03-10"}]}
+        connector.episodes.return_value = iter([])
+        watermarks = str(tmp_path / "watermarks.json")
+
+        for run in ("first", "second"):
+            args = cli.parse_args(
+                ["--incremental", watermarks, "--overlap-days", "0"]
+                + ["export", "--out", str(tmp_path / run), "--format", "csv"]
+            )
+            with Exporter(args.out, args.format) as exporter:
+                cli.run(connector, args, reporter=exporter)
+
+        assert connector.streams.call_count == 1
+        assert connector.metadata.call_count == 2
+        exported = {path.name for path in (tmp_path / "second").iterdir()}
+        assert "metadata.csv" in exported
+        assert "streams.csv" not in exported
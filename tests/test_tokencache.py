@@ -0,0 +1,122 @@
+"""
+Test the persistent Bearer token cache.
+"""
+
+import datetime as dt
+import os
+from unittest.mock import patch
+
+import pytest
+
+from spotifyconnector.connector import SpotifyConnector
+from spotifyconnector.tokencache import FileTokenCache
+
+
+@pytest.fixture
+def token_cache(tmp_path):
+    return FileTokenCache(tmp_path / "tokens")
+
+
+def _connector(token_cache, sp_dc="test_sp_dc"):
+    return SpotifyConnector(
+        base_url="https://generic.wg.spotify.com/podcasters/v0",
+        client_id="test_client_id",
+        podcast_id="test_podcast_id",
+        sp_dc=sp_dc,
+        sp_key="test_sp_key",
+        token_cache=token_cache,
+    )
+
+
+def _fake_authenticate(connector, calls):
+    """Replace the account's auth flow by one that issues a numbered token."""
+
+    account = connector.account
+
+    def authenticate():
+        calls.append(1)
+        account._store_token(
+            {"access_token": f"token_{len(calls)}", "expires_in": 3600}
+        )
+        account._token_cache.store(
+            account._token_cache_key(), account._bearer, account._bearer_expires
+        )
+
+    return patch.object(account, "_authenticate", authenticate)
+
+
+class TestFileTokenCache:
+    """Test storing and loading tokens."""
+
+    def test_round_trip(self, token_cache):
+        """Test that a stored token is loaded with its expiry time."""
+        expires = dt.datetime(2030, 1, 1, 12, 0, 0)
+        token_cache.store("key", "bearer", expires)
+
+        assert token_cache.load("key") == ("bearer", expires)
+        assert token_cache.load("other") is None
+
+    def test_key_hides_credentials(self):
+        """Test that keys are hashes and differ per credential set."""
+        key = FileTokenCache.key("client", "secret_dc", "secret_key")
+
+        assert "secret" not in key
+        assert len(key) == 64
+        assert key != FileTokenCache.key("client", "other_dc", "secret_key")
+
+    def test_files_not_readable_by_others(self, token_cache):
+        """Test that token files are only readable by the owner."""
+        token_cache.store("key", "bearer", dt.datetime(2030, 1, 1))
+
+        mode = os.stat(token_cache.directory / "key.json").st_mode
+        assert mode & 0o077 == 0
+
+    def test_corrupt_entry_is_ignored(self, token_cache):
+        """Test that an unreadable entry is treated as missing."""
+        (token_cache.directory / "key.json").write_text("{not json")
+
+        assert token_cache.load("key") is None
+
+
+class TestConnectorTokenCache:
+    """Test that the connector reads and writes the token cache."""
+
+    def test_second_connector_reuses_token(self, token_cache):
+        """Test that a new process with the same credentials skips auth."""
+        calls = []
+        first = _connector(token_cache)
+        with _fake_authenticate(first, calls):
+            first._ensure_auth()
+
+        second = _connector(token_cache)
+        with _fake_authenticate(second, calls):
+            second._ensure_auth()
+
+        assert len(calls) == 1
+        assert second._bearer == "token_1"
+
+    def test_expired_token_is_refreshed(self, token_cache):
+        """Test that an expired cached token triggers authentication."""
+        connector = _connector(token_cache)
+        token_cache.store(
+            connector.account._token_cache_key(),
+            "old_token",
+            dt.datetime.now() - dt.timedelta(hours=1),
+        )
+
+        calls = []
+        with _fake_authenticate(connector, calls):
+            connector._ensure_auth()
+
+        assert len(calls) == 1
+        assert token_cache.load(connector.account._token_cache_key())[0] == "token_1"
+
+    def test_other_credentials_do_not_share_token(self, token_cache):
+        """Test that tokens are not reused for different cookies."""
+        calls = []
+        for sp_dc in ("dc_1", "dc_2"):
+            connector = _connector(token_cache, sp_dc=sp_dc)
+            with _fake_authenticate(connector, calls):
+                connector._ensure_auth()
+
+        assert len(calls) == 2